@@ -10,11 +10,14 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'scripts'))
 
 from scripts.db_access import DatabaseAccess
 from scripts.config import DB_PARAMS
+from psycopg2.extras import execute_values
 
 def extract_format_details(game_type, number_of_players):
     """
     Extract structured format details from existing game_type and number_of_players.
     This is a fallback implementation until the hpcursor library is updated.
+    The insert trigger uses the SQL copy of this logic, classify_game_format
+    (database_setup/schema/create_game_format_trigger.py); keep the two in sync.
     """
     game_type_lower = game_type.lower() if game_type else ''
     
@@ -66,8 +69,18 @@ def extract_format_details(game_type, number_of_players):
         'table_size': table_size
     }
 
-def run_backfill():
-    """Run the backfill process to populate structured format columns."""
+# Rows that still need a structured format
+NEEDS_FORMAT = "game_class IS NULL OR game_variant IS NULL OR table_size IS NULL"
+
+def run_format_backfill():
+    """
+    Run the backfill process to populate structured format columns.
+
+    There are only a handful of distinct (game_type, number_of_players) pairs, so
+    each pair is classified once in Python and all hands are updated with one
+    set-based UPDATE ... FROM (VALUES ...). New hands are classified on insert by
+    the trigger from database_setup/schema/create_game_format_trigger.py.
+    """
     print("=== Starting Backfill for Structured Game Formats ===")
     
     db = None
@@ -90,51 +103,39 @@ def run_backfill():
             print("python database_setup/schema/add_structured_format_columns.py")
             return False
         
-        # Find hands that need updating
+        # Classify each distinct pair once
         with db.conn.cursor() as cur:
-            cur.execute("""
-                SELECT id, game_type, number_of_players 
-                FROM hand_histories 
-                WHERE game_class IS NULL OR game_variant IS NULL OR table_size IS NULL
+            cur.execute(f"""
+                SELECT DISTINCT game_type, number_of_players
+                FROM hand_histories
+                WHERE {NEEDS_FORMAT}
             """)
-            hands_to_process = cur.fetchall()
+            pairs = cur.fetchall()
         
-        if not hands_to_process:
+        if not pairs:
             print("[OK] No hands to update. Backfill may already be complete.")
             return True
         
-        print(f"Found {len(hands_to_process)} hands to update.")
-        
-        # Process hands in batches
-        batch_size = 1000
-        total_updated = 0
+        mapping = []
+        for game_type, number_of_players in pairs:
+            details = extract_format_details(game_type, number_of_players)
+            mapping.append((game_type, number_of_players, details['game_class'],
+                            details['game_variant'], details['table_size']))
+            print(f"  {game_type} ({number_of_players} players) -> "
+                  f"{details['game_class']}/{details['game_variant']}/{details['table_size']}")
         
-        for i in range(0, len(hands_to_process), batch_size):
-            batch = hands_to_process[i:i + batch_size]
-            updates = []
-            
-            for hand_id, game_type, number_of_players in batch:
-                format_details = extract_format_details(game_type, number_of_players)
-                updates.append((
-                    format_details['game_class'],
-                    format_details['game_variant'], 
-                    format_details['table_size'],
-                    hand_id
-                ))
-            
-            # Update batch
-            with db.conn.cursor() as cur:
-                from psycopg2.extras import execute_batch
-                sql_update = """
-                    UPDATE hand_histories 
-                    SET game_class = %s, game_variant = %s, table_size = %s 
-                    WHERE id = %s
-                """
-                execute_batch(cur, sql_update, updates)
-                db.conn.commit()
-            
-            total_updated += len(batch)
-            print(f"Updated {total_updated}/{len(hands_to_process)} hands...")
+        # Apply the mapping to every hand in one statement
+        with db.conn.cursor() as cur:
+            execute_values(cur, """
+                UPDATE hand_histories h
+                SET game_class = m.game_class, game_variant = m.game_variant, table_size = m.table_size
+                FROM (VALUES %s) AS m(game_type, number_of_players, game_class, game_variant, table_size)
+                WHERE h.game_type IS NOT DISTINCT FROM m.game_type
+                  AND h.number_of_players IS NOT DISTINCT FROM m.number_of_players
+                  AND (h.game_class IS NULL OR h.game_variant IS NULL OR h.table_size IS NULL)
+            """, mapping, template="(%s::varchar, %s::int, %s, %s, %s)", page_size=len(mapping))
+            print(f"Updated {cur.rowcount} hands from {len(mapping)} distinct formats.")
+        db.conn.commit()
         
         # Verify the update
         with db.conn.cursor() as cur:
@@ -253,6 +254,6 @@ if __name__ == "__main__":
             print("  --stats: Show current database statistics")
             sys.exit(1)
     else:
-        success = run_backfill()
+        success = run_format_backfill()
     
     sys.exit(0 if success else 1) 
\ No newline at end of file
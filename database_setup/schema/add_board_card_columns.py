@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Migration: Add flop_cards, turn_card and river_card columns to hand_histories.
+
+The board is extracted from raw_text once, with the regexes from
+scripts/board_cards.py:
+    - a BEFORE INSERT (or UPDATE OF raw_text) trigger fills the columns at ingest
+    - the backfill fills existing hands through scripts/backfill_framework.py
+      (keyset pages, a process pool, COPY + UPDATE ... FROM, checkpoints)
+
+flop_cards holds the three flop cards separated by spaces ("Ah Kd 7c");
+turn_card and river_card hold one card each. Streets that weren't dealt stay NULL.
+
+Usage:
+    python add_board_card_columns.py                        # columns, trigger and backfill
+    python add_board_card_columns.py --backfill [--workers N] [--restart]  # backfill only
+    python add_board_card_columns.py --rollback             # drop trigger and columns
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from scripts.db_access import DatabaseAccess
+from scripts.config import DB_PARAMS
+from scripts.board_cards import FLOP_REGEX, TURN_REGEX, RIVER_REGEX, extract_board
+from scripts.backfill_framework import BackfillJob, run_backfill
+
+BOARD_PARAMS = {"flop": FLOP_REGEX, "turn": TURN_REGEX, "river": RIVER_REGEX}
+
+ADD_COLUMNS = """
+ALTER TABLE hand_histories ADD COLUMN IF NOT EXISTS flop_cards VARCHAR(20);
+ALTER TABLE hand_histories ADD COLUMN IF NOT EXISTS turn_card VARCHAR(3);
+ALTER TABLE hand_histories ADD COLUMN IF NOT EXISTS river_card VARCHAR(3);
+"""
+
+CREATE_TRIGGER = """
+CREATE OR REPLACE FUNCTION hand_histories_extract_board()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.flop_cards := substring(NEW.raw_text from %(flop)s);
+    NEW.turn_card := substring(NEW.raw_text from %(turn)s);
+    NEW.river_card := substring(NEW.raw_text from %(river)s);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_hand_histories_board ON hand_histories;
+CREATE TRIGGER trg_hand_histories_board
+    BEFORE INSERT OR UPDATE OF raw_text ON hand_histories
+    FOR EACH ROW EXECUTE FUNCTION hand_histories_extract_board();
+"""
+
+def compute_board_row(row):
+    """Backfill compute function: (id, raw_text) -> (flop_cards, turn_card, river_card)."""
+    return extract_board(row[1])
+
+
+# Hands without a flop never match the LIKE, so reruns only read unfilled hands
+BOARD_BACKFILL = BackfillJob(
+    name="board_cards",
+    read_columns=["id", "raw_text"],
+    where="flop_cards IS NULL AND raw_text LIKE '%*** FLOP ***%'",
+    compute=compute_board_row,
+    target_columns=[("flop_cards", "VARCHAR(20)"), ("turn_card", "VARCHAR(3)"), ("river_card", "VARCHAR(3)")],
+)
+
+
+def backfill_board_cards(workers=None, restart=False):
+    """Fills the board columns for existing hands (see scripts/backfill_framework.py)."""
+    return run_backfill(BOARD_BACKFILL, workers=workers, restart=restart) is not None
+
+
+def run_migration(workers=None):
+    """Add the board columns and the ingest trigger, then backfill existing hands."""
+    print("=== Migration: Adding Board Card Columns ===")
+
+    db = None
+    try:
+        db = DatabaseAccess(**DB_PARAMS)
+
+        with db.conn.cursor() as cur:
+            # Step 1: Columns
+            print("Step 1: Adding flop_cards, turn_card and river_card columns...")
+            cur.execute(ADD_COLUMNS)
+            print("[OK] Columns added")
+
+            # Step 2: Trigger, so hands ingested from now on are filled at insert time
+            print("\nStep 2: Creating board extraction trigger...")
+            cur.execute(CREATE_TRIGGER, BOARD_PARAMS)
+            print("[OK] Trigger created")
+
+        db.conn.commit()
+    except Exception as e:
+        print(f"[ERROR] Migration failed: {e}")
+        if db and db.conn:
+            db.conn.rollback()
+        return False
+    finally:
+        if db:
+            db.close()
+
+    # Step 3: Backfill existing hands (checkpointed per page, so it resumes if interrupted)
+    print("\nStep 3: Backfilling existing hands...")
+    if not backfill_board_cards(workers=workers):
+        return False
+    print("\n[OK] Migration completed successfully!")
+    return True
+
+
+def rollback_migration():
+    """Drop the trigger and the board columns."""
+    print("=== Rollback: Removing Board Card Columns ===")
+    db = None
+    try:
+        db = DatabaseAccess(**DB_PARAMS)
+        with db.conn.cursor() as cur:
+            cur.execute("DROP TRIGGER IF EXISTS trg_hand_histories_board ON hand_histories")
+            cur.execute("DROP FUNCTION IF EXISTS hand_histories_extract_board()")
+            cur.execute("ALTER TABLE hand_histories DROP COLUMN IF EXISTS flop_cards")
+            cur.execute("ALTER TABLE hand_histories DROP COLUMN IF EXISTS turn_card")
+            cur.execute("ALTER TABLE hand_histories DROP COLUMN IF EXISTS river_card")
+        db.conn.commit()
+        print("[OK] Rollback completed successfully!")
+        return True
+    except Exception as e:
+        print(f"[ERROR] Rollback failed: {e}")
+        if db and db.conn:
+            db.conn.rollback()
+        return False
+    finally:
+        if db:
+            db.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Migration script for board card columns")
+    parser.add_argument("--rollback", action="store_true", help="Rollback the migration")
+    parser.add_argument("--backfill", action="store_true", help="Only backfill existing hands")
+    parser.add_argument("--workers", type=int, default=None, help="Backfill worker processes (default: CPU count)")
+    parser.add_argument("--restart", action="store_true", help="Restart the backfill from the first hand")
+
+    args = parser.parse_args()
+
+    if args.rollback:
+        success = rollback_migration()
+    elif args.backfill:
+        success = backfill_board_cards(workers=args.workers, restart=args.restart)
+    else:
+        success = run_migration(workers=args.workers)
+
+    sys.exit(0 if success else 1)
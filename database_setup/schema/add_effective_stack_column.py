@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Migration: Add effective_stack_bb to hand_histories.
+
+effective_stack_bb is the second-largest starting stack divided by the big
+blind. Stacks come from the stack_sizes JSONB column and the big blind from the
+blinds in the hand's first line, e.g. "($0.01/$0.02)" or "(10/20)". The study
+rules' min_effective_stack_bb / max_effective_stack_bb are matched against the
+parser's HandHistoryData.effective_stack_bb, so before anything is written the
+SQL value is compared with the parser's on the most recent hands and the
+migration stops if they disagree.
+
+    - effective_stack_bb(stack_sizes, raw_text) computes the value in SQL
+    - a BEFORE INSERT trigger fills the column at ingest
+    - existing hands are backfilled in id ranges, one commit per range
+    - a btree index makes min/max stack filters index range scans
+
+The backfill is a set-based UPDATE per id range rather than a
+backfill_framework job: the value is computed by the same SQL function the
+trigger uses, so there is nothing to compute in Python and raw_text never
+leaves the server. Ranges whose hands are already filled are skipped by the
+IS NULL filter, so an interrupted backfill can simply be run again.
+
+Usage:
+    python add_effective_stack_column.py             # column, trigger, backfill and index
+    python add_effective_stack_column.py --backfill  # backfill only
+    python add_effective_stack_column.py --rollback  # drop everything again
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from scripts.db_access import DatabaseAccess
+from scripts.config import DB_PARAMS
+from holiday_parser import get_hand_history_parser
+
+CREATE_FUNCTION = """
+ALTER TABLE hand_histories ADD COLUMN IF NOT EXISTS effective_stack_bb NUMERIC(8, 2);
+
+CREATE OR REPLACE FUNCTION effective_stack_bb(p_stack_sizes JSONB, p_raw_text TEXT)
+RETURNS NUMERIC AS $$
+    SELECT round(s.stack / NULLIF(substring(p_raw_text from '\\([^0-9 ]?[0-9.]+/[^0-9 ]?([0-9.]+)')::numeric, 0), 2)
+    FROM (
+        SELECT NULLIF(regexp_replace(value, '[^0-9.]', '', 'g'), '')::numeric AS stack
+        FROM jsonb_each_text(p_stack_sizes)
+        ORDER BY 1 DESC NULLS LAST
+        OFFSET 1 LIMIT 1
+    ) s
+$$ LANGUAGE sql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION hand_histories_effective_stack()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.effective_stack_bb IS NULL AND jsonb_typeof(NEW.stack_sizes) = 'object' THEN
+        NEW.effective_stack_bb := effective_stack_bb(NEW.stack_sizes, NEW.raw_text);
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_hand_histories_effective_stack ON hand_histories;
+CREATE TRIGGER trg_hand_histories_effective_stack
+    BEFORE INSERT ON hand_histories
+    FOR EACH ROW EXECUTE FUNCTION hand_histories_effective_stack();
+"""
+
+BACKFILL_RANGE = """
+UPDATE hand_histories
+SET effective_stack_bb = effective_stack_bb(stack_sizes, raw_text)
+WHERE id >= %s AND id < %s
+  AND effective_stack_bb IS NULL
+  AND jsonb_typeof(stack_sizes) = 'object'
+"""
+
+PARITY_SAMPLE = """
+SELECT id, raw_text, effective_stack_bb(stack_sizes, raw_text)
+FROM hand_histories
+WHERE jsonb_typeof(stack_sizes) = 'object'
+ORDER BY id DESC
+LIMIT %s
+"""
+
+CREATE_INDEX = """
+CREATE INDEX IF NOT EXISTS idx_hand_histories_effective_stack_bb
+ON hand_histories (effective_stack_bb);
+"""
+
+
+def check_parser_parity(cur, sample_size=1000):
+    """
+    Compares effective_stack_bb() with the parser's effective_stack_bb on the most recent hands.
+
+    Raises:
+        Exception: If any parsed hand gets a different value in SQL.
+    """
+    cur.execute(PARITY_SAMPLE, (sample_size,))
+    checked = mismatches = unparsed = 0
+    for hand_id, raw_text, sql_value in cur.fetchall():
+        try:
+            hh_data = get_hand_history_parser(raw_text).parse(raw_text)
+        except Exception:
+            unparsed += 1
+            continue
+        parser_value = getattr(hh_data, 'effective_stack_bb', None)
+        checked += 1
+        if parser_value is None and sql_value is None:
+            continue
+        if parser_value is None or sql_value is None or abs(float(sql_value) - parser_value) > 0.005:
+            mismatches += 1
+            print(f"[ERROR] Hand {hand_id}: SQL {sql_value}, parser {parser_value}")
+    if mismatches:
+        raise Exception(f"{mismatches} of {checked} hands have a different effective stack in SQL and the parser")
+    print(f"[OK] SQL and parser agree on {checked} hands ({unparsed} could not be parsed)")
+
+
+def backfill_effective_stack(range_size=50000):
+    """Fills effective_stack_bb for existing hands, committing each id range."""
+    print("=== Backfilling effective_stack_bb ===")
+    db = None
+    try:
+        db = DatabaseAccess(**DB_PARAMS)
+        with db.conn.cursor() as cur:
+            cur.execute("SELECT MIN(id), MAX(id) FROM hand_histories")
+            min_id, max_id = cur.fetchone()
+        db.conn.commit()
+        if min_id is None:
+            print("[OK] No hands to backfill")
+            return True
+
+        started = time.time()
+        total = 0
+        for start in range(min_id, max_id + 1, range_size):
+            with db.conn.cursor() as cur:
+                cur.execute(BACKFILL_RANGE, (start, start + range_size))
+                total += cur.rowcount
+            db.conn.commit()
+            elapsed = time.time() - started
+            print(f"  up to id {min(start + range_size - 1, max_id)}: {total} hands "
+                  f"({total / max(elapsed, 1e-9):.0f} hands/s)")
+        print(f"[OK] Backfilled {total} hands")
+        return True
+    except Exception as e:
+        print(f"[ERROR] Backfill failed: {e}")
+        if db and db.conn:
+            db.conn.rollback()
+        return False
+    finally:
+        if db:
+            db.close()
+
+
+def run_migration():
+    """Add the column, function and trigger, check them against the parser, backfill and index."""
+    print("=== Migration: Adding effective_stack_bb ===")
+
+    db = None
+    try:
+        db = DatabaseAccess(**DB_PARAMS)
+
+        with db.conn.cursor() as cur:
+            # Step 1: Column, function and trigger
+            print("Step 1: Adding effective_stack_bb column and insert trigger...")
+            cur.execute(CREATE_FUNCTION)
+            print("[OK] Column, function and trigger created")
+
+            # Step 2: Compare with the parser before committing, so a mismatch leaves nothing behind
+            print("\nStep 2: Checking effective_stack_bb() against the parser...")
+            check_parser_parity(cur)
+        db.conn.commit()
+
+        # Step 3: Backfill before indexing, so the index is built once rather than maintained row by row
+        print("\nStep 3: Backfilling existing hands...")
+        if not backfill_effective_stack():
+            return False
+
+        # Step 4: Index
+        print("\nStep 4: Creating index on effective_stack_bb...")
+        with db.conn.cursor() as cur:
+            cur.execute(CREATE_INDEX)
+            cur.execute("""
+                SELECT COUNT(effective_stack_bb), MIN(effective_stack_bb), MAX(effective_stack_bb)
+                FROM hand_histories
+            """)
+            filled, low, high = cur.fetchone()
+        db.conn.commit()
+        print(f"[OK] Index created ({filled} hands, {low}-{high} bb)")
+
+        print("\n[OK] Migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"[ERROR] Migration failed: {e}")
+        if db and db.conn:
+            db.conn.rollback()
+        return False
+    finally:
+        if db:
+            db.close()
+
+
+def rollback_migration():
+    """Drop the index, trigger, functions and column."""
+    print("=== Rollback: Removing effective_stack_bb ===")
+    db = None
+    try:
+        db = DatabaseAccess(**DB_PARAMS)
+        with db.conn.cursor() as cur:
+            cur.execute("DROP TRIGGER IF EXISTS trg_hand_histories_effective_stack ON hand_histories")
+            cur.execute("DROP FUNCTION IF EXISTS hand_histories_effective_stack()")
+            cur.execute("DROP INDEX IF EXISTS idx_hand_histories_effective_stack_bb")
+            cur.execute("ALTER TABLE hand_histories DROP COLUMN IF EXISTS effective_stack_bb")
+            cur.execute("DROP FUNCTION IF EXISTS effective_stack_bb(JSONB, TEXT)")
+        db.conn.commit()
+        print("[OK] Rollback completed successfully!")
+        return True
+    except Exception as e:
+        print(f"[ERROR] Rollback failed: {e}")
+        if db and db.conn:
+            db.conn.rollback()
+        return False
+    finally:
+        if db:
+            db.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--rollback":
+        success = rollback_migration()
+    elif len(sys.argv) > 1 and sys.argv[1] == "--backfill":
+        success = backfill_effective_stack()
+    else:
+        success = run_migration()
+
+    sys.exit(0 if success else 1)
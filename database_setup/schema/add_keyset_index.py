@@ -0,0 +1,31 @@
+#!/usr/bin/env python3
+import psycopg2
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'scripts'))
+from config import DB_PARAMS
+
+def add_keyset_index(conn):
+    """Add the (created_at, id) index used by DatabaseAccess.iter_hand_histories"""
+    create_index_sql = """
+    CREATE INDEX IF NOT EXISTS idx_hand_histories_created_at_id
+    ON hand_histories (created_at DESC, id DESC);
+    """
+
+    with conn.cursor() as cur:
+        cur.execute(create_index_sql)
+    conn.commit()
+    print("Added idx_hand_histories_created_at_id index to hand_histories table")
+
+def main():
+    conn = psycopg2.connect(**DB_PARAMS)
+    try:
+        add_keyset_index(conn)
+        print("Database migration completed successfully.")
+    except Exception as e:
+        print("Error during migration:", e)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
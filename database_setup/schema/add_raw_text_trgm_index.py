@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+import psycopg2
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'scripts'))
+from config import DB_PARAMS
+
+def add_raw_text_trgm_index(conn):
+    """Add the trigram index used by raw_text_search.py for raw_text ~ '(^|\\n)...' line searches"""
+    # pg_trgm ships with PostgreSQL's contrib package; creating it needs sufficient privileges
+    create_extension_sql = "CREATE EXTENSION IF NOT EXISTS pg_trgm;"
+    create_index_sql = """
+    CREATE INDEX IF NOT EXISTS idx_hand_histories_raw_text_trgm
+    ON hand_histories USING gin (raw_text gin_trgm_ops);
+    """
+
+    with conn.cursor() as cur:
+        cur.execute(create_extension_sql)
+        cur.execute(create_index_sql)
+    conn.commit()
+    print("Added idx_hand_histories_raw_text_trgm index to hand_histories table")
+
+def main():
+    conn = psycopg2.connect(**DB_PARAMS)
+    try:
+        add_raw_text_trgm_index(conn)
+        print("Database migration completed successfully.")
+    except Exception as e:
+        print("Error during migration:", e)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Migration: Create the decision_points table and fill it for every hand.
+
+decision_points holds one row per betting opportunity from
+HandHistoryData.compute_betting_opportunities, which the explorer otherwise
+only computes for the hand on screen. With them stored, decision frequencies
+by normalized sequence are a GROUP BY (DatabaseAccess.get_decision_frequencies).
+
+The rows are produced by scripts/backfill_framework.py in insert mode: hands
+are parsed in a process pool and the opportunities are COPYed into a temp
+table and inserted in one statement per page. The job is incremental: a
+finished run keeps the last hand id it read as a high-water mark, so --backfill
+after an ingest batch only parses hands with higher ids. That includes hands
+that produced no rows (unparseable, or no opportunities), which would
+otherwise be parsed again on every run. Unparseable hands are counted and
+reported as skipped; --restart reads every hand again, still skipping hands
+that already have rows.
+
+There is no foreign key to hand_histories because hand_histories may be
+partitioned (see partition_hand_histories.py), which leaves id without a
+unique constraint of its own.
+
+Usage:
+    python create_decision_points.py                                   # create table and fill it
+    python create_decision_points.py --backfill [--workers N] [--restart]  # fill new hands only
+    python create_decision_points.py --rollback                        # drop the table
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from scripts.db_access import DatabaseAccess
+from scripts.config import DB_PARAMS
+from scripts.backfill_framework import BackfillJob, run_backfill
+
+CREATE_TABLE = """
+CREATE TABLE IF NOT EXISTS decision_points (
+    hand_id BIGINT NOT NULL,
+    opportunity_index SMALLINT NOT NULL,
+    street VARCHAR(20) NOT NULL,
+    player_position VARCHAR(100),
+    opportunity_type VARCHAR(50),
+    normalized_betting_sequence VARCHAR(200),
+    pot NUMERIC(12, 2),
+    stack NUMERIC(12, 2),
+    decision VARCHAR(50),
+    bet_amount NUMERIC(12, 2),
+    PRIMARY KEY (hand_id, opportunity_index)
+);
+CREATE INDEX IF NOT EXISTS idx_decision_points_sequence
+    ON decision_points (street, normalized_betting_sequence);
+"""
+
+TARGET_COLUMNS = [
+    ("hand_id", "BIGINT"),
+    ("opportunity_index", "SMALLINT"),
+    ("street", "VARCHAR(20)"),
+    ("player_position", "VARCHAR(100)"),
+    ("opportunity_type", "VARCHAR(50)"),
+    ("normalized_betting_sequence", "VARCHAR(200)"),
+    ("pot", "NUMERIC(12, 2)"),
+    ("stack", "NUMERIC(12, 2)"),
+    ("decision", "VARCHAR(50)"),
+    ("bet_amount", "NUMERIC(12, 2)"),
+]
+
+
+def compute_decision_points(row):
+    """Backfill compute function: (id, raw_text) -> one tuple per betting opportunity, or None if unparseable."""
+    from holiday_parser import get_hand_history_parser
+
+    hand_id, raw_text = row
+    try:
+        hh_data = get_hand_history_parser(raw_text).parse(raw_text)
+        hh_data.compute_betting_opportunities()
+    except Exception:
+        return None  # Counted as skipped by run_backfill
+
+    return [
+        (hand_id, index, opp.street, opp.player_position, opp.opportunity_type,
+         opp.normalized_betting_sequence, opp.pot_size, opp.player_stack,
+         opp.decision, opp.bet_amount)
+        for index, opp in enumerate(getattr(hh_data, "betting_opportunities", None) or [])
+    ]
+
+
+DECISION_POINTS_JOB = BackfillJob(
+    name="decision_points",
+    read_columns=["id", "raw_text"],
+    where="NOT EXISTS (SELECT 1 FROM decision_points d WHERE d.hand_id = hand_histories.id)",
+    compute=compute_decision_points,
+    target_columns=TARGET_COLUMNS,
+    mode="insert",
+    insert_table="decision_points",
+    on_conflict="DO NOTHING",
+    incremental=True,
+)
+
+
+def backfill_decision_points(workers=None, restart=False):
+    """Fills decision_points for hands past the last run's high-water mark."""
+    result = run_backfill(DECISION_POINTS_JOB, page_size=2000, workers=workers, restart=restart)
+    if result is None:
+        return False
+    if result["rows_skipped"]:
+        print(f"[INFO] {result['rows_skipped']} hands could not be parsed and have no decision points")
+    return True
+
+
+def run_migration(workers=None):
+    """Create decision_points, then fill it from every hand."""
+    print("=== Migration: Creating decision_points Table ===")
+
+    db = None
+    try:
+        db = DatabaseAccess(**DB_PARAMS)
+
+        # Step 1: Create table
+        print("Step 1: Creating decision_points table...")
+        with db.conn.cursor() as cur:
+            cur.execute(CREATE_TABLE)
+        db.conn.commit()
+        print("[OK] decision_points table created")
+
+    except Exception as e:
+        print(f"[ERROR] Migration failed: {e}")
+        if db and db.conn:
+            db.conn.rollback()
+        return False
+    finally:
+        if db:
+            db.close()
+
+    # Step 2: Parse every hand (checkpointed per page, so it resumes if interrupted)
+    print("\nStep 2: Computing betting opportunities for existing hands...")
+    if not backfill_decision_points(workers=workers):
+        return False
+    print("\n[OK] Migration completed successfully!")
+    return True
+
+
+def rollback_migration():
+    """Drop decision_points and its backfill checkpoint."""
+    print("=== Rollback: Removing decision_points ===")
+    db = None
+    try:
+        db = DatabaseAccess(**DB_PARAMS)
+        with db.conn.cursor() as cur:
+            cur.execute("DROP TABLE IF EXISTS decision_points")
+            cur.execute("SELECT to_regclass('backfill_checkpoints')")
+            if cur.fetchone()[0]:
+                cur.execute("DELETE FROM backfill_checkpoints WHERE job_name = 'decision_points'")
+        db.conn.commit()
+        print("[OK] Rollback completed successfully!")
+        return True
+    except Exception as e:
+        print(f"[ERROR] Rollback failed: {e}")
+        if db and db.conn:
+            db.conn.rollback()
+        return False
+    finally:
+        if db:
+            db.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Migration script for the decision_points table")
+    parser.add_argument("--rollback", action="store_true", help="Rollback the migration")
+    parser.add_argument("--backfill", action="store_true", help="Only fill hands added since the last run")
+    parser.add_argument("--workers", type=int, default=None, help="Parser processes (default: CPU count)")
+    parser.add_argument("--restart", action="store_true", help="Restart the backfill from the first hand")
+
+    args = parser.parse_args()
+
+    if args.rollback:
+        success = rollback_migration()
+    elif args.backfill:
+        success = backfill_decision_points(workers=args.workers, restart=args.restart)
+    else:
+        success = run_migration(workers=args.workers)
+
+    sys.exit(0 if success else 1)
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+Migration: Classify structured game formats on insert.
+
+Creates classify_game_format(game_type, number_of_players), the SQL version of
+extract_format_details in backfill_formats.py, and a BEFORE INSERT trigger that
+fills game_class, game_variant and table_size when the ingester leaves them
+NULL. The function is checked against extract_format_details for every
+(game_type, number_of_players) pair in hand_histories so the two can't drift
+apart silently.
+
+Existing hands are backfilled with backfill_formats.py.
+
+Usage:
+    python create_game_format_trigger.py            # create function and trigger
+    python create_game_format_trigger.py --rollback # drop them
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from scripts.db_access import DatabaseAccess
+from scripts.config import DB_PARAMS
+from backfill_formats import extract_format_details
+
+CREATE_FUNCTION = """
+CREATE OR REPLACE FUNCTION classify_game_format(
+    p_game_type TEXT, p_number_of_players INT,
+    OUT game_class VARCHAR, OUT game_variant VARCHAR, OUT table_size VARCHAR)
+AS $$
+DECLARE
+    gt TEXT := lower(coalesce(p_game_type, ''));
+BEGIN
+    game_class := CASE
+        WHEN gt LIKE '%cash%' THEN 'cash'
+        WHEN gt LIKE '%tournament%' OR gt LIKE '%mtt%' OR gt LIKE '%sitgo%'
+             OR gt LIKE '%sng%' OR gt LIKE '%spingo%' THEN 'tournament'
+        ELSE 'cash'
+    END;
+    game_variant := CASE WHEN gt LIKE '%zoom%' THEN 'zoom' ELSE 'regular' END;
+    table_size := CASE
+        WHEN gt LIKE '%6max%' OR gt LIKE '%6-max%' THEN '6-max'
+        WHEN gt LIKE '%2max%' OR gt LIKE '%2-max%' THEN '2-max'
+        WHEN gt LIKE '%9max%' OR gt LIKE '%9-max%' THEN '9-max'
+        WHEN gt LIKE '%3max%' OR gt LIKE '%3-max%' THEN '3-max'
+        WHEN gt LIKE '%heads%' OR gt LIKE '%hu%' THEN '2-max'
+        WHEN p_number_of_players = 2 THEN '2-max'
+        WHEN p_number_of_players = 3 THEN '3-max'
+        WHEN p_number_of_players = 6 THEN '6-max'
+        WHEN p_number_of_players = 9 THEN '9-max'
+        ELSE '6-max'
+    END;
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
+
+CREATE OR REPLACE FUNCTION hand_histories_classify_format()
+RETURNS TRIGGER AS $$
+DECLARE
+    f RECORD;
+BEGIN
+    IF NEW.game_class IS NULL OR NEW.game_variant IS NULL OR NEW.table_size IS NULL THEN
+        SELECT * INTO f FROM classify_game_format(NEW.game_type, NEW.number_of_players);
+        NEW.game_class := coalesce(NEW.game_class, f.game_class);
+        NEW.game_variant := coalesce(NEW.game_variant, f.game_variant);
+        NEW.table_size := coalesce(NEW.table_size, f.table_size);
+    END IF;
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_hand_histories_format ON hand_histories;
+CREATE TRIGGER trg_hand_histories_format
+    BEFORE INSERT ON hand_histories
+    FOR EACH ROW EXECUTE FUNCTION hand_histories_classify_format();
+"""
+
+
+def run_migration():
+    """Create classify_game_format and the insert trigger."""
+    print("=== Migration: Creating Game Format Trigger ===")
+
+    db = None
+    try:
+        db = DatabaseAccess(**DB_PARAMS)
+
+        with db.conn.cursor() as cur:
+            # Step 1: Function and trigger
+            print("Step 1: Creating classify_game_format and insert trigger...")
+            cur.execute(CREATE_FUNCTION)
+            print("[OK] Function and trigger created")
+
+            # Step 2: Compare with the Python classification on the formats in use
+            print("\nStep 2: Checking classify_game_format against extract_format_details...")
+            cur.execute("""
+                SELECT p.game_type, p.number_of_players, f.game_class, f.game_variant, f.table_size
+                FROM (SELECT DISTINCT game_type, number_of_players FROM hand_histories) p,
+                     LATERAL classify_game_format(p.game_type, p.number_of_players) f
+            """)
+            mismatches = 0
+            for game_type, number_of_players, *sql_format in cur.fetchall():
+                details = extract_format_details(game_type, number_of_players)
+                expected = [details['game_class'], details['game_variant'], details['table_size']]
+                if sql_format != expected:
+                    mismatches += 1
+                    print(f"[ERROR] {game_type} ({number_of_players} players): SQL {sql_format}, Python {expected}")
+            if mismatches:
+                raise Exception(f"{mismatches} formats classified differently in SQL and Python")
+            print("[OK] SQL and Python classifications agree")
+
+        db.conn.commit()
+        print("\n[OK] Migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"[ERROR] Migration failed: {e}")
+        if db and db.conn:
+            db.conn.rollback()
+        return False
+    finally:
+        if db:
+            db.close()
+
+
+def rollback_migration():
+    """Drop the trigger and functions."""
+    print("=== Rollback: Removing Game Format Trigger ===")
+    db = None
+    try:
+        db = DatabaseAccess(**DB_PARAMS)
+        with db.conn.cursor() as cur:
+            cur.execute("DROP TRIGGER IF EXISTS trg_hand_histories_format ON hand_histories")
+            cur.execute("DROP FUNCTION IF EXISTS hand_histories_classify_format()")
+            cur.execute("DROP FUNCTION IF EXISTS classify_game_format(TEXT, INT)")
+        db.conn.commit()
+        print("[OK] Rollback completed successfully!")
+        return True
+    except Exception as e:
+        print(f"[ERROR] Rollback failed: {e}")
+        if db and db.conn:
+            db.conn.rollback()
+        return False
+    finally:
+        if db:
+            db.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--rollback":
+        success = rollback_migration()
+    else:
+        success = run_migration()
+
+    sys.exit(0 if success else 1)
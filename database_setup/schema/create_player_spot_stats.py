@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Migration: Create the player_spot_stats summary table.
+
+player_spot_stats holds VPIP, PFR, 3-bet, c-bet, fold-to-c-bet and WTSD counts
+per player and poker_spots spot (see scripts/player_spot_stats.py), so a
+player's stats are a primary-key lookup however many hands are stored.
+
+The table is maintained incrementally: DatabaseAccess.refresh_player_spot_stats
+adds the hands past the stats_watermarks entry. Run --refresh after each ingest
+batch; run --rebuild after spot definitions change, since hands are assigned to
+spots when they are counted.
+
+Usage:
+    python create_player_spot_stats.py             # create tables and count all hands
+    python create_player_spot_stats.py --refresh   # add hands ingested since the last refresh
+    python create_player_spot_stats.py --rebuild   # recount all hands
+    python create_player_spot_stats.py --rollback  # drop the tables
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from scripts.db_access import DatabaseAccess
+from scripts.config import DB_PARAMS
+from scripts.player_spot_stats import CREATE_PLAYER_SPOT_STATS
+
+
+def refresh(rebuild=False):
+    """Add new hands to player_spot_stats (or recount everything)."""
+    db = None
+    try:
+        db = DatabaseAccess(**DB_PARAMS)
+        started = time.time()
+        hands = db.refresh_player_spot_stats(rebuild=rebuild)
+        if hands is False:
+            return False
+        print(f"[OK] Counted {hands} hands in {time.time() - started:.1f}s")
+        return True
+    finally:
+        if db:
+            db.close()
+
+
+def run_migration():
+    """Create player_spot_stats and stats_watermarks, then count all hands."""
+    print("=== Migration: Creating player_spot_stats Summary Table ===")
+
+    db = None
+    try:
+        db = DatabaseAccess(**DB_PARAMS)
+
+        # Step 1: Create tables
+        print("Step 1: Creating player_spot_stats and stats_watermarks tables...")
+        with db.conn.cursor() as cur:
+            cur.execute(CREATE_PLAYER_SPOT_STATS)
+        db.conn.commit()
+        print("[OK] Tables created")
+
+    except Exception as e:
+        print(f"[ERROR] Migration failed: {e}")
+        if db and db.conn:
+            db.conn.rollback()
+        return False
+    finally:
+        if db:
+            db.close()
+
+    # Step 2: Count existing hands (committed per batch, so it resumes if interrupted)
+    print("\nStep 2: Counting existing hands (this may take a while)...")
+    if not refresh():
+        return False
+    print("\n[OK] Migration completed successfully!")
+    return True
+
+
+def rollback_migration():
+    """Drop player_spot_stats and its watermark."""
+    print("=== Rollback: Removing player_spot_stats ===")
+    db = None
+    try:
+        db = DatabaseAccess(**DB_PARAMS)
+        with db.conn.cursor() as cur:
+            cur.execute("DROP TABLE IF EXISTS player_spot_stats")
+            cur.execute("DELETE FROM stats_watermarks WHERE stat_name = 'player_spot_stats'")
+        db.conn.commit()
+        print("[OK] Rollback completed successfully!")
+        return True
+    except Exception as e:
+        print(f"[ERROR] Rollback failed: {e}")
+        if db and db.conn:
+            db.conn.rollback()
+        return False
+    finally:
+        if db:
+            db.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--rollback":
+        success = rollback_migration()
+    elif len(sys.argv) > 1 and sys.argv[1] == "--refresh":
+        success = refresh()
+    elif len(sys.argv) > 1 and sys.argv[1] == "--rebuild":
+        success = refresh(rebuild=True)
+    else:
+        success = run_migration()
+
+    sys.exit(0 if success else 1)
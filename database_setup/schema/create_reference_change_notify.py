@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+import psycopg2
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..', 'scripts'))
+from config import DB_PARAMS
+
+# Tables whose changes should refresh the cached dropdown data in the UI
+REFERENCE_TABLES = [
+    "game_profiles",
+    "poker_spots",
+    "spot_rules",
+    "spot_profile_links",
+    "action_patterns",
+    "hand_state",
+]
+
+def create_reference_change_notify(conn):
+    """Create triggers that NOTIFY reference_data_changed with the table name on every change"""
+    create_function_sql = """
+    CREATE OR REPLACE FUNCTION notify_reference_data_changed()
+    RETURNS TRIGGER AS $$
+    BEGIN
+        PERFORM pg_notify('reference_data_changed', TG_TABLE_NAME);
+        RETURN NULL;
+    END;
+    $$ LANGUAGE plpgsql;
+    """
+
+    with conn.cursor() as cur:
+        cur.execute(create_function_sql)
+        for table in REFERENCE_TABLES:
+            # Statement-level, so a bulk edit sends one notification (duplicates are merged at commit)
+            cur.execute(f"DROP TRIGGER IF EXISTS trg_{table}_reference_notify ON {table};")
+            cur.execute(f"""
+            CREATE TRIGGER trg_{table}_reference_notify
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON {table}
+            FOR EACH STATEMENT EXECUTE FUNCTION notify_reference_data_changed();
+            """)
+            print(f"Created change notification trigger on {table}")
+    conn.commit()
+
+def main():
+    conn = psycopg2.connect(**DB_PARAMS)
+    try:
+        create_reference_change_notify(conn)
+        print("Database migration completed successfully.")
+    except Exception as e:
+        print("Error during migration:", e)
+    finally:
+        conn.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Migration: Create the sequence_daily_stats summary table.
+
+sequence_daily_stats holds hand counts per day, format and street for every
+action sequence (preflop, flop, turn, river). The Sequence Frequencies view
+sums it over a time window, which is fast enough to re-query interactively.
+
+DatabaseAccess.refresh_sequence_daily_stats (the view's Refresh button, or
+--refresh below) recomputes every day from the oldest hand ingested since the
+previous refresh (tracked in stats_watermarks), plus the last few days to pick
+up format columns that were backfilled after ingest.
+
+Usage:
+    python create_sequence_daily_stats.py              # create table and build all history
+    python create_sequence_daily_stats.py --refresh 3  # recompute changed days and at least the last 3
+    python create_sequence_daily_stats.py --rollback   # drop the table
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from scripts.db_access import DatabaseAccess
+from scripts.config import DB_PARAMS
+
+
+def run_migration():
+    """Create sequence_daily_stats and build it from all of hand_histories."""
+    print("=== Migration: Creating sequence_daily_stats Summary Table ===")
+
+    db = None
+    try:
+        db = DatabaseAccess(**DB_PARAMS)
+
+        # Step 1: Create table
+        print("Step 1: Creating sequence_daily_stats table...")
+        with db.conn.cursor() as cur:
+            cur.execute("""
+                CREATE TABLE IF NOT EXISTS sequence_daily_stats (
+                    stat_date DATE NOT NULL,
+                    game_type VARCHAR(50),
+                    game_class VARCHAR(20),
+                    game_variant VARCHAR(20),
+                    table_size VARCHAR(10),
+                    street VARCHAR(10) NOT NULL,
+                    action_seq TEXT NOT NULL,
+                    hand_count BIGINT NOT NULL
+                )
+            """)
+            cur.execute("""
+                CREATE INDEX IF NOT EXISTS idx_sequence_daily_stats_street_date
+                ON sequence_daily_stats (street, stat_date)
+            """)
+        db.conn.commit()
+        print("[OK] sequence_daily_stats table created")
+
+        # Step 2: Build from all history
+        print("\nStep 2: Building daily counts from hand_histories (this may take a while)...")
+        rows = db.refresh_sequence_daily_stats(days=None)
+        if rows is False:
+            raise RuntimeError("Initial build failed")
+        print(f"[OK] Inserted {rows} summary rows")
+
+        print("\n[OK] Migration completed successfully!")
+        return True
+
+    except Exception as e:
+        print(f"[ERROR] Migration failed: {e}")
+        if db and db.conn:
+            db.conn.rollback()
+        return False
+    finally:
+        if db:
+            db.close()
+
+
+def refresh_recent(days):
+    """Recompute the changed days of sequence_daily_stats, and at least the last `days` days."""
+    db = None
+    try:
+        db = DatabaseAccess(**DB_PARAMS)
+        rows = db.refresh_sequence_daily_stats(days=days)
+        if rows is False:
+            return False
+        print(f"[OK] Refreshed sequence_daily_stats ({rows} summary rows)")
+        return True
+    finally:
+        if db:
+            db.close()
+
+
+def rollback_migration():
+    """Drop sequence_daily_stats."""
+    print("=== Rollback: Removing sequence_daily_stats ===")
+    db = None
+    try:
+        db = DatabaseAccess(**DB_PARAMS)
+        with db.conn.cursor() as cur:
+            cur.execute("DROP TABLE IF EXISTS sequence_daily_stats")
+            cur.execute("SELECT to_regclass('stats_watermarks')")
+            if cur.fetchone()[0]:
+                cur.execute("DELETE FROM stats_watermarks WHERE stat_name = 'sequence_daily_stats'")
+        db.conn.commit()
+        print("[OK] Rollback completed successfully!")
+        return True
+    except Exception as e:
+        print(f"[ERROR] Rollback failed: {e}")
+        if db and db.conn:
+            db.conn.rollback()
+        return False
+    finally:
+        if db:
+            db.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--rollback":
+        success = rollback_migration()
+    elif len(sys.argv) > 1 and sys.argv[1] == "--refresh":
+        success = refresh_recent(int(sys.argv[2]) if len(sys.argv) > 2 else 2)
+    else:
+        success = run_migration()
+
+    sys.exit(0 if success else 1)
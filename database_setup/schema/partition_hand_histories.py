@@ -0,0 +1,358 @@
+#!/usr/bin/env python3
+"""
+Opt-in migration that converts hand_histories and hand_actions into tables
+range-partitioned by month on created_at.
+
+Time-windowed explorer queries (created_at >= NOW() - INTERVAL ...) then only
+touch the partitions covering the window, and old months can be detached and
+moved to cold storage with --detach.
+
+The original tables are kept as *_unpartitioned until you drop them manually.
+
+Usage:
+    python partition_hand_histories.py                  # run the migration
+    python partition_hand_histories.py --create-future 3  # create partitions for the next 3 months
+    python partition_hand_histories.py --detach 2024-01   # detach January 2024 from both tables
+    python partition_hand_histories.py --rollback       # restore the unpartitioned tables
+"""
+
+import sys
+import os
+import re
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from scripts.db_access import DatabaseAccess
+from scripts.config import DB_PARAMS
+
+PARTITIONED_TABLES = ["hand_histories", "hand_actions"]
+
+# Creates one partition per month for every partitioned table in [start_month, end_month].
+# Safe to call repeatedly; existing partitions are skipped.
+CREATE_PARTITION_FUNCTION = """
+CREATE OR REPLACE FUNCTION create_hand_history_partitions(start_month DATE, end_month DATE)
+RETURNS INT AS $$
+DECLARE
+    m DATE := date_trunc('month', start_month)::date;
+    tbl TEXT;
+    part TEXT;
+    created INT := 0;
+BEGIN
+    WHILE m <= end_month LOOP
+        FOREACH tbl IN ARRAY ARRAY['hand_histories', 'hand_actions'] LOOP
+            part := format('%s_y%sm%s', tbl, to_char(m, 'YYYY'), to_char(m, 'MM'));
+            IF to_regclass(part) IS NULL THEN
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                    part, tbl, m, (m + INTERVAL '1 month')::date
+                );
+                created := created + 1;
+            END IF;
+        END LOOP;
+        m := (m + INTERVAL '1 month')::date;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Partitioned tables cannot be the target of a foreign key on id alone, so the
+# ON DELETE CASCADE behaviour of hand_reviews/hand_notes/hand_actions is kept by a trigger.
+CREATE_CASCADE_TRIGGER = """
+CREATE OR REPLACE FUNCTION hand_histories_cascade_delete()
+RETURNS TRIGGER AS $$
+BEGIN
+    DELETE FROM hand_actions WHERE hand_history_id = OLD.id;
+    DELETE FROM hand_reviews WHERE hand_id = OLD.id;
+    DELETE FROM hand_notes WHERE hand_id = OLD.id;
+    RETURN OLD;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_hand_histories_cascade_delete ON hand_histories;
+CREATE TRIGGER trg_hand_histories_cascade_delete
+    AFTER DELETE ON hand_histories
+    FOR EACH ROW EXECUTE FUNCTION hand_histories_cascade_delete();
+"""
+
+
+def partition_name(table, year, month):
+    """Return the partition name used for a table and month, e.g. hand_histories_y2024m01."""
+    return f"{table}_y{year:04d}m{month:02d}"
+
+
+def is_partitioned(cur, table):
+    """Return True if the table exists and is already a partitioned table."""
+    cur.execute("SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)", (table,))
+    row = cur.fetchone()
+    return bool(row) and row[0] == 'p'
+
+
+def _get_columns(cur, table):
+    cur.execute("""
+        SELECT column_name
+        FROM information_schema.columns
+        WHERE table_name = %s
+        ORDER BY ordinal_position
+    """, (table,))
+    return [row[0] for row in cur.fetchall()]
+
+
+def _copy_secondary_indexes(cur, old_table, new_table):
+    """Recreate the non-unique indexes of old_table on new_table."""
+    cur.execute("SELECT indexname, indexdef FROM pg_indexes WHERE tablename = %s", (old_table,))
+    for index_name, index_def in cur.fetchall():
+        if "UNIQUE" in index_def:
+            continue  # Unique indexes must include created_at on a partitioned table
+        new_def = re.sub(r"ON (\w+\.)?" + old_table + r"\b", f"ON {new_table}", index_def)
+        new_def = new_def.replace(f"INDEX {index_name} ", f"INDEX IF NOT EXISTS {index_name}_part ", 1)
+        cur.execute(new_def)
+        print(f"[OK] Recreated index {index_name}_part on {new_table}")
+
+
+def _drop_foreign_keys_to(cur, table):
+    """Drop every foreign key that references table and return (table, constraint) pairs."""
+    cur.execute("""
+        SELECT conrelid::regclass::text, conname
+        FROM pg_constraint
+        WHERE contype = 'f' AND confrelid = to_regclass(%s)
+    """, (table,))
+    dropped = cur.fetchall()
+    for referencing_table, constraint in dropped:
+        cur.execute(f'ALTER TABLE {referencing_table} DROP CONSTRAINT "{constraint}"')
+        print(f"[OK] Dropped foreign key {constraint} on {referencing_table}")
+    return dropped
+
+
+def run_migration(months_ahead=3):
+    """Convert hand_histories and hand_actions to monthly range partitions on created_at."""
+    print("=== Migration: Partitioning hand_histories and hand_actions by Month ===")
+
+    db = None
+    try:
+        db = DatabaseAccess(**DB_PARAMS)
+
+        with db.conn.cursor() as cur:
+            if is_partitioned(cur, "hand_histories"):
+                print("[INFO] hand_histories is already partitioned. Nothing to do.")
+                return True
+
+            # Step 1: Remove foreign keys that cannot point at a partitioned table
+            print("Step 1: Dropping foreign keys that reference hand_histories...")
+            _drop_foreign_keys_to(cur, "hand_histories")
+
+            # Step 2: Move the existing tables out of the way
+            print("\nStep 2: Renaming existing tables...")
+            for table in PARTITIONED_TABLES:
+                cur.execute(f"ALTER TABLE {table} RENAME TO {table}_unpartitioned")
+                print(f"[OK] Renamed {table} to {table}_unpartitioned")
+
+            # Step 3: Create the partitioned parents
+            print("\nStep 3: Creating partitioned tables...")
+            cur.execute("""
+                CREATE TABLE hand_histories (
+                    LIKE hand_histories_unpartitioned INCLUDING DEFAULTS INCLUDING STORAGE,
+                    PRIMARY KEY (id, created_at)
+                ) PARTITION BY RANGE (created_at)
+            """)
+            cur.execute("""
+                CREATE TABLE hand_actions (
+                    LIKE hand_actions_unpartitioned INCLUDING DEFAULTS INCLUDING STORAGE,
+                    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                    PRIMARY KEY (id, created_at)
+                ) PARTITION BY RANGE (created_at)
+            """)
+            for table in PARTITIONED_TABLES:
+                cur.execute(f"ALTER SEQUENCE IF EXISTS {table}_id_seq OWNED BY {table}.id")
+                cur.execute(f"CREATE TABLE IF NOT EXISTS {table}_default PARTITION OF {table} DEFAULT")
+            print("[OK] Created partitioned hand_histories and hand_actions")
+
+            # Step 4: Create monthly partitions covering existing data plus future months
+            print("\nStep 4: Creating monthly partitions...")
+            cur.execute(CREATE_PARTITION_FUNCTION)
+            cur.execute("""
+                SELECT create_hand_history_partitions(
+                    COALESCE((SELECT MIN(created_at) FROM hand_histories_unpartitioned), NOW())::date,
+                    (date_trunc('month', NOW()) + make_interval(months => %s))::date
+                )
+            """, (months_ahead,))
+            print(f"[OK] Created {cur.fetchone()[0]} partitions")
+
+            # Step 5: Copy the data. Rows without created_at go to the epoch so they stay queryable.
+            print("\nStep 5: Copying data into partitions...")
+            columns = _get_columns(cur, "hand_histories_unpartitioned")
+            select_list = ", ".join(
+                "COALESCE(created_at, TIMESTAMP '1970-01-01')" if col == "created_at" else col
+                for col in columns
+            )
+            cur.execute(f"""
+                INSERT INTO hand_histories ({", ".join(columns)})
+                SELECT {select_list} FROM hand_histories_unpartitioned
+            """)
+            print(f"[OK] Copied {cur.rowcount} hands")
+
+            action_columns = _get_columns(cur, "hand_actions_unpartitioned")
+            cur.execute(f"""
+                INSERT INTO hand_actions ({", ".join(action_columns)}, created_at)
+                SELECT {", ".join("a." + col for col in action_columns)}, hh.created_at
+                FROM hand_actions_unpartitioned a
+                JOIN hand_histories hh ON hh.id = a.hand_history_id
+            """)
+            print(f"[OK] Copied {cur.rowcount} actions")
+
+            # Step 6: Indexes and delete cascade
+            print("\nStep 6: Creating indexes and triggers...")
+            _copy_secondary_indexes(cur, "hand_histories_unpartitioned", "hand_histories")
+            _copy_secondary_indexes(cur, "hand_actions_unpartitioned", "hand_actions")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_hand_histories_id ON hand_histories (id)")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_hand_histories_created_at ON hand_histories (created_at DESC)")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_hand_actions_hand_history_id ON hand_actions (hand_history_id)")
+            cur.execute(CREATE_CASCADE_TRIGGER)
+            print("[OK] Indexes and cascade trigger created")
+
+        db.conn.commit()
+
+        print("\n[OK] Migration completed successfully!")
+        print("hand_actions.created_at defaults to NOW(); insert actions in the same transaction as their hand")
+        print("so both rows land in the same month. Once verified, drop the old tables:")
+        for table in PARTITIONED_TABLES:
+            print(f"  DROP TABLE {table}_unpartitioned;")
+        return True
+
+    except Exception as e:
+        print(f"[ERROR] Migration failed: {e}")
+        if db and db.conn:
+            db.conn.rollback()
+        return False
+    finally:
+        if db:
+            db.close()
+
+
+def create_future_partitions(months_ahead=3):
+    """Create partitions from the current month up to months_ahead months from now."""
+    db = None
+    try:
+        db = DatabaseAccess(**DB_PARAMS)
+        with db.conn.cursor() as cur:
+            cur.execute("""
+                SELECT create_hand_history_partitions(
+                    date_trunc('month', NOW())::date,
+                    (date_trunc('month', NOW()) + make_interval(months => %s))::date
+                )
+            """, (months_ahead,))
+            created = cur.fetchone()[0]
+        db.conn.commit()
+        print(f"[OK] Created {created} new partitions")
+        return True
+    except Exception as e:
+        print(f"[ERROR] Could not create partitions: {e}")
+        if db and db.conn:
+            db.conn.rollback()
+        return False
+    finally:
+        if db:
+            db.close()
+
+
+def detach_month(month):
+    """
+    Detach one month (YYYY-MM) from hand_histories and hand_actions.
+
+    The detached tables keep their data and can be dumped with pg_dump and
+    dropped, or re-attached later with ALTER TABLE ... ATTACH PARTITION.
+    """
+    match = re.fullmatch(r"(\d{4})-(\d{2})", month)
+    if not match:
+        print("[ERROR] Month must be given as YYYY-MM")
+        return False
+    year, mon = int(match.group(1)), int(match.group(2))
+
+    db = None
+    try:
+        db = DatabaseAccess(**DB_PARAMS)
+        with db.conn.cursor() as cur:
+            for table in PARTITIONED_TABLES:
+                part = partition_name(table, year, mon)
+                cur.execute("SELECT to_regclass(%s)", (part,))
+                if cur.fetchone()[0] is None:
+                    print(f"[INFO] {part} does not exist, skipping")
+                    continue
+                cur.execute(f"ALTER TABLE {table} DETACH PARTITION {part}")
+                print(f"[OK] Detached {part} from {table}")
+        db.conn.commit()
+        return True
+    except Exception as e:
+        print(f"[ERROR] Could not detach partitions: {e}")
+        if db and db.conn:
+            db.conn.rollback()
+        return False
+    finally:
+        if db:
+            db.close()
+
+
+def rollback_migration():
+    """Restore the unpartitioned tables kept by run_migration."""
+    print("=== Rollback: Restoring Unpartitioned hand_histories and hand_actions ===")
+
+    db = None
+    try:
+        db = DatabaseAccess(**DB_PARAMS)
+        with db.conn.cursor() as cur:
+            cur.execute("SELECT to_regclass('hand_histories_unpartitioned')")
+            if cur.fetchone()[0] is None:
+                print("[ERROR] hand_histories_unpartitioned not found. Cannot roll back.")
+                return False
+
+            for table in PARTITIONED_TABLES:
+                cur.execute(f"ALTER SEQUENCE IF EXISTS {table}_id_seq OWNED BY NONE")
+                cur.execute(f"DROP TABLE IF EXISTS {table} CASCADE")
+                cur.execute(f"ALTER TABLE {table}_unpartitioned RENAME TO {table}")
+                cur.execute(f"ALTER SEQUENCE IF EXISTS {table}_id_seq OWNED BY {table}.id")
+                print(f"[OK] Restored {table}")
+
+            cur.execute("DROP FUNCTION IF EXISTS hand_histories_cascade_delete()")
+            cur.execute("DROP FUNCTION IF EXISTS create_hand_history_partitions(DATE, DATE)")
+
+            # Restore the foreign keys dropped by the migration
+            cur.execute("""
+                ALTER TABLE hand_actions ADD CONSTRAINT hand_actions_hand_history_id_fkey
+                    FOREIGN KEY (hand_history_id) REFERENCES hand_histories(id) ON DELETE CASCADE
+            """)
+            for table in ("hand_reviews", "hand_notes"):
+                cur.execute(f"""
+                    ALTER TABLE {table} ADD CONSTRAINT fk_hand_histories
+                        FOREIGN KEY (hand_id) REFERENCES hand_histories(id) ON DELETE CASCADE
+                """)
+            print("[OK] Restored foreign keys")
+
+        db.conn.commit()
+        print("[OK] Rollback completed successfully!")
+        print("Note: hands ingested after the migration were only written to the partitioned tables.")
+        return True
+
+    except Exception as e:
+        print(f"[ERROR] Rollback failed: {e}")
+        if db and db.conn:
+            db.conn.rollback()
+        return False
+    finally:
+        if db:
+            db.close()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--rollback":
+        success = rollback_migration()
+    elif len(sys.argv) > 1 and sys.argv[1] == "--create-future":
+        months = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+        success = create_future_partitions(months)
+    elif len(sys.argv) > 2 and sys.argv[1] == "--detach":
+        success = detach_month(sys.argv[2])
+    elif len(sys.argv) > 1:
+        print(__doc__)
+        success = False
+    else:
+        success = run_migration()
+
+    sys.exit(0 if success else 1)
@@ -3,6 +3,7 @@ import tkinter as tk
 from tkinter import ttk, filedialog, simpledialog, messagebox
 from scripts.db_access import DatabaseAccess # Fixed import path
 from scripts.config import DB_PARAMS # Fixed import path
+from scripts.gto_file_audit import audit_study_documents, format_report, plan_path_fixes
 
 class RuleEditorWindow(tk.Toplevel):
     def __init__(self, parent, db, rule_data, callback):
@@ -165,6 +166,7 @@ class LibrarianApp(tk.Tk):
         ttk.Button(button_frame, text="Add New Document", command=self.add_new_document).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Remove Document", command=self.remove_document).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Refresh List", command=self.populate_docs_tree).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Audit Files", command=self.audit_document_files).pack(side=tk.LEFT, padx=5)
 
     def build_right_panel(self, parent):
         # --- Tags Section ---
@@ -408,6 +410,39 @@ class LibrarianApp(tk.Tk):
             else:
                 messagebox.showerror("Error", "Failed to remove document.")
 
+    def audit_document_files(self):
+        """Checks every document path against the GTO+ directories and offers to fix moved ones."""
+        self.config(cursor="watch")
+        self.update_idletasks()
+        try:
+            report = audit_study_documents(self.db)
+        finally:
+            self.config(cursor="")
+
+        popup = tk.Toplevel(self)
+        popup.title("File Audit")
+        popup.geometry("800x500")
+        text_frame = ttk.Frame(popup)
+        text_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
+        text_widget = tk.Text(text_frame, wrap=tk.NONE, font=("Courier", 9))
+        scrollbar = ttk.Scrollbar(text_frame, orient=tk.VERTICAL, command=text_widget.yview)
+        text_widget.configure(yscrollcommand=scrollbar.set)
+        text_widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        text_widget.insert("1.0", format_report(report))
+        text_widget.config(state=tk.DISABLED)
+
+        updates = plan_path_fixes(report)
+        if updates and messagebox.askyesno(
+            "Fix Paths", f"Rewrite {len(updates)} moved document paths to their storage paths?", parent=popup
+        ):
+            updated = self.db.update_study_document_paths(updates)
+            if updated is False:
+                messagebox.showerror("Error", "Failed to update paths. No changes were made.", parent=popup)
+            else:
+                messagebox.showinfo("Success", f"Updated {updated} document paths.", parent=popup)
+                self.populate_docs_tree()
+
     def on_close(self):
         self.db.close()
         self.destroy()
@@ -0,0 +1,225 @@
+"""
+Columnar, categorical-coded storage for hand_actions rows.
+
+ActionColumns holds one array per hand_actions column instead of one object per
+action, so frequency, sizing and aggression stats over many hands are a few
+vectorized passes over flat arrays rather than a parse per hand:
+
+    hand_id      int64    hand_histories.id
+    street       int16    code into cols.streets
+    player       int32    code into cols.players
+    action       int16    code into cols.actions
+    bet_amount   float64  NaN where NULL
+    total        float64  NaN where NULL
+    pot_size     float64  NaN where NULL
+    action_order int32
+
+The arrays are NumPy arrays when NumPy is installed and array.array buffers
+otherwise (np.frombuffer turns those into arrays without copying). Rows are
+built with ActionColumnsBuilder, which DatabaseAccess.get_action_columns feeds
+from a server-side cursor.
+"""
+
+from array import array
+from collections import Counter
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+STREETS = ["anteing", "preflop", "flop", "turn", "river"]
+AGGRESSIVE_ACTIONS = ("bet", "raise")
+PASSIVE_ACTIONS = ("call",)
+
+# (column, array typecode) of the categorical-coded columns
+_CODED = (("street", "h"), ("player", "i"), ("action", "h"))
+_NUMERIC = ("bet_amount", "total", "pot_size")
+_NAN = float("nan")
+
+
+class _Categories:
+    """Assigns codes to category values in first-seen order."""
+
+    def __init__(self, initial=()):
+        self.values = list(initial)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+
+    def code(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+
+class ActionColumns:
+    """Column arrays for a set of actions plus the category lists their codes index."""
+
+    def __init__(self, columns, streets, players, actions):
+        self.hand_id = columns["hand_id"]
+        self.street = columns["street"]
+        self.player = columns["player"]
+        self.action = columns["action"]
+        self.bet_amount = columns["bet_amount"]
+        self.total = columns["total"]
+        self.pot_size = columns["pot_size"]
+        self.action_order = columns["action_order"]
+        self.streets = streets
+        self.players = players
+        self.actions = actions
+
+    def __len__(self):
+        return len(self.hand_id)
+
+    def hand_count(self):
+        """Number of distinct hands (rows are ordered by hand, so count the changes)."""
+        if not len(self.hand_id):
+            return 0
+        if np is not None:
+            return int(np.count_nonzero(np.diff(self.hand_id)) + 1)
+        return sum(1 for i in range(1, len(self.hand_id)) if self.hand_id[i] != self.hand_id[i - 1]) + 1
+
+    def street_code(self, street):
+        return self.streets.index(street) if street in self.streets else -1
+
+    def action_codes(self, action_types):
+        return [self.actions.index(a) for a in action_types if a in self.actions]
+
+    def _mask(self, street=None):
+        """Row indices (Python fallback) or boolean mask (NumPy) for one street or all."""
+        code = self.street_code(street) if street else None
+        if np is not None:
+            if code is None:
+                return np.ones(len(self), dtype=bool)
+            return self.street == code
+        if code is None:
+            return range(len(self))
+        return [i for i, s in enumerate(self.street) if s == code]
+
+    def action_frequencies(self, street=None):
+        """
+        Counts of each action type, optionally on one street.
+
+        Returns:
+            dict: action_type -> count, most frequent first.
+        """
+        mask = self._mask(street)
+        if np is not None:
+            counts = np.bincount(self.action[mask], minlength=len(self.actions))
+            pairs = [(self.actions[code], int(n)) for code, n in enumerate(counts) if n]
+        else:
+            pairs = Counter(self.actions[self.action[i]] for i in mask).items()
+        return dict(sorted(pairs, key=lambda p: -p[1]))
+
+    def aggression_by_player(self, street=None, min_actions=1):
+        """
+        Postflop-style aggression factor per player: (bets + raises) / calls.
+
+        Returns:
+            dict: player -> {"aggressive", "passive", "actions", "af"}; af is None without calls.
+        """
+        mask = self._mask(street)
+        aggressive = self.action_codes(AGGRESSIVE_ACTIONS)
+        passive = self.action_codes(PASSIVE_ACTIONS)
+        n_players = len(self.players)
+        if np is not None:
+            players = self.player[mask]
+            acts = self.action[mask]
+            agg = np.bincount(players[np.isin(acts, aggressive)], minlength=n_players)
+            pas = np.bincount(players[np.isin(acts, passive)], minlength=n_players)
+            tot = np.bincount(players, minlength=n_players)
+        else:
+            agg, pas, tot = [0] * n_players, [0] * n_players, [0] * n_players
+            for i in mask:
+                p, a = self.player[i], self.action[i]
+                tot[p] += 1
+                if a in aggressive:
+                    agg[p] += 1
+                elif a in passive:
+                    pas[p] += 1
+
+        result = {}
+        for code, name in enumerate(self.players):
+            if tot[code] < min_actions:
+                continue
+            result[name] = {
+                "aggressive": int(agg[code]),
+                "passive": int(pas[code]),
+                "actions": int(tot[code]),
+                "af": round(agg[code] / pas[code], 2) if pas[code] else None,
+            }
+        return result
+
+    def bet_size_ratios(self, street=None, action_types=AGGRESSIVE_ACTIONS):
+        """
+        Bet size as a fraction of the pot before the action, for the given action types.
+
+        pot_size is the pot after the action, so the pot faced is pot_size - bet_amount.
+        Actions with a NULL amount or no pot before them are skipped.
+
+        Returns:
+            ndarray or list: The ratios, in row order.
+        """
+        codes = self.action_codes(action_types)
+        mask = self._mask(street)
+        if np is not None:
+            pot_before = self.pot_size - self.bet_amount
+            rows = mask & np.isin(self.action, codes) & (pot_before > 0)
+            return self.bet_amount[rows] / pot_before[rows]
+        ratios = []
+        for i in mask:
+            pot_before = self.pot_size[i] - self.bet_amount[i]
+            if self.action[i] in codes and pot_before > 0:  # NaN compares False
+                ratios.append(self.bet_amount[i] / pot_before)
+        return ratios
+
+
+class ActionColumnsBuilder:
+    """
+    Appends hand_actions rows into typed buffers.
+
+    Rows are (hand_history_id, street, player, action_type, bet_amount, total,
+    pot_size, action_order), the order DatabaseAccess.get_action_columns selects.
+    """
+
+    def __init__(self):
+        self._hand_id = array("q")
+        self._codes = {name: array(typecode) for name, typecode in _CODED}
+        self._numeric = {name: array("d") for name in _NUMERIC}
+        self._order = array("i")
+        self._categories = {
+            "street": _Categories(STREETS),
+            "player": _Categories(),
+            "action": _Categories(),
+        }
+
+    def add_rows(self, rows):
+        hand_id, order = self._hand_id, self._order
+        street, player, action = (self._codes[name] for name, _ in _CODED)
+        bet, total, pot = (self._numeric[name] for name in _NUMERIC)
+        street_code = self._categories["street"].code
+        player_code = self._categories["player"].code
+        action_code = self._categories["action"].code
+        for hid, s, p, a, b, t, ps, o in rows:
+            hand_id.append(hid)
+            street.append(street_code(s))
+            player.append(player_code(p))
+            action.append(action_code(a))
+            bet.append(_NAN if b is None else float(b))
+            total.append(_NAN if t is None else float(t))
+            pot.append(_NAN if ps is None else float(ps))
+            order.append(o if o is not None else -1)
+
+    def build(self):
+        """Returns an ActionColumns over the rows added so far."""
+        buffers = {"hand_id": self._hand_id, "action_order": self._order}
+        buffers.update(self._codes)
+        buffers.update(self._numeric)
+        if np is not None:
+            buffers = {name: np.frombuffer(buf, dtype=buf.typecode) if len(buf) else np.array([], dtype=buf.typecode)
+                       for name, buf in buffers.items()}
+        return ActionColumns(buffers,
+                             streets=self._categories["street"].values,
+                             players=self._categories["player"].values,
+                             actions=self._categories["action"].values)
@@ -0,0 +1,133 @@
+"""
+Aggregate decision tree over the normalized action sequences of many hands.
+
+Each hand's pf/flop/turn/river_action_seq (e.g. "1f2f3f4r5f6c" then "6k4b6c")
+is split into actions ("4r" = position 4 raises) and merged into a prefix tree
+keyed by (street, action). Every node counts the hands that reached it, so the
+frequency of an action is its count over its parent's count.
+
+Sequences are consumed one hand at a time from any iterable, so only the tree
+is kept in memory. The tree is capped at max_nodes: once the cap is reached,
+actions that don't have a node yet are counted under their parent's "(other)"
+child instead of growing the tree (so there are at most 2 * max_nodes nodes,
+one "(other)" per existing node at worst).
+
+Position numbers are labelled with seat names only when every hand in the tree
+comes from the same table size with a known naming (from the "6max"/"6-max" in
+its game_type); otherwise they are shown as P1, P2, ...
+"""
+
+import re
+
+STREETS = ("preflop", "flop", "turn", "river")
+POSITION_NAMES = {"6-max": {1: "UTG", 2: "MP", 3: "CO", 4: "BN", 5: "SB", 6: "BB"}}
+ACTION_NAMES = {"f": "fold", "c": "call", "r": "raise", "k": "check", "b": "bet", "x": "check", "a": "all-in"}
+OTHER = "(other)"
+
+_token = re.compile(r"(\d+)([a-z]+)")
+_table_size = re.compile(r"(\d+)-?max")
+
+
+def tokenize_sequence(sequence):
+    """Splits a normalized sequence into actions: "1f2r3c" -> ["1f", "2r", "3c"]."""
+    if not sequence:
+        return []
+    return [position + action for position, action in _token.findall(sequence)]
+
+
+def table_size_of(game_type):
+    """Table size named in a game_type, e.g. "zoom_6max" -> "6-max", or None."""
+    match = _table_size.search((game_type or "").lower())
+    return f"{match.group(1)}-max" if match else None
+
+
+def describe_action(street, token, table_size=None):
+    """Readable label for a tree key, e.g. ("flop", "6b", "6-max") -> "flop: BB bet"."""
+    if token == OTHER:
+        return OTHER
+    match = _token.fullmatch(token)
+    if not match:
+        return f"{street}: {token}"
+    position, action = int(match.group(1)), match.group(2)
+    names = POSITION_NAMES.get(table_size, {})
+    return f"{street}: {names.get(position, f'P{position}')} {ACTION_NAMES.get(action, action)}"
+
+
+class ActionTreeNode:
+    __slots__ = ("count", "children")
+
+    def __init__(self):
+        self.count = 0
+        self.children = {}      # (street, token) -> ActionTreeNode
+
+    def sorted_children(self):
+        """Children as ((street, token), node) pairs, most common first."""
+        return sorted(self.children.items(), key=lambda item: -item[1].count)
+
+    def ended_here(self):
+        """Hands whose sequence stopped at this node."""
+        return self.count - sum(child.count for child in self.children.values())
+
+
+class ActionTree:
+    """
+    Prefix tree of (street, action) keys with hand counts.
+
+    Args:
+        max_nodes (int): Node budget; see the module docstring.
+    """
+
+    def __init__(self, max_nodes=50000):
+        self.max_nodes = max_nodes
+        self.root = ActionTreeNode()
+        self.node_count = 1
+        self.hands = 0
+        self.truncated = 0      # Actions counted under "(other)" because of the cap
+        self.table_sizes = set()
+
+    @property
+    def table_size(self):
+        """The table size shared by every hand, or None if unknown or mixed."""
+        return next(iter(self.table_sizes)) if len(self.table_sizes) == 1 else None
+
+    def add_hand(self, sequences, table_size=None):
+        """Merges one hand, given as its (pf, flop, turn, river) action sequences."""
+        self.hands += 1
+        self.table_sizes.add(table_size)
+        node = self.root
+        node.count += 1
+        for street, sequence in zip(STREETS, sequences):
+            for token in tokenize_sequence(sequence):
+                key = (street, token)
+                child = node.children.get(key)
+                if child is None:
+                    if self.node_count >= self.max_nodes:
+                        self.truncated += 1
+                        key = (street, OTHER)
+                        child = node.children.get(key)
+                    if child is None:
+                        child = node.children[key] = ActionTreeNode()
+                        self.node_count += 1
+                child.count += 1
+                node = child
+                if key[1] == OTHER:
+                    return  # Nothing below "(other)" is tracked
+
+    def add_hands(self, hands):
+        """Merges every hand from an iterable of (pf, flop, turn, river) tuples."""
+        for sequences in hands:
+            self.add_hand(sequences)
+        return self
+
+
+def build_action_tree(rows, max_nodes=50000):
+    """
+    Builds the tree for explorer result rows (id, game_type, pf, flop, turn, river, ...).
+
+    Returns:
+        ActionTree: The merged tree.
+    """
+    tree = ActionTree(max_nodes)
+    for row in rows:
+        tree.add_hand(row[2:6], table_size_of(row[1]))
+    return tree
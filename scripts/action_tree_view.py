@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Decision Tree - A window with the merged action tree of the explorer's current hand set.
+
+Only the root's children are inserted up front. Every node with children gets
+a placeholder row, and its real children are inserted the first time it is
+expanded, so the Treeview holds only what has been opened.
+"""
+
+import tkinter as tk
+from tkinter import ttk
+
+from action_tree import build_action_tree, describe_action
+
+PLACEHOLDER = "..."
+
+class ActionTreeView(tk.Toplevel):
+    def __init__(self, parent, rows, max_nodes=50000):
+        super().__init__(parent)
+        self.tree_data = build_action_tree(rows, max_nodes)
+        self.nodes = {}             # Treeview item -> ActionTreeNode
+
+        self.title(f"Decision Tree ({self.tree_data.hands} hands)")
+        self.geometry("900x700")
+        self.transient(parent)
+
+        self.build_ui()
+        self._insert_children("", self.tree_data.root)
+
+    def build_ui(self):
+        """Build the user interface."""
+        main_frame = ttk.Frame(self, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        tree_frame = ttk.Frame(main_frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(tree_frame, columns=("hands", "freq", "ended"), show="tree headings")
+        self.tree.heading("#0", text="Action")
+        self.tree.heading("hands", text="Hands")
+        self.tree.heading("freq", text="Freq %")
+        self.tree.heading("ended", text="Ended Here")
+        self.tree.column("#0", width=450)
+        self.tree.column("hands", width=90, anchor="e")
+        self.tree.column("freq", width=80, anchor="e")
+        self.tree.column("ended", width=90, anchor="e")
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.bind("<<TreeviewOpen>>", self._on_open)
+
+        status = f"{self.tree_data.node_count} nodes."
+        if self.tree_data.truncated:
+            status += (f" Node limit reached: {self.tree_data.truncated} actions are counted under "
+                       f"'(other)'.")
+        ttk.Label(main_frame, text=status).pack(anchor=tk.W, pady=(5, 0))
+
+    def _insert_children(self, item, node):
+        """Insert a node's children under item, most common first."""
+        for (street, token), child in node.sorted_children():
+            child_item = self.tree.insert(item, tk.END, text=describe_action(street, token, self.tree_data.table_size), values=(
+                child.count, f"{100.0 * child.count / node.count:.1f}", child.ended_here()))
+            self.nodes[child_item] = child
+            if child.children:
+                self.tree.insert(child_item, tk.END, text=PLACEHOLDER)
+
+    def _on_open(self, event):
+        item = self.tree.focus()
+        children = self.tree.get_children(item)
+        if len(children) == 1 and self.tree.item(children[0], "text") == PLACEHOLDER:
+            self.tree.delete(children[0])
+            self._insert_children(item, self.nodes[item])
+
+def open_action_tree_view(parent, rows, max_nodes=50000):
+    """Open the Decision Tree window for explorer result rows."""
+    return ActionTreeView(parent, rows, max_nodes)
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Non-blocking database access for the Tk applications.
+
+AsyncDatabaseAccess runs DatabaseAccess calls on an asyncio event loop in a
+background thread so slow queries don't freeze the window. Each named channel
+(e.g. "query", "study_docs") has its own worker connection and runs one task
+at a time; submitting a new task on a channel cancels the one in flight, both
+client-side and server-side through pg_cancel_backend. Results are delivered
+back on the Tk thread by polling with after().
+
+Usage:
+    async_db = AsyncDatabaseAccess(DB_PARAMS, tk_root=self)
+    async_db.submit(lambda db: db.find_relevant_study_documents(hh_data),
+                    channel="study_docs", callback=self.show_docs)
+"""
+
+import asyncio
+import threading
+import concurrent.futures
+from db_access import DatabaseAccess
+
+
+class _ChannelWorker:
+    """A dedicated connection plus a single-thread executor for one channel."""
+
+    def __init__(self, name, db_params):
+        self.name = name
+        self.db_params = db_params
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"db-{name}")
+        self.db = None
+        self.backend_pid = None
+        self.running_token = None   # Token of the task currently executing on the connection
+        self.lock = threading.Lock()
+
+    def run(self, token, func, args, kwargs):
+        """Executes func(db, *args, **kwargs) on the worker connection (called in the executor thread)."""
+        if self.db is None or not self.db.conn or self.db.conn.closed:
+            self.db = DatabaseAccess(**self.db_params)
+            if not self.db.conn:
+                raise RuntimeError(f"Could not open a database connection for '{self.name}'")
+            self.backend_pid = self.db.conn.get_backend_pid()
+
+        with self.lock:
+            self.running_token = token
+        try:
+            return func(self.db, *args, **kwargs)
+        except Exception:
+            self.db.conn.rollback()
+            raise
+        finally:
+            with self.lock:
+                self.running_token = None
+
+    def close(self):
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        if self.db:
+            self.db.close()
+
+
+class AsyncDatabaseAccess:
+    """
+    Runs DatabaseAccess read paths off the Tk thread.
+
+    Args:
+        db_params (dict): Connection parameters (same as DatabaseAccess).
+        tk_root: Tk widget used to schedule result callbacks with after().
+        poll_ms (int): How often to check for finished tasks while any are pending.
+    """
+
+    def __init__(self, db_params, tk_root=None, poll_ms=50):
+        self.db_params = db_params
+        self.tk_root = tk_root
+        self.poll_ms = poll_ms
+        self._workers = {}
+        self._current = {}      # channel -> token of the most recent submission
+        self._pending = []      # (future, token, channel, callback, error_callback)
+        self._next_token = 0
+        self._control_db = None
+        self._control_lock = threading.Lock()
+        self._polling = False
+
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run_loop, name="async-db-loop", daemon=True)
+        self._thread.start()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def _get_worker(self, channel):
+        if channel not in self._workers:
+            self._workers[channel] = _ChannelWorker(channel, self.db_params)
+        return self._workers[channel]
+
+    async def _run_in_worker(self, worker, token, func, args, kwargs):
+        return await self.loop.run_in_executor(worker.executor, worker.run, token, func, args, kwargs)
+
+    def submit(self, func, *args, channel="default", callback=None, error_callback=None, **kwargs):
+        """
+        Schedules func(db, *args, **kwargs) on the channel's worker connection.
+
+        Any task still running on the same channel is cancelled first. callback(result)
+        or error_callback(exception) is invoked on the Tk thread when the task finishes;
+        results of superseded or cancelled tasks are discarded.
+
+        Returns:
+            concurrent.futures.Future: The future for the task.
+        """
+        self.cancel(channel)
+
+        self._next_token += 1
+        token = self._next_token
+        self._current[channel] = token
+
+        worker = self._get_worker(channel)
+        future = asyncio.run_coroutine_threadsafe(
+            self._run_in_worker(worker, token, func, args, kwargs), self.loop
+        )
+        self._pending.append((future, token, channel, callback, error_callback))
+        self._schedule_poll()
+        return future
+
+    def cancel(self, channel="default", use_connection_cancel=False):
+        """
+        Cancels the most recent task on a channel.
+
+        A task that hasn't started is dropped; a task that is executing has its
+        statement cancelled server-side with pg_cancel_backend, or with the worker
+        connection's own cancel() request if use_connection_cancel is set (this
+        doesn't need the control connection).
+
+        Returns:
+            bool: True if a running statement was asked to cancel on the server.
+        """
+        token = self._current.pop(channel, None)
+        worker = self._workers.get(channel)
+        if token is None or worker is None:
+            return False
+
+        for future, pending_token, *_ in self._pending:
+            if pending_token == token:
+                future.cancel()
+
+        # Hold the worker lock so the connection can't move on to a newer task
+        # between the check and the cancel request.
+        with worker.lock:
+            if worker.running_token != token or worker.backend_pid is None:
+                return False
+            if use_connection_cancel:
+                try:
+                    worker.db.conn.cancel()
+                    return True
+                except Exception as e:
+                    print(f"Error cancelling query on '{channel}': {e}")
+                    return False
+            return self._cancel_backend(worker.backend_pid)
+
+    def cancel_all(self):
+        """Cancels the current task on every channel."""
+        for channel in list(self._current):
+            self.cancel(channel)
+
+    def is_busy(self, channel="default"):
+        """Returns True if the channel has a task that hasn't finished yet."""
+        token = self._current.get(channel)
+        return any(t == token and not f.done() for f, t, *_ in self._pending)
+
+    def _cancel_backend(self, pid):
+        """Issues pg_cancel_backend for pid over a separate control connection."""
+        with self._control_lock:
+            try:
+                if self._control_db is None or not self._control_db.conn or self._control_db.conn.closed:
+                    self._control_db = DatabaseAccess(**self.db_params)
+                if not self._control_db.conn:
+                    return False
+                with self._control_db.conn.cursor() as cur:
+                    cur.execute("SELECT pg_cancel_backend(%s)", (pid,))
+                    cancelled = cur.fetchone()[0]
+                self._control_db.conn.commit()
+                print(f"Cancelled query on backend {pid}: {cancelled}")
+                return bool(cancelled)
+            except Exception as e:
+                print(f"Error cancelling query on backend {pid}: {e}")
+                if self._control_db and self._control_db.conn:
+                    self._control_db.conn.rollback()
+                return False
+
+    def _schedule_poll(self):
+        if self.tk_root is not None and not self._polling:
+            self._polling = True
+            self.tk_root.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        """Delivers finished results on the Tk thread and reschedules itself while work is pending."""
+        self._polling = False
+        still_pending = []
+        for entry in self._pending:
+            future, token, channel, callback, error_callback = entry
+            if not future.done():
+                still_pending.append(entry)
+                continue
+            if future.cancelled() or self._current.get(channel) != token:
+                continue  # Superseded by a newer submission
+            self._current.pop(channel, None)
+            error = future.exception()
+            if error is not None:
+                if error_callback:
+                    error_callback(error)
+                else:
+                    print(f"Error in background query on '{channel}': {error}")
+            elif callback:
+                callback(future.result())
+        self._pending = still_pending
+        if self._pending:
+            self._schedule_poll()
+
+    def close(self):
+        """Cancels outstanding work, closes all connections and stops the event loop."""
+        self.cancel_all()
+        for worker in self._workers.values():
+            worker.close()
+        if self._control_db:
+            self._control_db.close()
+        self.loop.call_soon_threadsafe(self.loop.stop)
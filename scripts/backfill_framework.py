@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""
+Reusable framework for backfilling columns derived from hand_histories rows.
+
+A backfill is described by a BackfillJob: which columns to read, which rows
+still need work, a per-row compute function and the columns it produces.
+run_backfill then:
+    - reads the rows in key order with keyset pagination (WHERE id > last_id),
+      so every page costs the same and only one page is in memory
+    - runs compute over each page in a process pool
+    - COPYs the results into a temp table and applies them with one
+      UPDATE ... FROM (or INSERT ... SELECT for jobs that fill another table)
+    - records the last key in backfill_checkpoints in the same transaction,
+      so an interrupted run resumes where it stopped (an incremental job also
+      keeps it after finishing, so the next run only reads newer keys)
+    - prints throughput per page and overall
+
+compute must be a module-level function (it's pickled to the worker
+processes). It receives the row tuple and returns a tuple of target values,
+or None to leave the row alone. In insert mode it returns a list of tuples,
+one per row to insert, or None if the row couldn't be processed. Rows for
+which compute returns None are counted as skipped.
+
+Example (see database_setup/schema/add_board_card_columns.py):
+    job = BackfillJob(name="board_cards", read_columns=["id", "raw_text"],
+                      where="flop_cards IS NULL AND raw_text LIKE '%*** FLOP ***%'",
+                      compute=compute_board_row,
+                      target_columns=[("flop_cards", "VARCHAR(20)"), ("turn_card", "VARCHAR(3)"),
+                                      ("river_card", "VARCHAR(3)")])
+    run_backfill(job, workers=4)
+"""
+
+import io
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Callable, List, Optional, Tuple
+from concurrent.futures import ProcessPoolExecutor
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from psycopg2 import sql
+from scripts.db_access import DatabaseAccess
+from scripts.config import DB_PARAMS
+
+CREATE_CHECKPOINTS = """
+CREATE TABLE IF NOT EXISTS backfill_checkpoints (
+    job_name VARCHAR(100) PRIMARY KEY,
+    last_key BIGINT,
+    rows_read BIGINT NOT NULL DEFAULT 0,
+    rows_written BIGINT NOT NULL DEFAULT 0,
+    rows_skipped BIGINT NOT NULL DEFAULT 0,
+    started_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    finished_at TIMESTAMP
+);
+ALTER TABLE backfill_checkpoints ADD COLUMN IF NOT EXISTS rows_skipped BIGINT NOT NULL DEFAULT 0;
+"""
+
+
+@dataclass
+class BackfillJob:
+    """
+    Describes one backfill.
+
+    Attributes:
+        name: Checkpoint key; also names the temp table.
+        read_columns: Columns passed to compute; the first must be the key column.
+        compute: Module-level function(row) -> tuple, None, or (insert mode) list of tuples.
+        target_columns: (column, postgres type) pairs that compute produces.
+        where: SQL predicate selecting rows that still need work (None = all rows).
+        table: Table to read (and update in update mode).
+        mode: "update" to update the read table by key, "insert" to insert into insert_table.
+        insert_table: Destination table for insert mode.
+        on_conflict: Optional ON CONFLICT clause for insert mode, e.g. "DO NOTHING".
+        incremental: Keep the last key when a run finishes, so the next run only reads rows
+            with higher keys (for tables that only grow, where a finished key never needs work).
+    """
+    name: str
+    read_columns: List[str]
+    compute: Callable
+    target_columns: List[Tuple[str, str]]
+    where: Optional[str] = None
+    table: str = "hand_histories"
+    mode: str = "update"
+    insert_table: Optional[str] = None
+    on_conflict: Optional[str] = None
+    incremental: bool = False
+    key_column: str = field(init=False)
+
+    def __post_init__(self):
+        self.key_column = self.read_columns[0]
+        if self.mode not in ("update", "insert"):
+            raise ValueError(f"Unknown backfill mode: {self.mode}")
+        if self.mode == "insert" and not self.insert_table:
+            raise ValueError("Insert mode needs insert_table")
+
+
+def _copy_value(value):
+    """Formats one value for COPY ... FROM STDIN (text format)."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return (str(value).replace("\\", "\\\\").replace("\t", "\\t")
+            .replace("\n", "\\n").replace("\r", "\\r"))
+
+
+def copy_rows(cur, table, columns, rows):
+    """COPYs row tuples into table (a temp table) in one round trip."""
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_value(v) for v in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    cur.copy_expert(
+        sql.SQL("COPY {} ({}) FROM STDIN").format(
+            sql.Identifier(table), sql.SQL(", ").join(sql.Identifier(c) for c in columns)
+        ).as_string(cur),
+        buffer,
+    )
+
+
+def _compute_page(job, rows, executor, pool_size):
+    if executor is None:
+        return [job.compute(row) for row in rows]
+    chunksize = max(1, len(rows) // (pool_size * 4))
+    return list(executor.map(job.compute, rows, chunksize=chunksize))
+
+
+def _load_checkpoint(cur, job, restart):
+    if restart:
+        cur.execute("DELETE FROM backfill_checkpoints WHERE job_name = %s", (job.name,))
+    cur.execute(
+        "SELECT last_key, rows_read, rows_written, rows_skipped, finished_at "
+        "FROM backfill_checkpoints WHERE job_name = %s",
+        (job.name,))
+    row = cur.fetchone()
+    if row is None or row[4] is not None:
+        # New run (or the previous one finished): start from the beginning, or for an
+        # incremental job from the previous run's last key
+        last_key = row[0] if row is not None and job.incremental else None
+        cur.execute("""
+            INSERT INTO backfill_checkpoints (job_name, last_key, rows_read, rows_written, rows_skipped)
+            VALUES (%s, %s, 0, 0, 0)
+            ON CONFLICT (job_name) DO UPDATE
+                SET last_key = EXCLUDED.last_key, rows_read = 0, rows_written = 0, rows_skipped = 0,
+                    started_at = NOW(), updated_at = NOW(), finished_at = NULL
+        """, (job.name, last_key))
+        if last_key is not None:
+            print(f"Continuing after {job.key_column} {last_key} (previous run finished)")
+        return last_key, 0, 0, 0
+    return row[0], row[1], row[2], row[3]
+
+
+def run_backfill(job, page_size=5000, workers=None, restart=False, db_params=DB_PARAMS):
+    """
+    Runs a backfill job to completion, resuming from its checkpoint.
+
+    Args:
+        job (BackfillJob): What to backfill.
+        page_size (int): Rows read, computed and written per transaction.
+        workers (int): Processes for compute (None = CPU count, 0 = compute in this process).
+        restart (bool): Ignore an unfinished checkpoint and start from the beginning.
+        db_params (dict): Connection parameters.
+
+    Returns:
+        dict: {"rows_read", "rows_written", "rows_skipped", "seconds"} or None if the backfill failed.
+    """
+    print(f"=== Backfill: {job.name} ===")
+    db = None
+    executor = None
+    started = time.time()
+    try:
+        db = DatabaseAccess(**db_params)
+        if not db.conn:
+            return None
+
+        temp_table = f"backfill_{job.name}"
+        temp_columns = ([job.key_column] if job.mode == "update" else []) + [c for c, _ in job.target_columns]
+        temp_types = ([(job.key_column, "BIGINT")] if job.mode == "update" else []) + list(job.target_columns)
+
+        with db.conn.cursor() as cur:
+            cur.execute(CREATE_CHECKPOINTS)
+            last_key, rows_read, rows_written, rows_skipped = _load_checkpoint(cur, job, restart)
+            cur.execute(sql.SQL("CREATE TEMP TABLE IF NOT EXISTS {} ({}) ON COMMIT DELETE ROWS").format(
+                sql.Identifier(temp_table),
+                sql.SQL(", ").join(sql.SQL("{} {}").format(sql.Identifier(c), sql.SQL(t)) for c, t in temp_types)))
+        db.conn.commit()
+        if last_key is not None and rows_read:
+            print(f"Resuming after {job.key_column} {last_key} ({rows_read} rows already read)")
+
+        read_query = sql.SQL("SELECT {} FROM {} WHERE {} > %s{} ORDER BY {} LIMIT %s").format(
+            sql.SQL(", ").join(sql.Identifier(c) for c in job.read_columns),
+            sql.Identifier(job.table),
+            sql.Identifier(job.key_column),
+            # where is literal SQL, so its % signs are escaped before the parameters are bound
+            sql.SQL(f" AND ({job.where.replace('%', '%%')})" if job.where else ""),
+            sql.Identifier(job.key_column))
+        if job.mode == "update":
+            apply_query = sql.SQL("UPDATE {} t SET {} FROM {} s WHERE t.{} = s.{}").format(
+                sql.Identifier(job.table),
+                sql.SQL(", ").join(sql.SQL("{} = s.{}").format(sql.Identifier(c), sql.Identifier(c))
+                                   for c, _ in job.target_columns),
+                sql.Identifier(temp_table), sql.Identifier(job.key_column), sql.Identifier(job.key_column))
+        else:
+            target = sql.SQL(", ").join(sql.Identifier(c) for c, _ in job.target_columns)
+            apply_query = sql.SQL("INSERT INTO {} ({}) SELECT {} FROM {}{}").format(
+                sql.Identifier(job.insert_table), target, target, sql.Identifier(temp_table),
+                sql.SQL(f" ON CONFLICT {job.on_conflict}" if job.on_conflict else ""))
+
+        pool_size = workers or os.cpu_count() or 1
+        if workers != 0:
+            executor = ProcessPoolExecutor(max_workers=pool_size)
+
+        run_read = run_written = run_skipped = 0
+        while True:
+            page_started = time.time()
+            with db.conn.cursor() as cur:
+                # BIGINT minimum stands in for "no checkpoint yet"
+                cur.execute(read_query, (last_key if last_key is not None else -2**63, page_size))
+                rows = cur.fetchall()
+                if not rows:
+                    break
+
+                results = _compute_page(job, rows, executor, pool_size)
+                if job.mode == "update":
+                    output = [(row[0],) + tuple(result) for row, result in zip(rows, results) if result is not None]
+                else:
+                    output = [tuple(r) for result in results if result for r in result]
+
+                skipped = sum(1 for result in results if result is None)
+                if output:
+                    copy_rows(cur, temp_table, temp_columns, output)
+                    cur.execute(apply_query)
+                last_key = rows[-1][0]
+                run_read += len(rows)
+                run_written += len(output)
+                run_skipped += skipped
+                cur.execute("""
+                    UPDATE backfill_checkpoints
+                    SET last_key = %s, rows_read = rows_read + %s, rows_written = rows_written + %s,
+                        rows_skipped = rows_skipped + %s, updated_at = NOW()
+                    WHERE job_name = %s
+                """, (last_key, len(rows), len(output), skipped, job.name))
+            db.conn.commit()
+
+            elapsed = time.time() - started
+            page_rate = len(rows) / max(time.time() - page_started, 1e-9)
+            print(f"  {rows_read + run_read} read, {rows_written + run_written} written, "
+                  f"{rows_skipped + run_skipped} skipped (page {page_rate:.0f} rows/s, overall {run_read / max(elapsed, 1e-9):.0f} rows/s)")
+            if len(rows) < page_size:
+                break
+
+        with db.conn.cursor() as cur:
+            cur.execute("UPDATE backfill_checkpoints SET finished_at = NOW() WHERE job_name = %s", (job.name,))
+        db.conn.commit()
+
+        seconds = time.time() - started
+        print(f"[OK] {job.name}: read {run_read} rows, wrote {run_written}, skipped {run_skipped} "
+              f"in {seconds:.1f}s")
+        return {"rows_read": run_read, "rows_written": run_written, "rows_skipped": run_skipped,
+                "seconds": seconds}
+
+    except Exception as e:
+        print(f"[ERROR] Backfill {job.name} failed: {e}")
+        if db and db.conn:
+            db.conn.rollback()
+        return None
+    finally:
+        if executor is not None:
+            executor.shutdown()
+        if db:
+            db.close()
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Bet-sizing distributions over hand_actions.
+
+Answers questions like "what sizes does villain use when c-betting the flop in
+spot 37": bets and raises are expressed as a fraction of the pot they faced
+(bet_amount / (pot_size - bet_amount), since pot_size is the pot after the
+action), then grouped by any of street, player, position and preflop spot.
+Each group gets a count, mean, percentiles and a histogram, all from one
+grouped aggregate: width_bucket assigns the histogram bin, COUNT(*) FILTER
+counts each bin and percentile_cont computes the percentiles in the same pass.
+
+    - position comes from the hand's positions JSONB (position -> player)
+    - spot is the hand's poker_spots entry (SPOT_FOR_HAND_JOIN, see spot_sql.py)
+    - a c-bet is a flop bet by the last preflop raiser
+
+Results are cached per (hand set, parameters) and reused until hand_actions
+grows, so reopening the popup for the same query costs one MAX(id) lookup.
+"""
+
+import hashlib
+from collections import OrderedDict
+
+from scripts.spot_sql import SPOT_FOR_HAND_JOIN
+
+GROUP_COLUMNS = ("street", "player", "position", "spot")
+DEFAULT_PERCENTILES = (0.25, 0.5, 0.75, 0.9)
+DEFAULT_BUCKETS = 12      # Bins of MAX_RATIO / DEFAULT_BUCKETS pot, plus one overflow bin
+MAX_RATIO = 1.5
+
+SIZING_QUERY = """
+WITH pf_aggressor AS (
+    SELECT DISTINCT ON (hand_history_id) hand_history_id, player
+    FROM hand_actions
+    WHERE street = 'preflop' AND action_type = 'raise' {aggressor_filter}
+    ORDER BY hand_history_id, action_order DESC
+),
+sized AS (
+    SELECT ha.street,
+           ha.player,
+           (SELECT pos.key FROM jsonb_each_text(hh.positions) pos WHERE pos.value = ha.player LIMIT 1) AS position,
+           spot.spot_name AS spot,
+           (ha.bet_amount / (ha.pot_size - ha.bet_amount))::float8 AS ratio
+    FROM hand_actions ha
+    JOIN hand_histories hh ON hh.id = ha.hand_history_id
+    LEFT JOIN pf_aggressor pa ON pa.hand_history_id = ha.hand_history_id
+    {spot_join}
+    WHERE ha.action_type = ANY(%(action_types)s)
+      AND ha.bet_amount > 0
+      AND ha.pot_size > ha.bet_amount
+      {conditions}
+)
+SELECT {group_select}
+       COUNT(*),
+       AVG(ratio),
+       percentile_cont(%(percentiles)s::float8[]) WITHIN GROUP (ORDER BY ratio),
+       ARRAY[{histogram}]
+FROM (SELECT *, width_bucket(ratio, 0, %(max_ratio)s, %(buckets)s) AS bucket FROM sized) s
+{group_by}
+ORDER BY COUNT(*) DESC
+"""
+
+
+def bucket_edges(buckets=DEFAULT_BUCKETS, max_ratio=MAX_RATIO):
+    """Lower edges of the histogram bins; the last bin holds everything from max_ratio up."""
+    return [round(max_ratio * i / buckets, 4) for i in range(buckets + 1)]
+
+
+def get_bet_size_distribution(db, hand_ids=None, group_by=("street",), street=None, player=None,
+                              spot=None, cbet_only=False, action_types=("bet", "raise"),
+                              percentiles=DEFAULT_PERCENTILES, buckets=DEFAULT_BUCKETS, max_ratio=MAX_RATIO):
+    """
+    Bet size / pot distributions for a hand set, grouped in SQL.
+
+    Args:
+        db (DatabaseAccess): Database connection.
+        hand_ids (list): Hands to include (None = all hands).
+        group_by (tuple): Any of GROUP_COLUMNS, in display order (empty = one group).
+        street, player, spot (str): Optional filters on those columns.
+        cbet_only (bool): Only flop bets by the last preflop raiser.
+        action_types (tuple): hand_actions.action_type values counted as sizings.
+        percentiles (tuple): Fractions passed to percentile_cont.
+        buckets (int): Histogram bins between 0 and max_ratio (plus an overflow bin).
+        max_ratio (float): Upper edge of the last regular bin, as a fraction of the pot.
+
+    Returns:
+        list: dicts with the group_by keys plus count, mean, percentiles {fraction: ratio}
+              and histogram (len buckets + 1), largest group first; [] on error.
+    """
+    if not db.conn:
+        print("No database connection.")
+        return []
+    unknown = [c for c in group_by if c not in GROUP_COLUMNS]
+    if unknown:
+        raise ValueError(f"Unknown group_by columns: {unknown}")
+
+    params = {
+        "action_types": list(action_types),
+        "percentiles": list(percentiles),
+        "max_ratio": max_ratio,
+        "buckets": buckets,
+    }
+    conditions = []
+    aggressor_filter = ""
+    if hand_ids is not None:
+        params["hand_ids"] = list(hand_ids)
+        conditions.append("ha.hand_history_id = ANY(%(hand_ids)s::bigint[])")
+        aggressor_filter = "AND hand_history_id = ANY(%(hand_ids)s::bigint[])"
+    if street:
+        params["street"] = street
+        conditions.append("ha.street = %(street)s")
+    if player:
+        params["player"] = player
+        conditions.append("ha.player = %(player)s")
+    if spot:
+        params["spot"] = spot
+        conditions.append("spot.spot_name = %(spot)s")
+    if cbet_only:
+        conditions.append("ha.street = 'flop' AND ha.action_type = 'bet' AND ha.player = pa.player")
+
+    # Bins 1..buckets are the regular ones, buckets + 1 is everything >= max_ratio
+    histogram = ", ".join(f"COUNT(*) FILTER (WHERE bucket = {b})" for b in range(1, buckets + 2))
+    query = SIZING_QUERY.format(
+        spot_join=SPOT_FOR_HAND_JOIN.strip(),
+        aggressor_filter=aggressor_filter,
+        conditions="".join(f"AND {c}\n      " for c in conditions),
+        group_select="".join(f"{c}, " for c in group_by),
+        histogram=histogram,
+        group_by=f"GROUP BY {', '.join(group_by)}" if group_by else "",
+    )
+
+    try:
+        with db.conn.cursor() as cur:
+            cur.execute(query, params)
+            rows = cur.fetchall()
+        db.conn.rollback()  # End the read transaction
+    except Exception as e:
+        print(f"Error computing bet size distribution: {e}")
+        db.conn.rollback()
+        return []
+
+    results = []
+    n = len(group_by)
+    for row in rows:
+        result = dict(zip(group_by, row[:n]))
+        count, mean, values, bins = row[n:]
+        result.update({
+            "count": count,
+            "mean": float(mean) if mean is not None else None,
+            "percentiles": dict(zip(percentiles, (float(v) for v in values or []))),
+            "histogram": list(bins),
+        })
+        results.append(result)
+    return results
+
+
+def actions_watermark(db):
+    """Highest hand_actions id; the cache treats a change as new data."""
+    try:
+        with db.conn.cursor() as cur:
+            cur.execute("SELECT MAX(id) FROM hand_actions")
+            watermark = cur.fetchone()[0]
+        db.conn.rollback()
+        return watermark
+    except Exception as e:
+        print(f"Error reading hand_actions watermark: {e}")
+        db.conn.rollback()
+        return None
+
+
+class BetSizingCache:
+    """
+    Keeps the most recent distributions in memory, keyed by hand set and parameters.
+
+    Entries are stamped with the hand_actions watermark they were computed at and
+    recomputed once new actions arrive.
+    """
+
+    def __init__(self, max_entries=32):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    @staticmethod
+    def key(hand_ids, **params):
+        ids = "all" if hand_ids is None else hashlib.sha1(
+            ",".join(str(i) for i in sorted(hand_ids)).encode()).hexdigest()
+        return (ids,) + tuple(sorted((k, tuple(v) if isinstance(v, (list, tuple)) else v)
+                                     for k, v in params.items()))
+
+    def get(self, db, hand_ids=None, **params):
+        """Returns a cached distribution, computing (and caching) it if missing or stale."""
+        key = self.key(hand_ids, **params)
+        watermark = actions_watermark(db)
+        cached = self._entries.get(key)
+        if cached is not None and watermark is not None and cached[0] == watermark:
+            self._entries.move_to_end(key)
+            return cached[1]
+
+        results = get_bet_size_distribution(db, hand_ids=hand_ids, **params)
+        if watermark is not None:
+            self._entries[key] = (watermark, results)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return results
+
+    def clear(self):
+        self._entries.clear()
+
+
+_cache = BetSizingCache()
+
+
+def get_cached_bet_size_distribution(db, hand_ids=None, **params):
+    """get_bet_size_distribution through the shared BetSizingCache."""
+    return _cache.get(db, hand_ids=hand_ids, **params)
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Bet Sizing - A window with bet size / pot distributions for the explorer's current hand set.
+
+Groups and filters are applied in SQL by bet_sizing_analytics; the window only
+lays out one row per group with its percentiles and a text histogram.
+"""
+
+import tkinter as tk
+from tkinter import ttk
+
+from bet_sizing_analytics import (
+    GROUP_COLUMNS, DEFAULT_PERCENTILES, DEFAULT_BUCKETS, MAX_RATIO,
+    bucket_edges, get_cached_bet_size_distribution
+)
+
+STREETS = ["", "preflop", "flop", "turn", "river"]
+BARS = " ▁▂▃▄▅▆▇█"
+
+def histogram_bar(bins):
+    """One character per bin, scaled to the fullest bin."""
+    peak = max(bins) if bins else 0
+    if not peak:
+        return ""
+    return "".join(BARS[round(count / peak * (len(BARS) - 1))] for count in bins)
+
+class BetSizingView(tk.Toplevel):
+    def __init__(self, parent, db_access, hand_ids, async_db=None):
+        super().__init__(parent)
+        self.db = db_access
+        self.async_db = async_db
+        self.hand_ids = list(hand_ids)
+
+        self.title(f"Bet Sizing ({len(self.hand_ids)} hands)")
+        self.geometry("1000x600")
+        self.transient(parent)
+
+        self.build_ui()
+        self.load_data()
+
+    def build_ui(self):
+        """Build the user interface."""
+        main_frame = ttk.Frame(self, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        # --- Filters ---
+        filter_frame = ttk.LabelFrame(main_frame, text="Filters")
+        filter_frame.pack(fill=tk.X, pady=(0, 10))
+
+        ttk.Label(filter_frame, text="Street:").grid(row=0, column=0, sticky=tk.E, padx=5, pady=5)
+        self.street_var = tk.StringVar(value="flop")
+        ttk.Combobox(filter_frame, textvariable=self.street_var, values=STREETS, state="readonly",
+                     width=10).grid(row=0, column=1, sticky=tk.W, padx=5, pady=5)
+
+        ttk.Label(filter_frame, text="Player:").grid(row=0, column=2, sticky=tk.E, padx=5, pady=5)
+        self.player_var = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=self.player_var, width=20).grid(row=0, column=3, sticky=tk.W, padx=5, pady=5)
+
+        ttk.Label(filter_frame, text="Spot:").grid(row=0, column=4, sticky=tk.E, padx=5, pady=5)
+        self.spot_var = tk.StringVar()
+        ttk.Entry(filter_frame, textvariable=self.spot_var, width=15).grid(row=0, column=5, sticky=tk.W, padx=5, pady=5)
+
+        self.cbet_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(filter_frame, text="C-bets only", variable=self.cbet_var).grid(
+            row=0, column=6, sticky=tk.W, padx=5, pady=5)
+
+        ttk.Label(filter_frame, text="Group by:").grid(row=1, column=0, sticky=tk.E, padx=5, pady=5)
+        self.group_vars = {}
+        for i, column in enumerate(GROUP_COLUMNS):
+            var = tk.BooleanVar(value=column in ("street", "position"))
+            self.group_vars[column] = var
+            ttk.Checkbutton(filter_frame, text=column.title(), variable=var).grid(
+                row=1, column=1 + i, sticky=tk.W, padx=5, pady=5)
+
+        ttk.Button(filter_frame, text="Load", command=self.load_data).grid(row=1, column=6, padx=5, pady=5)
+
+        # --- Results ---
+        tree_frame = ttk.Frame(main_frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(tree_frame, show="headings")
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        edges = bucket_edges()
+        self.status_var = tk.StringVar(value="")
+        ttk.Label(main_frame, textvariable=self.status_var).pack(anchor=tk.W, pady=(5, 0))
+        ttk.Label(main_frame, text=f"Sizes are fractions of the pot faced. Histogram bins: "
+                                   f"{DEFAULT_BUCKETS} of {edges[1]:g} pot from 0 to {MAX_RATIO:g}, "
+                                   f"then {MAX_RATIO:g}+.").pack(anchor=tk.W)
+
+    def _params(self):
+        return {
+            "group_by": tuple(c for c in GROUP_COLUMNS if self.group_vars[c].get()),
+            "street": self.street_var.get() or None,
+            "player": self.player_var.get().strip() or None,
+            "spot": self.spot_var.get().strip() or None,
+            "cbet_only": self.cbet_var.get(),
+        }
+
+    def load_data(self):
+        """Compute (or fetch from the cache) the distribution for the current filters."""
+        params = self._params()
+        self.status_var.set("Loading...")
+        if self.async_db:
+            self.async_db.submit(get_cached_bet_size_distribution, self.hand_ids, channel="bet_sizing",
+                                 callback=lambda results: self.populate_tree(results, params["group_by"]),
+                                 error_callback=lambda e: self.status_var.set(f"Error: {e}"),
+                                 **params)
+        else:
+            self.populate_tree(get_cached_bet_size_distribution(self.db, self.hand_ids, **params), params["group_by"])
+
+    def populate_tree(self, results, group_by):
+        """Lay out one row per group."""
+        if not self.winfo_exists():
+            return
+        percentile_columns = [f"p{int(p * 100)}" for p in DEFAULT_PERCENTILES]
+        columns = list(group_by) + ["count", "mean"] + percentile_columns + ["histogram"]
+        self.tree.delete(*self.tree.get_children())
+        self.tree.configure(columns=columns)
+        for column in columns:
+            self.tree.heading(column, text=column.title() if column in GROUP_COLUMNS else column)
+            anchor = "w" if column in GROUP_COLUMNS or column == "histogram" else "e"
+            width = 200 if column == "histogram" else (130 if column in GROUP_COLUMNS else 60)
+            self.tree.column(column, width=width, anchor=anchor)
+
+        total = 0
+        for result in results:
+            total += result["count"]
+            values = [result.get(c) or "" for c in group_by]
+            values += [result["count"], f"{result['mean']:.2f}" if result["mean"] is not None else ""]
+            values += [f"{result['percentiles'].get(p, 0):.2f}" for p in DEFAULT_PERCENTILES]
+            values.append(histogram_bar(result["histogram"]))
+            self.tree.insert("", tk.END, values=values)
+        self.status_var.set(f"{total} sizings in {len(results)} groups.")
+
+def open_bet_sizing_view(parent, db_access, hand_ids, async_db=None):
+    """Open the Bet Sizing window for a hand set."""
+    return BetSizingView(parent, db_access, hand_ids, async_db)
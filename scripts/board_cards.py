@@ -0,0 +1,51 @@
+"""
+Board card extraction from hand history text.
+
+The regexes here are the single definition of where the board is found in a
+PokerStars hand. They are POSIX-compatible, so the same patterns fill the
+flop_cards, turn_card and river_card columns in SQL (see
+database_setup/schema/add_board_card_columns.py). Code that has a hand loaded
+from hand_histories should use the stored columns; get_flop_cards falls back
+to the text for hands that haven't been backfilled yet.
+"""
+
+import re
+
+FLOP_REGEX = r'\*\*\* FLOP \*\*\* \[([^\]]+)\]'
+TURN_REGEX = r'\*\*\* TURN \*\*\* \[[^\]]+\] \[([^\]]+)\]'
+RIVER_REGEX = r'\*\*\* RIVER \*\*\* \[[^\]]+ [^\]]+\] \[([^\]]+)\]'
+
+# hand_histories columns filled from the regexes, in (flop, turn, river) order
+BOARD_COLUMNS = ("flop_cards", "turn_card", "river_card")
+
+_flop = re.compile(FLOP_REGEX)
+_turn = re.compile(TURN_REGEX)
+_river = re.compile(RIVER_REGEX)
+
+
+def extract_board(raw_text):
+    """
+    Extracts the board from hand history text.
+
+    Returns:
+        tuple: (flop_cards, turn_card, river_card) as stored in hand_histories,
+               e.g. ("Ah Kd 7c", "2s", None); streets that weren't dealt are None.
+    """
+    if not raw_text:
+        return None, None, None
+    matches = [pattern.search(raw_text) for pattern in (_flop, _turn, _river)]
+    return tuple(match.group(1) if match else None for match in matches)
+
+
+def get_flop_cards(hh_data):
+    """
+    Returns the flop as a list of cards (e.g. ["Ah", "Kd", "7c"]), or [] if there is none.
+
+    Uses hh_data.flop_cards when it was set from the stored column and only
+    falls back to scanning hh_data.raw_text.
+    """
+    flop_cards = getattr(hh_data, 'flop_cards', None)
+    if flop_cards:
+        return flop_cards.split() if isinstance(flop_cards, str) else list(flop_cards)
+    flop_text = extract_board(getattr(hh_data, 'raw_text', None))[0]
+    return flop_text.split() if flop_text else []
@@ -47,6 +47,19 @@ GTO_PRIORITY_PATH = GTO_BASE_PATH
 # Processed directory (completed files)
 GTO_PROCESSED_PATH = GTO_BASE_PATH / "processed"
 
+# SQLite file tracking the solver queue (see scripts/solver_queue.py)
+GTO_QUEUE_DB_PATH = GTO_BASE_PATH / "solver_queue.sqlite3"
+
 # File prefix patterns
 GTO_RUNNING_PREFIX = "0 - "
-GTO_PRIORITY_PREFIX_PATTERN = r"^1\.\d+ - "  # Matches "1.x - " where x is any integer 
\ No newline at end of file
+GTO_PRIORITY_PREFIX_PATTERN = r"^1\.\d+ - "  # Matches "1.x - " where x is any integer 
+# Saved explorer states: a JSON file, or a .sqlite/.sqlite3/.db file for the
+# SQLite store (states load by name; saved_states.json is imported on first use)
+SAVED_STATES_FILE = os.environ.get("SAVED_STATES_FILE", "saved_states.json")
+
+# Explorer query limits
+# Statement timeout applied to each explorer query (0 disables the timeout)
+QUERY_STATEMENT_TIMEOUT_SECONDS = int(os.environ.get("QUERY_STATEMENT_TIMEOUT_SECONDS", "60"))
+
+# Planner cost above which the explorer asks for confirmation before running a query
+QUERY_COST_WARNING_THRESHOLD = float(os.environ.get("QUERY_COST_WARNING_THRESHOLD", "1000000"))
@@ -1,5 +1,6 @@
 import psycopg2
 from psycopg2 import sql, OperationalError
+from psycopg2.extras import execute_values
 import re
 import sys
 import os
@@ -9,6 +10,9 @@ import json
 # Add parent directory to path to import board_analyzer
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from board_analyzer import analyze_board
+from scripts.board_cards import get_flop_cards, BOARD_COLUMNS
+from scripts.action_columns import ActionColumnsBuilder
+from scripts.player_spot_stats import PLAYER_STAT_NAMES, PLAYER_SPOT_STATS_BATCH, CREATE_STATS_WATERMARKS
 
 class DatabaseAccess:
     """
@@ -56,6 +60,201 @@ class DatabaseAccess:
             print("Error retrieving hand histories:", e)
             return []
 
+    def iter_hand_histories(self, filters: dict = None, page_size: int = 1000, after: tuple = None,
+                            columns: list = None):
+        """
+        Walks hand_histories newest-first in pages using keyset pagination on (created_at, id).
+
+        Each page is fetched with a WHERE (created_at, id) < (last_created_at, last_id) predicate,
+        so walking deep into the table costs the same as reading the first page (no OFFSET scans)
+        and only one page is held in memory at a time. Hands without a created_at are skipped.
+
+        Args:
+            filters (dict): Optional column -> value equality filters. A list/tuple value
+                matches any of its elements, None matches NULL.
+            page_size (int): Number of rows per page.
+            after (tuple): Optional (created_at, id) cursor; only hands older than it are returned.
+            columns (list): Columns to return (default: all columns).
+
+        Yields:
+            list: A page of row tuples containing the requested columns.
+
+        Raises:
+            Exception: A database error during the walk is raised after the rollback, so a
+                caller can't mistake a failed walk for a finished one.
+        """
+        if not self.conn:
+            print("No database connection.")
+            return
+
+        # created_at and id are needed for the cursor even if the caller didn't ask for them
+        if columns:
+            select_columns = list(columns)
+            extra = [c for c in ("created_at", "id") if c not in select_columns]
+            select_columns += extra
+            created_idx = select_columns.index("created_at")
+            id_idx = select_columns.index("id")
+            select_list = sql.SQL(", ").join(sql.Identifier(c) for c in select_columns)
+            strip = len(extra)
+        else:
+            select_list = sql.SQL("*, created_at AS _cursor_created_at, id AS _cursor_id")
+            created_idx, id_idx = -2, -1
+            strip = 2
+
+        conditions = [sql.SQL("created_at IS NOT NULL")]
+        params = []
+        for column, value in (filters or {}).items():
+            if value is None:
+                conditions.append(sql.SQL("{} IS NULL").format(sql.Identifier(column)))
+            elif isinstance(value, (list, tuple)):
+                conditions.append(sql.SQL("{} = ANY(%s)").format(sql.Identifier(column)))
+                params.append(list(value))
+            else:
+                conditions.append(sql.SQL("{} = %s").format(sql.Identifier(column)))
+                params.append(value)
+
+        cursor_position = after
+        try:
+            while True:
+                page_conditions = list(conditions)
+                page_params = list(params)
+                if cursor_position is not None:
+                    page_conditions.append(sql.SQL("(created_at, id) < (%s, %s)"))
+                    page_params.extend(cursor_position)
+
+                query = sql.SQL(
+                    "SELECT {} FROM hand_histories WHERE {} ORDER BY created_at DESC, id DESC LIMIT %s"
+                ).format(select_list, sql.SQL(" AND ").join(page_conditions))
+
+                with self.conn.cursor() as cur:
+                    cur.execute(query, page_params + [page_size])
+                    rows = cur.fetchall()
+
+                if not rows:
+                    return
+
+                last = rows[-1]
+                cursor_position = (last[created_idx], last[id_idx])
+                yield [row[:len(row) - strip] for row in rows] if strip else rows
+
+                if len(rows) < page_size:
+                    return
+        except Exception as e:
+            print(f"Error iterating hand histories: {e}")
+            self.conn.rollback()
+            raise
+
+    def get_hand_histories_by_ids(self, hand_ids, columns: list = None):
+        """
+        Fetches hands by id, in the order the ids are given (e.g. a saved result list).
+
+        Args:
+            hand_ids (list): Hand ids; ids that no longer exist are skipped.
+            columns (list): Columns to return (default: the explorer's result columns
+                id, game_type, pf/flop/turn/river_action_seq, raw_text and the board;
+                the board is NULL until add_board_card_columns.py has run).
+
+        Returns:
+            list: Row tuples in hand_ids order.
+        """
+        if not self.conn:
+            print("No database connection.")
+            return []
+        if not hand_ids:
+            return []
+
+        if columns:
+            select = [sql.Identifier("hh", c) for c in columns]
+        else:
+            existing = self.get_table_columns("hand_histories")
+            select = ([sql.Identifier("hh", c) for c in ["id", "game_type", "pf_action_seq", "flop_action_seq",
+                                                         "turn_action_seq", "river_action_seq", "raw_text"]]
+                      + [sql.Identifier("hh", c) if c in existing else sql.SQL("NULL") for c in BOARD_COLUMNS])
+        query = sql.SQL("""
+            SELECT {}
+            FROM unnest(%s::bigint[]) WITH ORDINALITY AS ids(hand_id, ord)
+            JOIN hand_histories hh ON hh.id = ids.hand_id
+            ORDER BY ids.ord
+        """).format(sql.SQL(", ").join(select))
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(query, (list(hand_ids),))
+                rows = cur.fetchall()
+            self.conn.rollback()  # End the read transaction
+            return rows
+        except Exception as e:
+            print(f"Error fetching hand histories by id: {e}")
+            self.conn.rollback()
+            return []
+
+    def get_action_columns(self, hand_ids=None, filters: dict = None, streets: list = None,
+                           fetch_size: int = 50000):
+        """
+        Pulls hand_actions for a set of hands in one query, as categorical-coded column arrays.
+
+        Rows are streamed from a server-side cursor straight into typed buffers, so
+        no per-action tuples or objects are kept (see scripts/action_columns.py).
+
+        Args:
+            hand_ids (list): Only actions of these hands.
+            filters (dict): hand_histories column -> value equality filters, as in
+                iter_hand_histories (a list/tuple matches any element, None matches NULL).
+            streets (list): Only actions on these streets.
+            fetch_size (int): Rows per round trip.
+
+        Returns:
+            ActionColumns: Ordered by hand and action_order, or None on error.
+        """
+        if not self.conn:
+            print("No database connection.")
+            return None
+
+        conditions = []
+        params = []
+        if hand_ids is not None:
+            conditions.append(sql.SQL("ha.hand_history_id = ANY(%s::bigint[])"))
+            params.append(list(hand_ids))
+        if streets:
+            conditions.append(sql.SQL("ha.street = ANY(%s)"))
+            params.append(list(streets))
+        for column, value in (filters or {}).items():
+            if value is None:
+                conditions.append(sql.SQL("{} IS NULL").format(sql.Identifier("hh", column)))
+            elif isinstance(value, (list, tuple)):
+                conditions.append(sql.SQL("{} = ANY(%s)").format(sql.Identifier("hh", column)))
+                params.append(list(value))
+            else:
+                conditions.append(sql.SQL("{} = %s").format(sql.Identifier("hh", column)))
+                params.append(value)
+
+        query = sql.SQL("""
+            SELECT ha.hand_history_id, ha.street, ha.player, ha.action_type,
+                   ha.bet_amount, ha.total, ha.pot_size, ha.action_order
+            FROM hand_actions ha
+            {}
+            {}
+            ORDER BY ha.hand_history_id, ha.action_order
+        """).format(
+            sql.SQL("JOIN hand_histories hh ON hh.id = ha.hand_history_id") if filters else sql.SQL(""),
+            sql.SQL("WHERE ") + sql.SQL(" AND ").join(conditions) if conditions else sql.SQL(""))
+
+        builder = ActionColumnsBuilder()
+        try:
+            with self.conn.cursor(name="action_columns") as cur:
+                cur.itersize = fetch_size
+                cur.execute(query, params)
+                while True:
+                    rows = cur.fetchmany(fetch_size)
+                    if not rows:
+                        break
+                    builder.add_rows(rows)
+            self.conn.rollback()  # End the read transaction (closes the named cursor)
+            return builder.build()
+        except Exception as e:
+            print(f"Error fetching hand action columns: {e}")
+            self.conn.rollback()
+            return None
+
     def close(self):
         """
         Closes the database connection.
@@ -145,6 +344,23 @@ class DatabaseAccess:
             self.conn.rollback()
             return False
 
+    def get_table_columns(self, table):
+        """Gets the column names of a table (e.g. to check a migration has run)."""
+        if not self.conn:
+            print("No database connection.")
+            return set()
+
+        query = "SELECT column_name FROM information_schema.columns WHERE table_name = %s"
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(query, (table,))
+                rows = cur.fetchall()
+            return {row[0] for row in rows}
+        except Exception as e:
+            print(f"Error getting columns of {table}: {e}")
+            self.conn.rollback()
+            return set()
+
     def get_game_types(self):
         """Get all unique game types from gto_mappings"""
         if not self.conn:
@@ -161,6 +377,267 @@ class DatabaseAccess:
             print(f"Error getting game types: {e}")
             return []
 
+    def refresh_sequence_daily_stats(self, days=2):
+        """
+        Recomputes sequence_daily_stats from the earliest day that has changed.
+
+        Hands ingested since the last refresh (ids above the 'sequence_daily_stats'
+        watermark) can be dated anywhere in the past, so every day from the oldest of
+        them onwards is recomputed, along with at least the last `days` days (to pick
+        up format columns backfilled after ingest). Without a watermark, or with
+        days=None, all history is recomputed.
+
+        Returns:
+            int: Number of summary rows written, or False on error.
+        """
+        if not self.conn:
+            print("No database connection.")
+            return False
+
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(CREATE_STATS_WATERMARKS)
+                cur.execute("SELECT MAX(id) FROM hand_histories")
+                high = cur.fetchone()[0] or 0
+                cur.execute("SELECT last_hand_id FROM stats_watermarks WHERE stat_name = 'sequence_daily_stats'")
+                row = cur.fetchone()
+                from_date = None
+                if days is not None and row:
+                    # LEAST ignores the NULL from an empty set, leaving the last `days` days
+                    cur.execute("""
+                        SELECT LEAST(MIN(created_at)::date, CURRENT_DATE - %s)
+                        FROM hand_histories WHERE id > %s
+                    """, (days, row[0]))
+                    from_date = cur.fetchone()[0]
+
+                window = "" if from_date is None else "WHERE stat_date >= %(from_date)s"
+                hand_window = "" if from_date is None else "AND hh.created_at >= %(from_date)s"
+                cur.execute(f"DELETE FROM sequence_daily_stats {window}", {"from_date": from_date})
+                cur.execute(f"""
+                    INSERT INTO sequence_daily_stats
+                        (stat_date, game_type, game_class, game_variant, table_size, street, action_seq, hand_count)
+                    SELECT hh.created_at::date, hh.game_type, hh.game_class, hh.game_variant, hh.table_size,
+                           s.street, s.action_seq, COUNT(*)
+                    FROM hand_histories hh
+                    CROSS JOIN LATERAL (VALUES
+                        ('preflop', hh.pf_action_seq),
+                        ('flop', hh.flop_action_seq),
+                        ('turn', hh.turn_action_seq),
+                        ('river', hh.river_action_seq)
+                    ) AS s(street, action_seq)
+                    WHERE s.action_seq IS NOT NULL AND hh.created_at IS NOT NULL {hand_window}
+                    GROUP BY 1, 2, 3, 4, 5, 6, 7
+                """, {"from_date": from_date})
+                inserted = cur.rowcount
+                cur.execute("""
+                    INSERT INTO stats_watermarks (stat_name, last_hand_id, updated_at)
+                    VALUES ('sequence_daily_stats', %s, NOW())
+                    ON CONFLICT (stat_name) DO UPDATE
+                        SET last_hand_id = EXCLUDED.last_hand_id, updated_at = NOW()
+                """, (high,))
+            self.conn.commit()
+            return inserted
+        except Exception as e:
+            print(f"Error refreshing sequence stats: {e}")
+            self.conn.rollback()
+            return False
+
+    def get_sequence_frequencies(self, street, profile_name=None, days=None, limit=200):
+        """
+        Gets the most frequent action sequences for a street from sequence_daily_stats.
+
+        Args:
+            street (str): 'preflop', 'flop', 'turn' or 'river'.
+            profile_name (str): Optional game profile; matches its class/variant/size.
+            days (int): Optional time window in days (None = all history).
+            limit (int): Maximum number of sequences to return.
+
+        Returns:
+            list: (action_seq, hand_count, last_seen_date) tuples, most frequent first.
+        """
+        if not self.conn:
+            print("No database connection.")
+            return []
+
+        query = """
+            SELECT s.action_seq, SUM(s.hand_count) AS hand_count, MAX(s.stat_date) AS last_seen
+            FROM sequence_daily_stats s
+        """
+        conditions = ["s.street = %s"]
+        params = [street]
+        if profile_name:
+            query += " JOIN game_profiles gp ON gp.profile_name = %s"
+            params.insert(0, profile_name)
+            conditions += [
+                "s.game_class IS NOT DISTINCT FROM gp.game_class",
+                "s.game_variant IS NOT DISTINCT FROM gp.game_variant",
+                "s.table_size IS NOT DISTINCT FROM gp.table_size",
+            ]
+        if days:
+            conditions.append("s.stat_date >= CURRENT_DATE - %s")
+            params.append(days)
+        query += " WHERE " + " AND ".join(conditions)
+        query += " GROUP BY s.action_seq ORDER BY hand_count DESC LIMIT %s"
+        params.append(limit)
+
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(query, params)
+                return cur.fetchall()
+        except Exception as e:
+            print(f"Error getting sequence frequencies: {e}")
+            self.conn.rollback()
+            return []
+
+    def refresh_player_spot_stats(self, batch_size=50000, rebuild=False):
+        """
+        Adds hands ingested since the last refresh to player_spot_stats.
+
+        Hands with ids above the 'player_spot_stats' watermark are processed in id
+        batches; each batch's counts are added to the summary rows and the watermark
+        moves forward in the same transaction, so a refresh can be interrupted and
+        rerun safely. See PLAYER_SPOT_STATS_BATCH for how each stat is counted.
+
+        The batches stop at the highest hand id in hand_actions rather than in
+        hand_histories: stats are counted from the actions, and a hand whose actions
+        haven't been committed yet would otherwise fall below the watermark and never
+        be counted.
+
+        Args:
+            batch_size (int): Hand ids per transaction.
+            rebuild (bool): Empty the table and recount all hands (e.g. after spots changed).
+
+        Returns:
+            int: Number of hands processed, or False on error.
+        """
+        if not self.conn:
+            print("No database connection.")
+            return False
+
+        try:
+            with self.conn.cursor() as cur:
+                if rebuild:
+                    cur.execute("TRUNCATE player_spot_stats")
+                    cur.execute("DELETE FROM stats_watermarks WHERE stat_name = 'player_spot_stats'")
+                cur.execute("SELECT last_hand_id FROM stats_watermarks WHERE stat_name = 'player_spot_stats'")
+                row = cur.fetchone()
+                low = row[0] if row else 0
+                cur.execute("SELECT MAX(hand_history_id) FROM hand_actions")
+                high = cur.fetchone()[0] or 0
+            self.conn.commit()
+
+            processed = 0
+            while low < high:
+                upper = min(low + batch_size, high)
+                with self.conn.cursor() as cur:
+                    cur.execute(PLAYER_SPOT_STATS_BATCH, {"low": low, "high": upper})
+                    cur.execute("SELECT COUNT(*) FROM hand_histories WHERE id > %s AND id <= %s", (low, upper))
+                    processed += cur.fetchone()[0]
+                    cur.execute("""
+                        INSERT INTO stats_watermarks (stat_name, last_hand_id, updated_at)
+                        VALUES ('player_spot_stats', %s, NOW())
+                        ON CONFLICT (stat_name) DO UPDATE
+                            SET last_hand_id = EXCLUDED.last_hand_id, updated_at = NOW()
+                    """, (upper,))
+                self.conn.commit()
+                low = upper
+            return processed
+        except Exception as e:
+            print(f"Error refreshing player spot stats: {e}")
+            self.conn.rollback()
+            return False
+
+    def get_player_stats(self, player, spot_id=None):
+        """
+        Gets a player's frequencies from player_spot_stats (one index lookup).
+
+        Args:
+            player (str): Player name as it appears in hand_actions.
+            spot_id (int): Optional poker_spots id (0 = hands without a spot; None = all hands).
+
+        Returns:
+            dict: hands plus, for each of PLAYER_STAT_NAMES, {"made", "opportunities", "pct"};
+                  None if the player has no hands or on error.
+        """
+        if not self.conn:
+            print("No database connection.")
+            return None
+
+        columns = ", ".join(f"SUM({name}), SUM({name}_opp)" for name in PLAYER_STAT_NAMES)
+        query = f"SELECT SUM(hands), {columns} FROM player_spot_stats WHERE player = %s"
+        params = [player]
+        if spot_id is not None:
+            query += " AND spot_id = %s"
+            params.append(spot_id)
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(query, params)
+                row = cur.fetchone()
+            self.conn.rollback()  # End the read transaction
+        except Exception as e:
+            print(f"Error getting player stats: {e}")
+            self.conn.rollback()
+            return None
+
+        if not row or not row[0]:
+            return None
+        stats = {"player": player, "spot_id": spot_id, "hands": int(row[0])}
+        for i, name in enumerate(PLAYER_STAT_NAMES):
+            made, opportunities = int(row[1 + 2 * i]), int(row[2 + 2 * i])
+            stats[name] = {
+                "made": made,
+                "opportunities": opportunities,
+                "pct": round(100.0 * made / opportunities, 1) if opportunities else None,
+            }
+        return stats
+
+    def get_decision_frequencies(self, street=None, normalized_sequence=None, opportunity_type=None, limit=200):
+        """
+        Decision counts per normalized betting sequence from decision_points.
+
+        Args:
+            street (str): Optional street filter.
+            normalized_sequence (str): Optional exact sequence; without it the most common
+                sequences are returned.
+            opportunity_type (str): Optional opportunity type filter.
+            limit (int): Maximum number of rows.
+
+        Returns:
+            list: (street, normalized_betting_sequence, decision, count, share of the sequence's
+                  decisions in percent) tuples, most common sequences first.
+        """
+        if not self.conn:
+            print("No database connection.")
+            return []
+
+        conditions = []
+        params = []
+        for column, value in (("street", street), ("normalized_betting_sequence", normalized_sequence),
+                              ("opportunity_type", opportunity_type)):
+            if value:
+                conditions.append(f"{column} = %s")
+                params.append(value)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        params.append(limit)
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(f"""
+                    SELECT street, normalized_betting_sequence, decision, COUNT(*) AS n,
+                           ROUND(100.0 * COUNT(*) / SUM(COUNT(*)) OVER (
+                               PARTITION BY street, normalized_betting_sequence), 1)
+                    FROM decision_points
+                    {where}
+                    GROUP BY street, normalized_betting_sequence, decision
+                    ORDER BY SUM(COUNT(*)) OVER (PARTITION BY street, normalized_betting_sequence) DESC,
+                             street, normalized_betting_sequence, n DESC
+                    LIMIT %s
+                """, params)
+                return cur.fetchall()
+        except Exception as e:
+            print(f"Error getting decision frequencies: {e}")
+            self.conn.rollback()
+            return []
+
     # Review System Methods
     def get_or_create_review_data(self, hand_id):
         """Fetches review data for a hand_id. If no entry exists, it creates one."""
@@ -290,6 +767,38 @@ class DatabaseAccess:
             print(f"Error deleting study document: {e}")
             return False
 
+    def update_study_document_paths(self, updates):
+        """
+        Rewrites the file_path of several study documents in one transaction.
+
+        Args:
+            updates (list): (document_id, new_file_path) tuples.
+
+        Returns:
+            int: Number of rows updated, or False on error (nothing is changed).
+        """
+        if not self.conn:
+            print("No database connection.")
+            return False
+        if not updates:
+            return 0
+
+        try:
+            with self.conn.cursor() as cur:
+                execute_values(cur, """
+                    UPDATE study_documents AS sd
+                    SET file_path = v.file_path
+                    FROM (VALUES %s) AS v(id, file_path)
+                    WHERE sd.id = v.id
+                """, updates)
+                updated = cur.rowcount
+            self.conn.commit()
+            return updated
+        except Exception as e:
+            self.conn.rollback()
+            print(f"Error updating study document paths: {e}")
+            return False
+
     # Tag Management Methods
     def create_tag(self, tag_name, description=''):
         """Creates a new tag in the study_tags table."""
@@ -508,14 +1017,7 @@ class DatabaseAccess:
         # --- Board Texture Matching ---
         texture_pattern = rule.get('board_texture')
         if texture_pattern:
-            flop_cards = []
-            if hasattr(hh_data, 'flop_cards') and hh_data.flop_cards:
-                flop_cards = hh_data.flop_cards
-            elif hasattr(hh_data, 'raw_text') and hh_data.raw_text:
-                flop_match = re.search(r'\*\*\* FLOP \*\*\* \[([^\]]+)\]', hh_data.raw_text)
-                if flop_match:
-                    flop_text = flop_match.group(1)
-                    flop_cards = [card.strip() for card in flop_text.split()]
+            flop_cards = get_flop_cards(hh_data)
             if not flop_cards:
                 return False
             board_textures = analyze_board(flop_cards)
@@ -732,6 +1234,47 @@ class DatabaseAccess:
             )
             return [{"id": r[0], "title": r[1], "file_path": r[2], "is_default": r[3]} for r in cur.fetchall()]
 
+    def get_default_documents(self, spot_ids=None, pf_sequences=None):
+        """
+        Retrieves the default document (or first linked document) of many spots in one query.
+
+        Spots are selected by id and/or by an exact match of their preflop action_sequence
+        pattern against pf_sequences (the same rule find_spot_for_hand applies).
+
+        Returns:
+            list: dicts with spot_id, spot_name, pf_pattern, document_id, title and file_path.
+        """
+        if not self.conn:
+            print("No database connection.")
+            return []
+
+        try:
+            with self.conn.cursor() as cur:
+                cur.execute(
+                    """
+                    SELECT DISTINCT ON (p.id) p.id, p.spot_name, r.condition_params->>'pattern',
+                           d.id, d.title, d.file_path
+                    FROM poker_spots p
+                    JOIN spot_rules r ON r.spot_id = p.id
+                         AND r.condition_type = 'action_sequence'
+                         AND r.condition_params->>'street' = 'preflop'
+                    JOIN spot_document_links l ON l.spot_id = p.id
+                    JOIN study_documents d ON d.id = l.document_id
+                    WHERE p.id = ANY(%s) OR r.condition_params->>'pattern' = ANY(%s)
+                    ORDER BY p.id, l.is_default DESC, d.title
+                    """,
+                    (list(spot_ids or []), list(pf_sequences or []))
+                )
+                return [
+                    {"spot_id": r[0], "spot_name": r[1], "pf_pattern": r[2],
+                     "document_id": r[3], "title": r[4], "file_path": r[5]}
+                    for r in cur.fetchall()
+                ]
+        except Exception as e:
+            print(f"Error getting default documents: {e}")
+            self.conn.rollback()
+            return []
+
     def create_spot(self, spot_name, description, source, hh_data):
         """Creates a new spot and its initial rule in the database."""
         pf_seq = hh_data.get_simple_action_sequence("preflop")
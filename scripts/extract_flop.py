@@ -1,6 +1,6 @@
 import tkinter as tk
 from tkinter import scrolledtext
-import re
+from board_cards import extract_board
 
 class ExtractFlopApp:
     def __init__(self, root):
@@ -43,18 +43,11 @@ class ExtractFlopApp:
         # Clear the output text
         self.output_text.delete("1.0", tk.END)
         
-        # Find the street line
-        if street == "flop":
-            pattern = r'\*\*\* FLOP \*\*\* \[([^\]]+)\]'
-        elif street == "turn":
-            pattern = r'\*\*\* TURN \*\*\* \[[^\]]+\] \[([^\]]+)\]'
-        else:  # river
-            pattern = r'\*\*\* RIVER \*\*\* \[[^\]]+ [^\]]+\] \[([^\]]+)\]'
-            
-        match = re.search(pattern, hand_history)
+        # Same regexes that fill the hand_histories board columns (see board_cards.py)
+        flop, turn, river = extract_board(hand_history)
+        cards = {"flop": flop, "turn": turn, "river": river}[street]
         
-        if match:
-            cards = match.group(1)
+        if cards:
             self.output_text.insert("1.0", f"{street.upper()} Cards: {cards}")
         else:
             self.output_text.insert("1.0", f"No {street} found in the hand history")
@@ -1,10 +1,7 @@
 import re
-from pathlib import Path
-from scripts.config import (
-    GTO_SNAPSHOT_PATH, GTO_PROCESSING_PATH, GTO_RUNNING_PATH, 
-    GTO_PRIORITY_PATH, GTO_PROCESSED_PATH, GTO_RUNNING_PREFIX, 
-    GTO_PRIORITY_PREFIX_PATTERN
-)
+from scripts.config import GTO_SNAPSHOT_PATH, GTO_PROCESSED_PATH, GTO_PRIORITY_PREFIX_PATTERN
+from scripts.gto_file_index import get_gto_file_index
+from scripts.solver_queue import sync_solver_queue
 
 def find_gto_file_in_locations(original_path):
     """
@@ -18,53 +15,9 @@ def find_gto_file_in_locations(original_path):
     4. Priority queue directory (with "1.x - " prefix)
     5. Processed directory (with "1.x - " prefix, no prefix, or '0 - ' prefix)
     """
-    import re
-    original_path = Path(original_path)
-    filename = original_path.name
-    search_paths = []
-
-    # 1. Snapshot directory (highest priority - original location)
-    if GTO_SNAPSHOT_PATH.exists():
-        snapshot_path = GTO_SNAPSHOT_PATH / filename
-        search_paths.append(snapshot_path)
-
-    # 2. Processing directory (no prefix)
-    if GTO_PROCESSING_PATH.exists():
-        processing_path = GTO_PROCESSING_PATH / filename
-        search_paths.append(processing_path)
-
-    # 3. GTO+ running directory (with "0 - " prefix)
-    if GTO_RUNNING_PATH.exists():
-        running_path = GTO_RUNNING_PATH / f"{GTO_RUNNING_PREFIX}{filename}"
-        search_paths.append(running_path)
-
-    # 4. Priority queue directory (with "1.x - " prefix)
-    if GTO_PRIORITY_PATH.exists():
-        priority_pattern = re.compile(GTO_PRIORITY_PREFIX_PATTERN + re.escape(filename))
-        for file_path in GTO_PRIORITY_PATH.glob("*.gto"):
-            if priority_pattern.match(file_path.name):
-                search_paths.append(file_path)
-
-    # 5. Processed directory (with "1.x - " prefix, no prefix, or '0 - ' prefix)
-    if GTO_PROCESSED_PATH.exists():
-        # Look for any file with "1.x - " prefix followed by the original filename
-        priority_pattern = re.compile(GTO_PRIORITY_PREFIX_PATTERN + re.escape(filename))
-        for file_path in GTO_PROCESSED_PATH.glob("*.gto"):
-            if priority_pattern.match(file_path.name):
-                search_paths.append(file_path)
-        # Also look for the original filename (no prefix) in processed directory
-        processed_path = GTO_PROCESSED_PATH / filename
-        search_paths.append(processed_path)
-        # Also look for '0 - <filename>' in processed directory
-        processed_zero_prefix = GTO_PROCESSED_PATH / f"0 - {filename}"
-        search_paths.append(processed_zero_prefix)
-
-    # Search through all possible paths in priority order
-    for search_path in search_paths:
-        if search_path.exists():
-            return str(search_path)
-
-    return None
+    # Resolved against the in-memory directory index, so repeated lookups don't
+    # glob or stat the directories (see GtoFileIndex).
+    return get_gto_file_index().find(original_path)
 
 def normalize_gto_filename(filename):
     """
@@ -160,6 +113,7 @@ def move_gto_file_to_processed(source_path):
         # Move the file
         shutil.move(str(source_path), str(dest_path))
         print(f"Moved file from {source_path} to {dest_path}")
+        sync_solver_queue()
         return True
     except Exception as e:
         print(f"Error moving file to processed: {e}")
@@ -3,6 +3,7 @@ import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 from db_access import DatabaseAccess
 from config import DB_PARAMS, GTO_BASE_PATH
+from scripts.gto_file_index import get_gto_file_index
 import os
 import re
 from pathlib import Path
@@ -64,40 +65,10 @@ class GTOAdmin(tk.Tk):
         Search for a GTO+ file in multiple possible locations.
         Returns the actual path where the file was found, or None if not found.
         """
-        original_path = Path(original_path)
-        search_paths = []
-        
-        # 1. Original path from database
-        search_paths.append(original_path)
-        
-        # 2. Processing directory (base path)
-        base_path = GTO_BASE_PATH
-        if base_path.exists():
-            # Look for the file with original name
-            processing_path = base_path / original_path.name
-            search_paths.append(processing_path)
-            
-            # Look for the file with "0 - " prefix
-            processing_path_prefixed = base_path / f"0 - {original_path.name}"
-            search_paths.append(processing_path_prefixed)
-        
-        # 3. Processed directory
-        processed_base = base_path / "processed"
-        if processed_base.exists():
-            # Look for the file with original name
-            processed_path = processed_base / original_path.name
-            search_paths.append(processed_path)
-            
-            # Look for the file with "0 - " prefix
-            processed_path_prefixed = processed_base / f"0 - {original_path.name}"
-            search_paths.append(processed_path_prefixed)
-        
-        # Search through all possible paths
-        for search_path in search_paths:
-            if search_path.exists():
-                return search_path
-        
-        return None
+        # Checks the stored path first, then the configured GTO+ directories, using the
+        # shared directory index instead of statting each candidate path
+        found = get_gto_file_index().find(original_path, include_original=True)
+        return Path(found) if found else None
     
     def import_settings(self):
         """Import GTO+ mappings from settings.txt file"""
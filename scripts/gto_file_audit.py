@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Audit every study_documents.file_path against the GTO+ directories.
+
+All documents are resolved against a single snapshot of the configured
+directories (a fresh GtoFileIndex); paths outside the indexed directories are
+checked in parallel. The report lists:
+    - missing:    the file is nowhere to be found
+    - moved:      the stored path is gone but the file exists elsewhere
+                  (e.g. it was queued with a "1.x - " prefix or processed)
+    - duplicates: the file exists in more than one location, or several
+                  documents point at the same file
+
+With --fix, moved documents are rewritten to their normalized storage path
+(see get_gto_storage_path) in a single transaction.
+
+Usage:
+    python scripts/gto_file_audit.py          # report only
+    python scripts/gto_file_audit.py --fix    # report and rewrite moved paths
+"""
+
+import sys
+import os
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from scripts.db_access import DatabaseAccess
+from scripts.config import DB_PARAMS
+from scripts.file_utils import get_gto_storage_path
+from scripts.gto_file_index import GtoFileIndex, split_gto_prefix
+
+
+def _resolve_document(index, doc):
+    """Resolves one (id, title, file_path) document. Runs in a worker thread."""
+    doc_id, title, file_path = doc
+    stored_exists = index.find(file_path, include_original=True) == str(Path(file_path))
+    locations = [path for path, _ in index.find_all(file_path)]
+    current = str(Path(file_path)) if stored_exists else (locations[0] if locations else None)
+    return {
+        "id": doc_id,
+        "title": title,
+        "file_path": file_path,
+        "stored_exists": stored_exists,
+        "current_path": current,
+        "locations": locations,
+    }
+
+
+def audit_study_documents(db, index=None, max_workers=16):
+    """
+    Resolves every study document and classifies it.
+
+    Args:
+        db (DatabaseAccess): Database connection.
+        index (GtoFileIndex): Optional index; a fresh snapshot is taken if omitted.
+        max_workers (int): Threads used for paths outside the indexed directories.
+
+    Returns:
+        dict: {"ok", "moved", "missing", "duplicate_files", "shared_files"} lists of result dicts
+              (shared_files holds lists of documents that resolve to the same file).
+    """
+    if index is None:
+        # Never rescan during the audit so every document sees the same snapshot
+        index = GtoFileIndex(check_interval=float("inf"))
+
+    documents = db.get_all_study_documents()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(lambda doc: _resolve_document(index, doc), documents))
+
+    report = {"ok": [], "moved": [], "missing": [], "duplicate_files": [], "shared_files": []}
+    by_file = {}
+    for result in results:
+        if result["stored_exists"]:
+            report["ok"].append(result)
+        elif result["current_path"]:
+            report["moved"].append(result)
+        else:
+            report["missing"].append(result)
+
+        if len(result["locations"]) > 1:
+            report["duplicate_files"].append(result)
+        if result["current_path"]:
+            key = os.path.normcase(split_gto_prefix(Path(result["current_path"]).name)[1])
+            by_file.setdefault(key, []).append(result)
+
+    report["shared_files"] = [docs for docs in by_file.values() if len(docs) > 1]
+    return report
+
+
+def format_report(report):
+    """Returns the audit report as printable text."""
+    lines = [
+        "=== GTO+ File Audit ===",
+        f"OK: {len(report['ok'])}  Moved: {len(report['moved'])}  Missing: {len(report['missing'])}  "
+        f"Duplicate files: {len(report['duplicate_files'])}  Shared by several documents: {len(report['shared_files'])}",
+    ]
+    if report["missing"]:
+        lines.append("\n--- Missing ---")
+        for r in report["missing"]:
+            lines.append(f"[{r['id']}] {r['title']}: {r['file_path']}")
+    if report["moved"]:
+        lines.append("\n--- Moved ---")
+        for r in report["moved"]:
+            lines.append(f"[{r['id']}] {r['title']}: {r['file_path']}\n      now at {r['current_path']}")
+    if report["duplicate_files"]:
+        lines.append("\n--- Files found in several locations ---")
+        for r in report["duplicate_files"]:
+            lines.append(f"[{r['id']}] {r['title']}:")
+            lines.extend(f"      {path}" for path in r["locations"])
+    if report["shared_files"]:
+        lines.append("\n--- Documents sharing a file ---")
+        for docs in report["shared_files"]:
+            lines.append(", ".join(f"[{r['id']}] {r['title']}" for r in docs))
+    return "\n".join(lines)
+
+
+def plan_path_fixes(report):
+    """
+    Returns (document_id, new_path) updates for moved documents.
+
+    Documents whose new path would collide with another document's path are
+    skipped (file_path is unique); they show up under shared files instead.
+    """
+    taken = {r["file_path"] for group in ("ok", "moved", "missing") for r in report[group]}
+    updates = []
+    for r in report["moved"]:
+        new_path = get_gto_storage_path(r["current_path"])
+        if new_path == r["file_path"] or new_path in taken:
+            continue
+        taken.add(new_path)
+        updates.append((r["id"], new_path))
+    return updates
+
+
+def apply_path_fixes(db, report):
+    """Rewrites moved document paths in one transaction. Returns the number of rows updated or False."""
+    updates = plan_path_fixes(report)
+    if not updates:
+        return 0
+    return db.update_study_document_paths(updates)
+
+
+def main():
+    fix = "--fix" in sys.argv[1:]
+    db = DatabaseAccess(**DB_PARAMS)
+    if not db.conn:
+        return False
+    try:
+        report = audit_study_documents(db)
+        print(format_report(report))
+        if fix:
+            updated = apply_path_fixes(db, report)
+            if updated is False:
+                print("\n[ERROR] Path update failed; no changes were made.")
+                return False
+            print(f"\n[OK] Updated {updated} document paths.")
+        return True
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
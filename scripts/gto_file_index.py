@@ -0,0 +1,178 @@
+import os
+import re
+import time
+import threading
+from pathlib import Path
+from scripts.config import (
+    GTO_SNAPSHOT_PATH, GTO_PROCESSING_PATH, GTO_RUNNING_PATH,
+    GTO_PRIORITY_PATH, GTO_PROCESSED_PATH, GTO_RUNNING_PREFIX,
+    GTO_PRIORITY_PREFIX_PATTERN
+)
+
+# Prefix kinds a file name can carry
+PREFIX_NONE = "none"          # "<name>.gto"
+PREFIX_RUNNING = "running"    # "0 - <name>.gto"
+PREFIX_PRIORITY = "priority"  # "1.x - <name>.gto"
+
+# Extensions of GTO+ solution files
+GTO_SUFFIXES = ('.gto', '.gto+')
+
+_priority_prefix = re.compile(GTO_PRIORITY_PREFIX_PATTERN)
+
+
+def split_gto_prefix(filename):
+    """
+    Split a file name into (prefix_kind, normalized_name).
+
+    e.g. "1.5 - 6 max 37.gto" -> ("priority", "6 max 37.gto")
+    """
+    match = _priority_prefix.match(filename)
+    if match:
+        return PREFIX_PRIORITY, filename[match.end():]
+    if filename.startswith(GTO_RUNNING_PREFIX):
+        return PREFIX_RUNNING, filename[len(GTO_RUNNING_PREFIX):]
+    return PREFIX_NONE, filename
+
+
+class GtoFileIndex:
+    """
+    In-memory index of the GTO+ directories, mapping normalized file names to
+    where each file currently is and which prefix it carries.
+
+    Each directory is scanned once and rescanned only when its mtime changes
+    (adding, removing or renaming a file updates the directory mtime). The
+    mtime check itself is rate-limited by check_interval, so repeated lookups
+    don't touch the filesystem at all.
+
+    Lookups follow the same priority order as find_gto_file_in_locations:
+    1. Snapshot directory (no prefix)
+    2. Processing directory (no prefix)
+    3. Running directory ("0 - " prefix)
+    4. Priority directory ("1.x - " prefix)
+    5. Processed directory ("1.x - " prefix, no prefix, or "0 - " prefix)
+    """
+
+    def __init__(self, snapshot_path=GTO_SNAPSHOT_PATH, processing_path=GTO_PROCESSING_PATH,
+                 running_path=GTO_RUNNING_PATH, priority_path=GTO_PRIORITY_PATH,
+                 processed_path=GTO_PROCESSED_PATH, check_interval=2.0):
+        # (directory, accepted prefix kinds in preference order)
+        self.search_order = [
+            (Path(snapshot_path), [PREFIX_NONE]),
+            (Path(processing_path), [PREFIX_NONE]),
+            (Path(running_path), [PREFIX_RUNNING]),
+            (Path(priority_path), [PREFIX_PRIORITY]),
+            (Path(processed_path), [PREFIX_PRIORITY, PREFIX_NONE, PREFIX_RUNNING]),
+        ]
+        self.check_interval = check_interval
+        self._dirs = {}   # dir key -> {"mtime", "checked_at", "files": {normalized: [(prefix, filename)]}}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name):
+        # Match the filesystem's case rules (case-insensitive on Windows)
+        return os.path.normcase(name)
+
+    def _scan(self, directory):
+        files = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                prefix, normalized = split_gto_prefix(entry.name)
+                files.setdefault(self._key(normalized), []).append((prefix, entry.name))
+        for matches in files.values():
+            matches.sort(key=lambda m: m[1])
+        return files
+
+    def _get_dir(self, directory, force=False):
+        """Returns the file map for a directory, rescanning it if its mtime changed."""
+        key = self._key(str(directory))
+        now = time.monotonic()
+        with self._lock:
+            cached = self._dirs.get(key)
+            if cached and not force and now - cached["checked_at"] < self.check_interval:
+                return cached["files"]
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                self._dirs[key] = {"mtime": None, "checked_at": now, "files": {}}
+                return {}
+            if cached and not force and cached["mtime"] == mtime:
+                cached["checked_at"] = now
+                return cached["files"]
+            files = self._scan(directory)
+            self._dirs[key] = {"mtime": mtime, "checked_at": now, "files": files}
+            return files
+
+    def refresh(self):
+        """Force a rescan of every directory on the next lookup."""
+        with self._lock:
+            self._dirs.clear()
+
+    def find_all(self, original_path):
+        """
+        Returns every current location of a file in priority order.
+
+        Args:
+            original_path: Stored path or bare file name (prefixes are ignored).
+
+        Returns:
+            list: (path, prefix_kind) tuples; the first entry is the preferred location.
+        """
+        _, normalized = split_gto_prefix(Path(original_path).name)
+        key = self._key(normalized)
+        found = []
+        seen = set()
+        for directory, prefixes in self.search_order:
+            matches = self._get_dir(directory).get(key, [])
+            for wanted in prefixes:
+                for prefix, filename in matches:
+                    path = directory / filename
+                    if prefix == wanted and path not in seen:
+                        seen.add(path)
+                        found.append((str(path), prefix))
+        return found
+
+    def find(self, original_path, include_original=False):
+        """
+        Returns the preferred current location of a file, or None if it isn't found.
+
+        With include_original, the stored path itself is checked first (through the
+        index when it lives in one of the indexed directories).
+        """
+        if include_original:
+            original = Path(original_path)
+            if original.parent != Path("."):
+                indexed = any(self._key(str(d)) == self._key(str(original.parent)) for d, _ in self.search_order)
+                if indexed:
+                    _, normalized = split_gto_prefix(original.name)
+                    matches = self._get_dir(original.parent).get(self._key(normalized), [])
+                    if any(self._key(f) == self._key(original.name) for _, f in matches):
+                        return str(original)
+                elif original.exists():
+                    return str(original)
+        found = self.find_all(original_path)
+        return found[0][0] if found else None
+
+    def iter_files(self):
+        """Yields (path, prefix_kind, normalized_name) for every file in the indexed directories."""
+        seen_dirs = set()
+        for directory, _ in self.search_order:
+            key = self._key(str(directory))
+            if key in seen_dirs:
+                continue
+            seen_dirs.add(key)
+            for normalized, matches in self._get_dir(directory).items():
+                for prefix, filename in matches:
+                    yield str(directory / filename), prefix, split_gto_prefix(filename)[1]
+
+
+_default_index = None
+
+
+def get_gto_file_index():
+    """Returns the shared GtoFileIndex for the configured directories."""
+    global _default_index
+    if _default_index is None:
+        _default_index = GtoFileIndex()
+    return _default_index
@@ -0,0 +1,209 @@
+"""
+Text for the explorer's per-hand popups (actions, betting opportunities,
+combined view and hand history tree).
+
+Each popup's content is built as a list of lines and joined once, so the
+window gets a single Text.insert instead of one per line. HandFormatCache
+keeps the built content per hand, so reopening a popup for a hand that was
+already shown doesn't format it again.
+"""
+
+from collections import OrderedDict
+
+from holiday_parser import ForcedAction, PlayerAction, DecisionPoint, StreetChange
+
+
+class HandFormatCache:
+    """
+    Formatted popup content for the most recently shown hands.
+
+    Args:
+        max_hands (int): Hands kept; the least recently used hand is dropped first.
+    """
+
+    def __init__(self, max_hands=20):
+        self.max_hands = max_hands
+        self._hands = OrderedDict()     # hand_id -> {view name: content}
+
+    def get(self, hand_id, view, build):
+        """Returns the content of view for a hand, calling build() the first time."""
+        views = self._hands.get(hand_id)
+        if views is None:
+            views = self._hands[hand_id] = {}
+            while len(self._hands) > self.max_hands:
+                self._hands.popitem(last=False)
+        self._hands.move_to_end(hand_id)
+        if view not in views:
+            views[view] = build()
+        return views[view]
+
+
+def format_hand_actions(hand_data):
+    """Header plus a table of actions for each street."""
+    lines = [
+        f"Hand ID: {hand_data.hand_id}",
+        f"Game Type: {hand_data.game_type}",
+        f"Number of Players: {hand_data.number_of_players}",
+        f"Small Blind: ${hand_data.sb_size:.2f}",
+        f"Big Blind: ${hand_data.bb_size:.2f}",
+    ]
+    if hand_data.ante:
+        lines.append(f"Ante: ${hand_data.ante:.2f}")
+    lines.append("")
+
+    for street in ["anteing", "preflop", "flop", "turn", "river"]:
+        actions = hand_data.actions.get(street, [])
+        if not actions:
+            continue
+        lines += [
+            "",
+            f"{street.upper()} ACTIONS:",
+            "-" * 80,
+            f"{'Player':<20} {'Action':<10} {'Amount':<10} {'Total':<10} {'Norm Seq':<15} {'Additional Info'}",
+            "-" * 80,
+        ]
+        for action in actions:
+            amount_str = f"${action.bet_amount:.2f}" if action.bet_amount is not None else "N/A"
+            total_str = f"${action.total:.2f}" if action.total is not None else "N/A"
+            norm_seq = getattr(action, "normalized_sequence", None) or "N/A"
+            pot_size = getattr(action, "pot_size", None)
+            additional_info = f"Pot: ${pot_size:.2f}" if pot_size is not None else ""
+            lines.append(f"{action.player:<20} {action.action_type:<10} {amount_str:<10} {total_str:<10} "
+                         f"{norm_seq:<15} {additional_info}")
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def _opportunity_lines(opp):
+    """The fields shared by the opportunities and combined popups."""
+    lines = [
+        f"Type: {opp.opportunity_type}",
+        f"Player: {opp.player_position}",
+        f"Stack: ${opp.player_stack:.2f}",
+        f"Pot: ${opp.pot_size:.2f}",
+    ]
+    if opp.board_cards:
+        lines.append(f"Board: {' '.join(opp.board_cards)}")
+    lines += [
+        f"Betting Sequence: {opp.get_betting_sequence_summary()}",
+        f"Normalized Sequence: {opp.normalized_betting_sequence}",
+        f"Available Actions: {', '.join(opp.available_actions)}",
+    ]
+    return lines
+
+
+def format_betting_opportunities(hand_data):
+    """Every betting opportunity with its decision and context."""
+    lines = ["Betting Opportunities", "=" * 50, ""]
+    if not hand_data or not hasattr(hand_data, "betting_opportunities"):
+        lines.append("No betting opportunities available for this hand.")
+        return "\n".join(lines) + "\n"
+
+    for i, opp in enumerate(hand_data.betting_opportunities, 1):
+        lines += [f"Opportunity {i}", "-" * 30, f"Street: {opp.street}"]
+        lines += _opportunity_lines(opp)
+        if opp.decision:
+            lines.append(f"Decision Made: {opp.decision}")
+        if opp.outcome_bucket:
+            lines.append(f"Outcome: {opp.outcome_bucket}")
+        if opp.bet_amount is not None:
+            lines.append(f"Bet Amount: ${opp.bet_amount:.2f}")
+        if opp.additional_context:
+            lines.append("Additional Context:")
+            lines += [f"  {key}: {value}" for key, value in opp.additional_context.items()]
+        lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def format_combined_view(hand_data):
+    """Actions and betting opportunities interleaved, skipping the blinds' opportunity."""
+    lines = ["Combined Actions & Betting Opportunities", "=" * 100, ""]
+    if not hand_data or not hasattr(hand_data, "betting_opportunities"):
+        lines.append("No data available for this hand.")
+        return "\n".join(lines) + "\n"
+
+    all_actions = [(street, action) for street in ["preflop", "flop", "turn", "river"]
+                   for action in hand_data.actions.get(street, [])]
+    # The first opportunity is for the blinds
+    all_opportunities = hand_data.betting_opportunities[1:]
+
+    for i in range(max(len(all_actions), len(all_opportunities))):
+        if i < len(all_actions):
+            street, action = all_actions[i]
+            lines += [f"Action on {street.upper()}:", "-" * 50,
+                      f"Player: {action.player}", f"Type: {action.action_type}"]
+            if action.bet_amount is not None:
+                lines.append(f"Amount: ${action.bet_amount:.2f}")
+            if action.total is not None:
+                lines.append(f"Total: ${action.total:.2f}")
+            if action.pot_size is not None:
+                lines.append(f"Pot Size: ${action.pot_size:.2f}")
+            lines.append("")
+        if i < len(all_opportunities):
+            opp = all_opportunities[i]
+            lines += [f"Betting Opportunity on {opp.street.upper()}:", "-" * 50]
+            lines += _opportunity_lines(opp)
+            lines.append("")
+    return "\n".join(lines) + "\n"
+
+
+def tree_node_rows(hand_data):
+    """
+    One (summary, detail lines) pair per hand history tree node.
+
+    The summary is the node's one-line label in the tree view; the details are
+    shown as its children when it is expanded.
+    """
+    # First normalized sequence per (street, player), looked up once instead of per node
+    sequences = {}
+    for opp in getattr(hand_data, "betting_opportunities", None) or []:
+        sequences.setdefault((opp.street, opp.player_position), opp.normalized_betting_sequence)
+
+    rows = []
+    for i, node in enumerate(hand_data.hand_history_tree.get_all_nodes(), 1):
+        player = getattr(node, "player", None)
+        action = getattr(node, "action_type", None) or getattr(node, "opportunity_type", None)
+        summary = " - ".join(str(part) for part in (f"Node {i}: {node.node_type.value}", node.street, player, action)
+                             if part)
+
+        details = [
+            f"Current Bet Level: ${node.current_bet_level:.2f}",
+            f"Pot Size: ${node.pot_size:.2f}",
+        ]
+        if isinstance(node, ForcedAction):
+            details += [f"Player: {node.player}", f"Action Type: {node.action_type}", f"Amount: ${node.amount:.2f}"]
+        elif isinstance(node, PlayerAction):
+            details += [f"Player: {node.player}", f"Action Type: {node.action_type}",
+                        f"Parent Pot Size: ${node.parent_pot_size:.2f}"]
+            if (node.street, node.player) in sequences:
+                details.append(f"Normalized Sequence: {sequences[(node.street, node.player)]}")
+            if node.bet_amount is not None:
+                details.append(f"Bet Amount: ${node.bet_amount:.2f}")
+            if node.total is not None:
+                details.append(f"Total: ${node.total:.2f}")
+        elif isinstance(node, DecisionPoint):
+            details += [
+                f"Player: {node.player}",
+                f"Opportunity Type: {node.opportunity_type}",
+                f"Player Stack: ${node.player_stack:.2f}",
+                f"Available Actions: {', '.join(node.available_actions)}",
+                f"Min Raise: ${node.min_raise:.2f}",
+                f"Max Raise: ${node.max_raise:.2f}",
+            ]
+        elif isinstance(node, StreetChange):
+            details.append(f"Community Cards: {' '.join(node.community_cards)}")
+
+        details.append("Active Players:")
+        for player_state in node.active_players:
+            if not player_state:
+                continue
+            try:
+                details.append(f"  - {player_state.player} (Stack: ${player_state.stack:.2f}, "
+                               f"Remaining: ${player_state.remaining_stack:.2f}, "
+                               f"Contribution: ${player_state.total_contribution:.2f}, "
+                               f"Position: {player_state.position or 'N/A'}, "
+                               f"Active: {player_state.is_active})")
+            except AttributeError as e:
+                details.append(f"  - Invalid player object: {e}")
+        rows.append((summary, details))
+    return rows
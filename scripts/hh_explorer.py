@@ -2,9 +2,18 @@
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog, simpledialog
 from db_access import DatabaseAccess
+from async_db_access import AsyncDatabaseAccess
+from reference_cache import ReferenceDataCache, TABLE_SECTIONS
 from query_builder import QueryBuilder, Condition, SortCriterion
 from saved_state_manager import SavedStateManager
 from spot_profile_manager import open_spot_profile_manager
+from sequence_frequency_view import open_sequence_frequency_view
+from bet_sizing_view import open_bet_sizing_view
+from player_spot_stats import format_player_stats
+from action_tree_view import open_action_tree_view
+from hand_popup_text import (
+    HandFormatCache, format_hand_actions, format_betting_opportunities, format_combined_view, tree_node_rows
+)
 from typing import List
 from holiday_parser import (
     get_hand_history_parser, 
@@ -12,9 +21,6 @@ from holiday_parser import (
     BettingOpportunity, 
     HandHistoryTree, 
     HandNode, 
-    ForcedAction, 
-    PlayerAction, 
-    DecisionPoint, 
     StreetChange, 
     PlayerState, 
     NodeType
@@ -24,11 +30,17 @@ from typing import Optional, Dict
 import sys
 import os
 import webbrowser
+import json
 import pathlib
 import urllib.parse
 from datetime import datetime, timedelta
-from scripts.config import DB_PARAMS, GTO_BASE_PATH, GTO_EXECUTABLE_PATH
+from scripts.config import (DB_PARAMS, GTO_BASE_PATH, GTO_EXECUTABLE_PATH, GTO_PROCESSING_PATH, GTO_RUNNING_PREFIX,
+                            QUERY_STATEMENT_TIMEOUT_SECONDS, SAVED_STATES_FILE, QUERY_COST_WARNING_THRESHOLD)
 from scripts.file_utils import find_gto_file_in_locations
+from scripts.board_cards import get_flop_cards, BOARD_COLUMNS
+from scripts.process_monitor import get_gto_process_monitor
+from scripts.processing_queue import queue_documents_for_processing, format_result
+from scripts.solver_queue import sync_solver_queue
 import subprocess
 #from betting_op import BettingOppurtunity
 #from betting_op import * 
@@ -38,13 +50,103 @@ import subprocess
 
 # BettingOpportunity class is now imported from kk10.py
 
+# ------------------------------
+# Background query execution
+# ------------------------------
+def player_saw_flop(raw_text, player_name):
+    """Parses a hand and returns True if player_name was active when the flop was dealt."""
+    parser = get_hand_history_parser(raw_text)
+    hh_data = parser.parse(raw_text)
+    for node in hh_data.hand_history_tree.get_all_nodes():
+        if isinstance(node, StreetChange) and node.street == "flop":
+            return any(player and player.player == player_name and player.is_active
+                       for player in node.active_players)
+    return False
+
+def explain_query_cost(db, query, timeout_seconds=0):
+    """Returns (total_cost, estimated_rows) from the planner's estimate for query, without running it."""
+    with db.conn.cursor() as cur:
+        if timeout_seconds:
+            cur.execute("SET LOCAL statement_timeout = %s", (int(timeout_seconds * 1000),))
+        cur.execute(f"EXPLAIN (FORMAT JSON) {query}")
+        plan = cur.fetchone()[0]
+    db.conn.rollback()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    root = plan[0]["Plan"]
+    return root["Total Cost"], root["Plan Rows"]
+
+def execute_explorer_query(db, query, basic_query, flop_player=None, timeout_seconds=0):
+    """
+    Runs an explorer query on a worker connection (see AsyncDatabaseAccess).
+
+    If flop_player is given, the rows are filtered to hands where that player saw the flop.
+    timeout_seconds sets a statement_timeout for this query only (0 = no limit).
+    """
+    with db.conn.cursor() as cur:
+        if timeout_seconds:
+            # SET LOCAL only lasts until the rollback below, so other work on the connection is unaffected
+            cur.execute("SET LOCAL statement_timeout = %s", (int(timeout_seconds * 1000),))
+
+        # First, let's check how many hands match just the basic conditions
+        cur.execute(basic_query)
+        basic_count = cur.fetchone()[0]
+        print(f"Total hands matching basic conditions: {basic_count}")
+
+        # Now execute the full query
+        cur.execute(query)
+        rows = cur.fetchall()
+    db.conn.rollback()  # End the read transaction so the connection doesn't sit idle in transaction
+    print(f"Total hands matching all conditions: {len(rows)}")
+    return filter_rows_by_flop_player(rows, flop_player)
+
+def refresh_explorer_query(db, query, after_id, flop_player=None, timeout_seconds=0):
+    """
+    Runs a saved explorer query for hands newer than a snapshot (id > after_id), newest first.
+
+    Hand ids are assigned in ingest order, so the id predicate is pushed into the
+    saved query and only the new hands are read.
+    """
+    # The saved SQL has its literals inlined, so escape % before adding a parameter
+    incremental = f"SELECT * FROM ({query.replace('%', '%%')}) q WHERE q.id > %s ORDER BY q.id DESC"
+    with db.conn.cursor() as cur:
+        if timeout_seconds:
+            cur.execute("SET LOCAL statement_timeout = %s", (int(timeout_seconds * 1000),))
+        cur.execute(incremental, (after_id,))
+        rows = cur.fetchall()
+    db.conn.rollback()
+    print(f"New hands since snapshot: {len(rows)}")
+    return filter_rows_by_flop_player(rows, flop_player)
+
+def filter_rows_by_flop_player(rows, flop_player):
+    """Keeps the rows where flop_player saw the flop (all rows if flop_player is None)."""
+    if not flop_player:
+        return rows
+
+    filtered_rows = []
+    print(f"Filtering for player: {flop_player}")  # Debug log
+    for row in rows:
+        try:
+            if player_saw_flop(row[6], flop_player):
+                filtered_rows.append(row)
+        except Exception as e:
+            print(f"Error processing hand {row[0]}: {e}")
+            continue
+
+    print(f"Total hands after flop filtering: {len(filtered_rows)}")
+    return filtered_rows
+
 # ------------------------------
 # Review Panel Class
 # ------------------------------
 class ReviewPanel(ttk.Frame):
-    def __init__(self, parent, db_access, *args, **kwargs):
+    def __init__(self, parent, db_access, async_db=None, *args, **kwargs):
         super().__init__(parent, *args, **kwargs)
         self.db = db_access
+        self.async_db = async_db     # Optional AsyncDatabaseAccess for slow lookups
+        # Keeps track of GTO+ in the background so Move to Processing doesn't scan processes
+        self.gto_monitor = get_gto_process_monitor()
+        self.gto_monitor.start()
         self.current_hand_id = None
         self.current_hh_data = None  # To store the full hand data object
         self.current_spot = None     # To store the matched spot dictionary
@@ -192,9 +294,14 @@ class ReviewPanel(ttk.Frame):
         for item in self.study_notes_tree.get_children():
             self.study_notes_tree.delete(item)
             
-        relevant_docs = self.db.find_relevant_study_documents(hh_data)
-        for doc_id, title, file_path in relevant_docs:
-            self.study_notes_tree.insert("", tk.END, values=(doc_id, title, file_path))
+        if self.async_db:
+            # Rule matching scans every tag rule, so run it in the background
+            self.async_db.submit(
+                lambda db: db.find_relevant_study_documents(hh_data), channel="study_docs",
+                callback=lambda docs: self._populate_study_notes(hand_id, docs)
+            )
+        else:
+            self._populate_study_notes(hand_id, self.db.find_relevant_study_documents(hh_data))
 
         # Populate document list
         self.doc_list.delete(*self.doc_list.get_children())
@@ -205,6 +312,12 @@ class ReviewPanel(ttk.Frame):
         self.set_default_btn.config(state=tk.DISABLED)
         self.current_doc_id = None
 
+    def _populate_study_notes(self, hand_id, relevant_docs):
+        if hand_id != self.current_hand_id:
+            return  # Another hand was loaded while the lookup was running
+        for doc_id, title, file_path in relevant_docs:
+            self.study_notes_tree.insert("", tk.END, values=(doc_id, title, file_path))
+
     def _refresh_notes_tree(self):
         """Clears and re-populates the notes tree from the database."""
         for item in self.notes_tree.get_children():
@@ -431,37 +544,23 @@ class ReviewPanel(ttk.Frame):
             messagebox.showerror("Error", "Only GTO+ files can be moved to processing directory.")
             return
 
-        # Check if GTO+ is running
-        try:
-            import psutil
-            gto_running = False
-            
-            for proc in psutil.process_iter(['name']):
-                try:
-                    if proc.info['name'] and "GTO" in proc.info['name']:
-                        gto_running = True
-                        print(f"GTO+ is running: {proc.info['name']}")
-                        break
-                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                    continue
-            
-            if gto_running:
-                messagebox.showerror("Error", 
-                    "GTO+ is currently running.\n\nPlease close GTO+ before moving files to processing.")
-                return
-            else:
-                print("GTO+ is not running")
-                
-        except ImportError:
-            # psutil not available, skip the check
-            print("psutil not available, skipping GTO+ check")
-            pass
-        except Exception as e:
-            print(f"Warning: Could not check if GTO+ is running: {e}")
-            # Continue with the move operation if we can't check
+        # Check if GTO+ is running (the monitor's state is kept current in the background)
+        gto_running = self.gto_monitor.running
+        if gto_running is None:
+            try:
+                gto_running = self.gto_monitor.is_running()
+            except Exception as e:
+                print(f"Warning: Could not check if GTO+ is running: {e}")
+                # Continue with the move operation if we can't check
+        if gto_running:
+            messagebox.showerror("Error", 
+                "GTO+ is currently running.\n\nPlease close GTO+ before moving files to processing.")
+            return
+        elif gto_running is None:
+            print("Could not determine if GTO+ is running, skipping GTO+ check")
 
         # Check if file is already in processing directory
-        processing_dir = Path("C:\\@myfiles\\gtotorunwhenIleave\\")
+        processing_dir = Path(GTO_PROCESSING_PATH)
         if not processing_dir.exists():
             try:
                 processing_dir.mkdir(parents=True, exist_ok=True)
@@ -473,10 +572,10 @@ class ReviewPanel(ttk.Frame):
         filename = source_path.name
         
         # Check if file already starts with "0 - "
-        if filename.startswith("0 - "):
+        if filename.startswith(GTO_RUNNING_PREFIX):
             dest_filename = filename
         else:
-            dest_filename = f"0 - {filename}"
+            dest_filename = f"{GTO_RUNNING_PREFIX}{filename}"
         
         dest_path = processing_dir / dest_filename
 
@@ -498,6 +597,7 @@ class ReviewPanel(ttk.Frame):
             shutil.move(str(source_path), str(dest_path))
             self.move_status_var.set("File moved to processing successfully")
             print(f"Moved file from {source_path} to {dest_path}")
+            sync_solver_queue()
         except PermissionError:
             messagebox.showerror("Error", f"Permission denied moving file.\n\nPlease ensure the file is not open in any application.")
         except Exception as e:
@@ -699,20 +799,12 @@ class ReviewPanel(ttk.Frame):
             # Try to get flop cards from the hand history data
             flop_cards = []
             
-            # Method 1: Check if flop_cards attribute exists
-            if hasattr(self.current_hh_data, 'flop_cards') and self.current_hh_data.flop_cards:
-                flop_cards = self.current_hh_data.flop_cards
+            # Method 1: The stored board (load_hand sets flop_cards from hand_histories),
+            # falling back to the raw text for hands that haven't been backfilled
+            flop_cards = get_flop_cards(self.current_hh_data)
             
-            # Method 2: Extract from raw text using regex
-            elif hasattr(self.current_hh_data, 'raw_text') and self.current_hh_data.raw_text:
-                import re
-                flop_match = re.search(r'\*\*\* FLOP \*\*\* \[([^\]]+)\]', self.current_hh_data.raw_text)
-                if flop_match:
-                    flop_text = flop_match.group(1)
-                    flop_cards = [card.strip() for card in flop_text.split()]
-            
-            # Method 3: Check if there's a hand_history_tree with flop information
-            elif hasattr(self.current_hh_data, 'hand_history_tree'):
+            # Method 2: Check if there's a hand_history_tree with flop information
+            if not flop_cards and hasattr(self.current_hh_data, 'hand_history_tree'):
                 for node in self.current_hh_data.hand_history_tree.get_all_nodes():
                     if hasattr(node, 'street') and node.street == 'flop':
                         if hasattr(node, 'board_cards') and node.board_cards:
@@ -751,12 +843,25 @@ class HandHistoryExplorer(tk.Tk):
         
         # Create our database access instance.
         self.db = DatabaseAccess(**DB_PARAMS)
-        self.game_profiles = self.db.get_game_profiles()
-        self.all_spots = self.db.get_spots_for_dropdowns()
+        # Background connections for queries that would otherwise block the UI
+        self.async_db = AsyncDatabaseAccess(DB_PARAMS, tk_root=self)
+        # Reference data for the dropdowns, invalidated by change notifications from the admin tools
+        self.reference_cache = ReferenceDataCache(self.db, DB_PARAMS, tk_root=self)
+        self.reference_cache.add_listener(self._on_reference_data_changed)
+        self.game_profiles = self.reference_cache.get_game_profiles()
+        self.all_spots = self.reference_cache.get_spots_for_dropdowns()
+        # The board columns exist once add_board_card_columns.py has run; until then hands
+        # are loaded without them and the parser reads the board from the text
+        self.has_board_columns = set(BOARD_COLUMNS) <= self.db.get_table_columns("hand_histories")
+        if not self.has_board_columns:
+            print("Board columns not found; run database_setup/schema/add_board_card_columns.py")
         # Initialize our saved state manager.
-        self.state_manager = SavedStateManager("saved_states.json")
+        self.state_manager = SavedStateManager(SAVED_STATES_FILE, import_json="saved_states.json")
         # Initialize query results and current index.
         self.query_results = []
+        self.last_query = None       # build_explorer_query() result behind query_results
+        self.hand_format_cache = HandFormatCache()  # Popup text per hand, so reopening a popup is instant
+        self.loaded_snapshot = None  # (state name, snapshot) of the last loaded saved state
         self.current_index = 0
         # Keep track of left panel visibility.
         self.left_visible = True
@@ -783,7 +888,7 @@ class HandHistoryExplorer(tk.Tk):
         self.main_paned.add(self.left_frame, weight=1)
         
         # Review Panel: Review controls and notes.
-        self.review_panel = ReviewPanel(self.main_paned, self.db)
+        self.review_panel = ReviewPanel(self.main_paned, self.db, self.async_db)
         self.main_paned.add(self.review_panel, weight=1)
         
         # Right Panel: Hand History Display and Navigation.
@@ -849,6 +954,8 @@ class HandHistoryExplorer(tk.Tk):
         self.pf_spot_label.grid(row=5, column=0, sticky=tk.E, padx=5, pady=5)
         # Dropdown setup (keep reference for dynamic update)
         self.pf_actions = self.all_spots.get('preflop', {})
+        # Where pf_actions came from: "spots" (by game profile) or "preflop_states" (hand_state by game type)
+        self.pf_actions_source = "spots"
         pf_options = sorted(self.pf_actions.keys(), key=lambda x: int(x) if x.isdigit() else 999)
         self.pf_seq_var = tk.StringVar(value="37")
         self.pf_seq_combo = ttk.Combobox(query_frame, textvariable=self.pf_seq_var,
@@ -964,20 +1071,38 @@ class HandHistoryExplorer(tk.Tk):
         self.review_status_filter_combo.grid(row=12, column=1, sticky=tk.W, padx=5, pady=5)
         # (You may need to renumber grid rows for widgets below this)
 
+        # Per-query statement timeout in seconds (0 = no limit)
+        ttk.Label(query_frame, text="Timeout (s):").grid(row=12, column=2, sticky=tk.E, padx=5, pady=5)
+        self.statement_timeout_var = tk.StringVar(value=str(QUERY_STATEMENT_TIMEOUT_SECONDS))
+        self.statement_timeout_entry = ttk.Entry(query_frame, textvariable=self.statement_timeout_var, width=8)
+        self.statement_timeout_entry.grid(row=12, column=3, sticky=tk.W, padx=5, pady=5)
+
+        # Effective stack filter in big blinds (effective_stack_bb column, see add_effective_stack_column.py)
+        ttk.Label(query_frame, text="Min Stack (bb):").grid(row=13, column=0, sticky=tk.E, padx=5, pady=5)
+        self.min_stack_bb_var = tk.StringVar()
+        ttk.Entry(query_frame, textvariable=self.min_stack_bb_var, width=8).grid(row=13, column=1, sticky=tk.W, padx=5, pady=5)
+        ttk.Label(query_frame, text="Max Stack (bb):").grid(row=13, column=2, sticky=tk.E, padx=5, pady=5)
+        self.max_stack_bb_var = tk.StringVar()
+        ttk.Entry(query_frame, textvariable=self.max_stack_bb_var, width=8).grid(row=13, column=3, sticky=tk.W, padx=5, pady=5)
+
         self.query_button = ttk.Button(query_frame, text="Run Query", command=self.run_query)
-        self.query_button.grid(row=13, column=0, columnspan=2, pady=10, sticky=tk.W)
+        self.query_button.grid(row=14, column=0, pady=10, sticky=tk.W)
+        
+        # Cancel button stops the running query on the server
+        self.cancel_query_button = ttk.Button(query_frame, text="Cancel", command=self.cancel_query, state=tk.DISABLED)
+        self.cancel_query_button.grid(row=14, column=1, pady=10, sticky=tk.W)
         
         # Add Show Query button next to Run Query button
         self.show_query_button = ttk.Button(query_frame, text="Show Query", command=self.show_query)
-        self.show_query_button.grid(row=13, column=2, pady=10, sticky=tk.W)
+        self.show_query_button.grid(row=14, column=2, pady=10, sticky=tk.W)
         
         # Add after the query button
         refresh_btn = ttk.Button(query_frame, text="↻ Refresh Dropdowns", command=self.refresh_all_dropdowns)
-        refresh_btn.grid(row=13, column=3, pady=10, sticky=tk.E)
+        refresh_btn.grid(row=14, column=3, pady=10, sticky=tk.E)
         
         # --- New: State Name Display ---
         state_display_frame = ttk.LabelFrame(query_frame, text="Current Hand State")
-        state_display_frame.grid(row=14, column=0, columnspan=4, sticky=tk.EW, padx=5, pady=5)
+        state_display_frame.grid(row=15, column=0, columnspan=4, sticky=tk.EW, padx=5, pady=5)
         
         ttk.Label(state_display_frame, text="Matching State Name:").grid(row=0, column=0, sticky=tk.E, padx=5, pady=5)
         self.matching_state_var = tk.StringVar(value="No hand loaded")
@@ -1001,6 +1126,26 @@ class HandHistoryExplorer(tk.Tk):
         spot_profiles_btn = ttk.Button(parent, text="Manage Spot Profiles", command=self.open_spot_profile_manager)
         spot_profiles_btn.pack(fill=tk.X, padx=5, pady=5)
         
+        # --- Batch Queue Button ---
+        queue_btn = ttk.Button(parent, text="Queue Results for GTO+", command=self.queue_results_for_processing)
+        queue_btn.pack(fill=tk.X, padx=5, pady=5)
+        
+        # --- Sequence Frequencies Button ---
+        seq_freq_btn = ttk.Button(parent, text="Sequence Frequencies", command=self.open_sequence_frequencies)
+        seq_freq_btn.pack(fill=tk.X, padx=5, pady=5)
+        
+        # --- Bet Sizing Button ---
+        bet_sizing_btn = ttk.Button(parent, text="Bet Sizing for Results", command=self.open_bet_sizing)
+        bet_sizing_btn.pack(fill=tk.X, padx=5, pady=5)
+        
+        # --- Decision Tree Button ---
+        decision_tree_btn = ttk.Button(parent, text="Decision Tree for Results", command=self.open_decision_tree)
+        decision_tree_btn.pack(fill=tk.X, padx=5, pady=5)
+        
+        # --- Player Stats Button ---
+        player_stats_btn = ttk.Button(parent, text="Player Stats", command=self.show_player_stats)
+        player_stats_btn.pack(fill=tk.X, padx=5, pady=5)
+        
         # --- Existing: New PF Action Panel and State Management Panel ---
         new_pf_frame = ttk.LabelFrame(parent, text="New PF Action")
         new_pf_frame.pack(fill=tk.X, padx=5, pady=5)
@@ -1042,6 +1187,13 @@ class HandHistoryExplorer(tk.Tk):
         self.load_state_button.grid(row=2, column=2, padx=5, pady=5)
         self.delete_state_button = ttk.Button(state_frame, text="Delete State", command=self.delete_state)
         self.delete_state_button.grid(row=3, column=2, padx=5, pady=5)
+        
+        # Saving with a snapshot stores the query's SQL and result ids for instant restore
+        self.state_snapshot_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(state_frame, text="Snapshot results", variable=self.state_snapshot_var).grid(
+            row=1, column=1, sticky=tk.W, padx=5, pady=5)
+        self.refresh_snapshot_button = ttk.Button(state_frame, text="Refresh Snapshot", command=self.refresh_snapshot)
+        self.refresh_snapshot_button.grid(row=3, column=1, padx=5, pady=5)
     
     def build_right_panel(self, parent):
         results_frame = ttk.Frame(parent)
@@ -1085,35 +1237,10 @@ class HandHistoryExplorer(tk.Tk):
         game_type = self.pf_game_type_var.get().strip()
         pf_actions = {}
         try:
-            query_named = (
-                f"SELECT state_name, state_value FROM hand_state "
-                f"WHERE state_type = 'preflop' AND game_type = '{game_type}' AND TRIM(state_name) <> '' "
-                f"ORDER BY state_name::int ASC"
-            )
-            with self.db.conn.cursor() as cur:
-                cur.execute(query_named)
-                rows = cur.fetchall()
-            for row in rows:
-                state_name, state_value = row
-                pf_actions[str(state_name).strip()] = str(state_value).strip()
-            query_unnamed = (
-                f"SELECT DISTINCT pf_action_seq FROM hand_histories "
-                f"WHERE game_type LIKE '{game_type}%' AND pf_action_seq IS NOT NULL "
-                f"AND pf_action_seq NOT IN ("
-                f"    SELECT state_value FROM hand_state "
-                f"    WHERE state_type = 'preflop' AND game_type = '{game_type}'"
-                f") "
-                f"ORDER BY pf_action_seq"
-            )
-            with self.db.conn.cursor() as cur:
-                cur.execute(query_unnamed)
-                unnamed_rows = cur.fetchall()
-            if unnamed_rows:
-                unnamed_list = [str(r[0]).strip() for r in unnamed_rows]
-                aggregated = "; ".join(sorted(set(unnamed_list)))
-                pf_actions["Unnamed"] = aggregated
-            else:
-                pf_actions["Unnamed"] = ""
+            pf_actions.update(self.reference_cache.get_preflop_states(game_type))
+            # "Unnamed" with an empty action string matches every sequence without a hand_state
+            # name (see build_explorer_query); enter specific sequences to narrow it down.
+            pf_actions["Unnamed"] = ""
         except Exception as e:
             print("Error retrieving PF actions from DB:", e)
         return pf_actions
@@ -1130,6 +1257,7 @@ class HandHistoryExplorer(tk.Tk):
         return options
     
     def refresh_pf_actions(self):
+        self.pf_actions_source = "preflop_states"
         self.pf_actions = self.load_pf_actions()
         options = self.build_pf_options(self.pf_actions)
         self.pf_seq_combo['values'] = options
@@ -1141,18 +1269,7 @@ class HandHistoryExplorer(tk.Tk):
             self.pf_action_str_var.set("")
     
     def load_postflop_patterns(self):
-        query = "SELECT pattern_name, sql_pattern FROM action_patterns WHERE applies_to = 'postflop' ORDER BY pattern_name"
-        patterns = {}
-        try:
-            with self.db.conn.cursor() as cur:
-                cur.execute(query)
-                rows = cur.fetchall()
-            for row in rows:
-                pattern_name, sql_pattern = row
-                patterns[pattern_name.strip()] = sql_pattern.strip()
-        except Exception as e:
-            print("Error retrieving postflop patterns from DB:", e)
-        return patterns
+        return dict(self.reference_cache.get_action_patterns('postflop'))
     
     def on_pf_selection(self, event):
         selected = self.pf_seq_var.get().strip()
@@ -1183,220 +1300,257 @@ class HandHistoryExplorer(tk.Tk):
             sql_pattern = self.all_spots.get('postflop', {}).get(selected, "")
             self.river_sql_pattern_var.set(sql_pattern)
     
-    def run_query(self):
-        try:
-            # Use LEFT JOIN to hand_reviews and filter by status if needed
-            base_select = """
-                SELECT hh.id, hh.game_type, hh.pf_action_seq, hh.flop_action_seq, 
-                       hh.turn_action_seq, hh.river_action_seq, hh.raw_text 
-                FROM hand_histories hh
-                LEFT JOIN hand_reviews hr ON hh.id = hr.hand_id
-            """
-            qb = QueryBuilder(base_select)
+    def build_explorer_query(self):
+        """
+        Builds the explorer query from the current input widgets.
+
+        Returns:
+            dict: {"query", "basic_query", "flop_player"} where flop_player is set when
+                  results still need to be filtered by parsing each hand, or None if
+                  the inputs are invalid.
+        """
+        # Use LEFT JOIN to hand_reviews and filter by status if needed
+        board_select = ", ".join(f"hh.{c}" if self.has_board_columns else "NULL" for c in BOARD_COLUMNS)
+        base_select = f"""
+            SELECT hh.id, hh.game_type, hh.pf_action_seq, hh.flop_action_seq, 
+                   hh.turn_action_seq, hh.river_action_seq, hh.raw_text,
+                   {board_select}
+            FROM hand_histories hh
+            LEFT JOIN hand_reviews hr ON hh.id = hr.hand_id
+        """
+        qb = QueryBuilder(base_select)
+        
+        # Add structured format conditions if specified
+        game_class = self.game_class_var.get().strip()
+        game_variant = self.game_variant_var.get().strip()
+        table_size = self.table_size_var.get().strip()
+        
+        # Use structured format fields if any are specified, otherwise fall back to game_type
+        if game_class or game_variant or table_size:
+            if game_class:
+                qb.add_condition(Condition("game_class", "=", game_class))
+            if game_variant:
+                qb.add_condition(Condition("game_variant", "=", game_variant))
+            if table_size:
+                qb.add_condition(Condition("table_size", "=", table_size))
+        else:
+            # Fall back to legacy game_type pattern
+            game_type = self.pf_game_type_var.get().strip()
+            qb.add_condition(Condition("game_type", "LIKE", f"{game_type}%"))
+        
+        # Add time period condition if enabled
+        if self.time_period_var.get():
+            try:
+                time_period = int(self.time_period_entry_var.get().strip())
+                if time_period > 0:  # Only add condition if time period is positive
+                    qb.add_condition(Condition("created_at", ">=", f"NOW() - INTERVAL '{time_period} hours'"))
+            except ValueError:
+                messagebox.showerror("Error", "Please enter a valid number of hours.")
+                return None
+        
+        # Add player flop condition if enabled
+        flop_player = None
+        if self.player_flop_var.get():
+            player_name = self.player_flop_entry_var.get().strip()
+            print(f"Searching for player: {player_name}")  # Debug log
+            if not player_name:
+                messagebox.showerror("Error", "Please enter a player name.")
+                return None
             
-            # Add structured format conditions if specified
-            game_class = self.game_class_var.get().strip()
-            game_variant = self.game_variant_var.get().strip()
-            table_size = self.table_size_var.get().strip()
+            # Add condition to check if hand reached flop
+            qb.add_condition(Condition("flop_action_seq", "IS NOT NULL", ""))
             
-            # Use structured format fields if any are specified, otherwise fall back to game_type
-            if game_class or game_variant or table_size:
-                if game_class:
-                    qb.add_condition(Condition("game_class", "=", game_class))
-                if game_variant:
-                    qb.add_condition(Condition("game_variant", "=", game_variant))
-                if table_size:
-                    qb.add_condition(Condition("table_size", "=", table_size))
-            else:
-                # Fall back to legacy game_type pattern
-                game_type = self.pf_game_type_var.get().strip()
-                qb.add_condition(Condition("game_type", "LIKE", f"{game_type}%"))
+            # Get the preflop sequence to optimize the query
+            pf_selected = self.pf_seq_var.get().strip()
+            pf_action_str = self.pf_action_str_var.get().strip()
             
-            # Add time period condition if enabled
-            if self.time_period_var.get():
+            # Try to use preflop sequence analysis for optimization
+            use_optimized_conditions = False
+            if pf_selected != "Unnamed" and pf_action_str:
+                # We have a specific preflop sequence, analyze it
+                flop_conditions = self.construct_flop_query_conditions(pf_action_str, player_name)
+                if flop_conditions:
+                    # Use the optimized conditions with OR logic
+                    print(f"Using optimized flop conditions for positions: {[self.get_position_name_from_number(pos) for pos in self.analyze_pf_sequence_for_flop_positions(pf_action_str)]}")
+                    
+                    # Build OR condition manually since QueryBuilder doesn't support OR
+                    position_conditions = []
+                    for condition in flop_conditions:
+                        position_conditions.append(f"{condition.field} = '{condition.value}'")
+                    
+                    if position_conditions:
+                        or_condition = " OR ".join(position_conditions)
+                        # Add as a raw condition
+                        qb.add_condition(Condition(f"({or_condition})", "", ""))
+                        use_optimized_conditions = True
+                
+            if not use_optimized_conditions:
+                # Fall back to the general position check and filter the results by parsing each hand
+                qb.add_condition(Condition("positions::text", "LIKE", f"%{player_name}%"))
+                flop_player = player_name
+        
+        # Add existing conditions
+        pf_selected = self.pf_seq_var.get().strip()
+        pf_action_str = self.pf_action_str_var.get().strip()
+        print(f"DEBUG: pf_selected = '{pf_selected}', pf_action_str = '{pf_action_str}' (type: {type(pf_action_str)})")
+        # Use different logic depending on the checkbox
+        if hasattr(self, 'pf_action_no_var') and not self.pf_action_no_var.get():
+            # Checkbox is unchecked: use preflop pattern SQL
+            pf_sql_pattern = self.pf_sql_pattern_var.get().strip()
+            if pf_sql_pattern:
+                qb.add_condition(Condition("pf_action_seq", "~", pf_sql_pattern))
+        else:
+            # Checkbox is checked: use preflop action number logic
+            if pf_selected == "Unnamed":
+                pf_values = tuple(v.strip() for v in pf_action_str.split(";") if v.strip())
+                if pf_values:
+                    qb.add_condition(Condition("pf_action_seq", "IN", pf_values))
+                elif "Unnamed" in self.pf_actions:
+                    # No values specified with the hand_state list loaded (see load_pf_actions):
+                    # match every sequence that has no named state. With the spot list, match all.
+                    pf_game_type = self.pf_game_type_var.get().strip().replace("'", "''")
+                    qb.add_condition(Condition(
+                        "hh.pf_action_seq IS NOT NULL AND NOT EXISTS ("
+                        "SELECT 1 FROM hand_state hs WHERE hs.state_type = 'preflop' "
+                        f"AND hs.game_type = '{pf_game_type}' AND hs.state_value = hh.pf_action_seq)",
+                        "", ""
+                    ))
+            elif pf_action_str:  # Only add condition if pf_action_str is not empty
+                qb.add_condition(Condition("pf_action_seq", "=", pf_action_str))
+        
+        flop_sql_pattern = self.flop_sql_pattern_var.get().strip()
+        if flop_sql_pattern:
+            qb.add_condition(Condition("flop_action_seq", "~", flop_sql_pattern))
+        turn_sql_pattern = self.turn_sql_pattern_var.get().strip()
+        if turn_sql_pattern:
+            qb.add_condition(Condition("turn_action_seq", "~", turn_sql_pattern))
+        river_sql_pattern = self.river_sql_pattern_var.get().strip()
+        if river_sql_pattern:
+            qb.add_condition(Condition("river_action_seq", "~", river_sql_pattern))
+        button_name = self.button_name_var.get().strip()
+        if button_name:
+            qb.add_condition(Condition("button_name", "=", button_name))
+        position = self.position_var.get().strip()
+        position_player = self.position_player_var.get().strip()
+        if position and position != "None" and position_player:
+            qb.add_condition(Condition(f"positions->>'{position}'", "=", position_player))
+        
+        for var, operator in ((self.min_stack_bb_var, ">="), (self.max_stack_bb_var, "<=")):
+            stack_bb = var.get().strip()
+            if stack_bb:
                 try:
-                    time_period = int(self.time_period_entry_var.get().strip())
-                    if time_period > 0:  # Only add condition if time period is positive
-                        qb.add_condition(Condition("created_at", ">=", f"NOW() - INTERVAL '{time_period} hours'"))
+                    qb.add_condition(Condition("hh.effective_stack_bb", operator, float(stack_bb)))
                 except ValueError:
-                    messagebox.showerror("Error", "Please enter a valid number of hours.")
-                    return
-            
-            # Add player flop condition if enabled
-            if self.player_flop_var.get():
-                player_name = self.player_flop_entry_var.get().strip()
-                print(f"Searching for player: {player_name}")  # Debug log
-                if not player_name:
-                    messagebox.showerror("Error", "Please enter a player name.")
-                    return
-                
-                # Add condition to check if hand reached flop
-                qb.add_condition(Condition("flop_action_seq", "IS NOT NULL", ""))
-                
-                # Get the preflop sequence to optimize the query
-                pf_selected = self.pf_seq_var.get().strip()
-                pf_action_str = self.pf_action_str_var.get().strip()
-                
-                # Try to use preflop sequence analysis for optimization
-                use_optimized_conditions = False
-                if pf_selected != "Unnamed" and pf_action_str:
-                    # We have a specific preflop sequence, analyze it
-                    flop_conditions = self.construct_flop_query_conditions(pf_action_str, player_name)
-                    if flop_conditions:
-                        # Use the optimized conditions with OR logic
-                        print(f"Using optimized flop conditions for positions: {[self.get_position_name_from_number(pos) for pos in self.analyze_pf_sequence_for_flop_positions(pf_action_str)]}")
-                        
-                        # Build OR condition manually since QueryBuilder doesn't support OR
-                        position_conditions = []
-                        for condition in flop_conditions:
-                            position_conditions.append(f"{condition.field} = '{condition.value}'")
-                        
-                        if position_conditions:
-                            or_condition = " OR ".join(position_conditions)
-                            # Add as a raw condition
-                            qb.add_condition(Condition(f"({or_condition})", "", ""))
-                            use_optimized_conditions = True
-                    
-                if not use_optimized_conditions:
-                    # Fall back to the general position check
-                    qb.add_condition(Condition("positions::text", "LIKE", f"%{player_name}%"))
-            
-            # Add existing conditions
-            pf_selected = self.pf_seq_var.get().strip()
-            pf_action_str = self.pf_action_str_var.get().strip()
-            print(f"DEBUG: pf_selected = '{pf_selected}', pf_action_str = '{pf_action_str}' (type: {type(pf_action_str)})")
-            # Use different logic depending on the checkbox
-            if hasattr(self, 'pf_action_no_var') and not self.pf_action_no_var.get():
-                # Checkbox is unchecked: use preflop pattern SQL
-                pf_sql_pattern = self.pf_sql_pattern_var.get().strip()
-                if pf_sql_pattern:
-                    qb.add_condition(Condition("pf_action_seq", "~", pf_sql_pattern))
+                    messagebox.showerror("Error", "Please enter a valid stack depth in big blinds.")
+                    return None
+        
+        selected_status = self.review_status_filter_var.get()
+        if selected_status != "All":
+            if selected_status == 'unreviewed':
+                qb.add_condition(Condition("(hr.review_status IS NULL OR hr.review_status = 'unreviewed')", "", ""))
             else:
-                # Checkbox is checked: use preflop action number logic
-                if pf_selected == "Unnamed":
-                    pf_values = tuple(v.strip() for v in pf_action_str.split(";") if v.strip())
-                    if pf_values:
-                        qb.add_condition(Condition("pf_action_seq", "IN", pf_values))
-                    # If no values specified, don't add any condition - let it match all
-                elif pf_action_str:  # Only add condition if pf_action_str is not empty
-                    qb.add_condition(Condition("pf_action_seq", "=", pf_action_str))
-            
-            flop_sql_pattern = self.flop_sql_pattern_var.get().strip()
-            if flop_sql_pattern:
-                qb.add_condition(Condition("flop_action_seq", "~", flop_sql_pattern))
-            turn_sql_pattern = self.turn_sql_pattern_var.get().strip()
-            if turn_sql_pattern:
-                qb.add_condition(Condition("turn_action_seq", "~", turn_sql_pattern))
-            river_sql_pattern = self.river_sql_pattern_var.get().strip()
-            if river_sql_pattern:
-                qb.add_condition(Condition("river_action_seq", "~", river_sql_pattern))
-            button_name = self.button_name_var.get().strip()
-            if button_name:
-                qb.add_condition(Condition("button_name", "=", button_name))
-            position = self.position_var.get().strip()
-            position_player = self.position_player_var.get().strip()
-            if position and position != "None" and position_player:
-                qb.add_condition(Condition(f"positions->>'{position}'", "=", position_player))
-            
-            selected_status = self.review_status_filter_var.get()
-            if selected_status != "All":
-                if selected_status == 'unreviewed':
-                    qb.add_condition(Condition("(hr.review_status IS NULL OR hr.review_status = 'unreviewed')", "", ""))
-                else:
-                    qb.add_condition(Condition("hr.review_status", "=", selected_status))
-            
-            # Add sorting by created_at in descending order
-            qb.add_sort(SortCriterion("created_at", "DESC"))
-            query = qb.build_query()
+                qb.add_condition(Condition("hr.review_status", "=", selected_status))
+        
+        # Add sorting by created_at in descending order
+        qb.add_sort(SortCriterion("created_at", "DESC"))
+        query = qb.build_query()
+        
+        # Count of hands matching just the basic format conditions, for the debug log
+        if game_class or game_variant or table_size:
+            # Build structured format query
+            conditions = []
+            if game_class:
+                conditions.append(f"game_class = '{game_class}'")
+            if game_variant:
+                conditions.append(f"game_variant = '{game_variant}'")
+            if table_size:
+                conditions.append(f"table_size = '{table_size}'")
+            
+            basic_query = f"SELECT COUNT(*) FROM hand_histories WHERE {' AND '.join(conditions)}"
+        else:
+            # Fall back to legacy game_type pattern
+            game_type = self.pf_game_type_var.get().strip()
+            basic_query = f"SELECT COUNT(*) FROM hand_histories WHERE game_type LIKE '{game_type}%'"
+        
+        return {"query": query, "basic_query": basic_query, "flop_player": flop_player}
+    
+    def run_query(self):
+        try:
+            built = self.build_explorer_query()
+            if built is None:
+                return
+            try:
+                timeout_seconds = float(self.statement_timeout_var.get().strip() or 0)
+            except ValueError:
+                messagebox.showerror("Error", "Please enter a valid timeout in seconds.")
+                return
+            built["timeout_seconds"] = timeout_seconds
+            self.loaded_snapshot = None  # New results no longer belong to a loaded snapshot
             
             # Print the query for debugging
-            print("Generated SQL Query:", query)
-            
-            # Reset any failed transaction
-            self.db.conn.rollback()
+            print("Generated SQL Query:", built["query"])
             
-            with self.db.conn.cursor() as cur:
-                # First, let's check how many hands match just the basic conditions
-                game_class = self.game_class_var.get().strip()
-                game_variant = self.game_variant_var.get().strip()
-                table_size = self.table_size_var.get().strip()
-                
-                if game_class or game_variant or table_size:
-                    # Build structured format query
-                    conditions = []
-                    if game_class:
-                        conditions.append(f"game_class = '{game_class}'")
-                    if game_variant:
-                        conditions.append(f"game_variant = '{game_variant}'")
-                    if table_size:
-                        conditions.append(f"table_size = '{table_size}'")
-                    
-                    basic_query = f"SELECT COUNT(*) FROM hand_histories WHERE {' AND '.join(conditions)}"
-                else:
-                    # Fall back to legacy game_type pattern
-                    game_type = self.pf_game_type_var.get().strip()
-                    basic_query = f"SELECT COUNT(*) FROM hand_histories WHERE game_type LIKE '{game_type}%'"
-                
-                cur.execute(basic_query)
-                basic_count = cur.fetchone()[0]
-                print(f"Total hands matching basic conditions: {basic_count}")
-                
-                # Now execute the full query
-                cur.execute(query)
-                rows = cur.fetchall()
-                print(f"Total hands matching all conditions: {len(rows)}")
-                
-                # If player flop filter is enabled, filter results to only include hands where player saw the flop
-                if self.player_flop_var.get():
-                    # Check if we used optimized conditions
-                    if 'use_optimized_conditions' in locals() and use_optimized_conditions:
-                        print("Using optimized conditions - skipping post-processing")
-                        self.query_results = rows
-                    else:
-                        filtered_rows = []
-                        player_name = self.player_flop_entry_var.get().strip()  # Get the player name again
-                        print(f"Filtering for player: {player_name}")  # Debug log
-                        for row in rows:
-                            try:
-                                # Parse the hand history
-                                parser = get_hand_history_parser(row[6])
-                                hh_data = parser.parse(row[6])
-                                
-                                # Check if player was active on the flop
-                                flop_node = None
-                                for node in hh_data.hand_history_tree.get_all_nodes():
-                                    if isinstance(node, StreetChange) and node.street == "flop":
-                                        flop_node = node
-                                        break
-                                
-                                if flop_node:
-                                    # Check if player was active at the flop
-                                    player_active = False
-                                    for player in flop_node.active_players:
-                                        if player and player.player == player_name and player.is_active:
-                                            player_active = True
-                                            break
-                                    
-                                    if player_active:
-                                        filtered_rows.append(row)
-                            except Exception as e:
-                                print(f"Error processing hand {row[0]}: {e}")
-                                continue
-                        
-                        print(f"Total hands after flop filtering: {len(filtered_rows)}")
-                        self.query_results = filtered_rows
-                else:
-                    self.query_results = rows
-                
-                self.current_index = 0
-                self.display_current_result()
-                
-        except Exception as e:
             self.result_text.delete("1.0", tk.END)
-            self.result_text.insert(tk.END, f"Error executing query: {e}\n")
-            # Reset any failed transaction
-            self.db.conn.rollback()
-            return
+            self.result_text.insert(tk.END, "Estimating query cost...\n")
+            self.cancel_query_button.config(state=tk.NORMAL)
+            
+            # Ask the planner first so runaway scans can be stopped before they start
+            self.async_db.submit(
+                explain_query_cost, built["query"], timeout_seconds,
+                channel="query", callback=lambda estimate: self._on_query_estimate(built, estimate),
+                error_callback=self._on_query_error
+            )
+        except Exception as e:
+            self._on_query_error(e)
+    
+    def _on_query_estimate(self, built, estimate):
+        """Warns about expensive plans, then runs the query on the background connection."""
+        total_cost, estimated_rows = estimate
+        print(f"Planner estimate: cost={total_cost:.0f}, rows={estimated_rows}")
+        if total_cost > QUERY_COST_WARNING_THRESHOLD:
+            proceed = messagebox.askyesno(
+                "Expensive Query",
+                f"The planner estimates a cost of {total_cost:,.0f} (~{estimated_rows:,} rows), "
+                f"above the warning threshold of {QUERY_COST_WARNING_THRESHOLD:,.0f}.\n\n"
+                "This may scan most of hand_histories. Run it anyway?"
+            )
+            if not proceed:
+                self.cancel_query_button.config(state=tk.DISABLED)
+                self.result_text.delete("1.0", tk.END)
+                self.result_text.insert(tk.END, "Query not run. Narrow the filters and try again.\n")
+                return
+        
+        self.result_text.delete("1.0", tk.END)
+        self.result_text.insert(tk.END, "Running query...\n")
+        # A previous query still running on this channel is cancelled
+        self.async_db.submit(
+            execute_explorer_query, built["query"], built["basic_query"], built["flop_player"],
+            built["timeout_seconds"], channel="query",
+            callback=lambda rows: self._on_query_results(rows, built), error_callback=self._on_query_error
+        )
+    
+    def cancel_query(self):
+        """Cancels the running explorer query with the connection's cancel request."""
+        self.async_db.cancel("query", use_connection_cancel=True)
+        self.cancel_query_button.config(state=tk.DISABLED)
+        self.result_text.delete("1.0", tk.END)
+        self.result_text.insert(tk.END, "Query cancelled.\n")
+    
+    def _on_query_results(self, rows, built=None):
+        """Called on the Tk thread when the background query finishes."""
+        self.cancel_query_button.config(state=tk.DISABLED)
+        self.last_query = built      # What produced query_results, for result snapshots
+        self.query_results = rows
+        self.current_index = 0
+        self.display_current_result()
+    
+    def _on_query_error(self, error):
+        self.cancel_query_button.config(state=tk.DISABLED)
+        self.result_text.delete("1.0", tk.END)
+        if getattr(error, "pgcode", None) == "57014":  # query_canceled
+            self.result_text.insert(tk.END, "Query stopped: it was cancelled or exceeded the statement timeout.\n")
+        else:
+            self.result_text.insert(tk.END, f"Error executing query: {error}\n")
     
     def display_current_result(self):
         try:
@@ -1406,7 +1560,7 @@ class HandHistoryExplorer(tk.Tk):
                 self.matching_state_var.set("No hand loaded")
             else:
                 row = self.query_results[self.current_index]
-                (hand_id, game_type, pf_seq, flop_seq, turn_seq, river_seq, raw_text) = row
+                (hand_id, game_type, pf_seq, flop_seq, turn_seq, river_seq, raw_text) = row[:7]
                 
                 # Parse the hand history to get HandHistoryData
                 try:
@@ -1486,6 +1640,7 @@ class HandHistoryExplorer(tk.Tk):
             with self.db.conn.cursor() as cur:
                 cur.execute(insert_query, (new_pf_number, new_pf_string, new_game_type))
             self.db.conn.commit()
+            self.reference_cache.invalidate("hand_state")
             messagebox.showinfo("Success", f"New PF Action {new_pf_number} saved successfully.")
             if new_game_type == self.pf_game_type_var.get().strip():
                 self.pf_actions[new_pf_number] = new_pf_string
@@ -1514,12 +1669,34 @@ class HandHistoryExplorer(tk.Tk):
             "button_name": self.button_name_var.get().strip(),
             "position": self.position_var.get().strip(),
             "position_player": self.position_player_var.get().strip(),
-            "pf_action_string": self.pf_action_str_var.get().strip()
+            "pf_action_string": self.pf_action_str_var.get().strip(),
+            "min_stack_bb": self.min_stack_bb_var.get().strip(),
+            "max_stack_bb": self.max_stack_bb_var.get().strip()
         }
+        if self.state_snapshot_var.get():
+            if not self.query_results or not self.last_query:
+                messagebox.showerror("Error", "Run a query first to snapshot its results.")
+                return
+            state_data["snapshot"] = self.build_result_snapshot(self.last_query, self.query_results)
         self.state_manager.set_state(state_name, state_data)
         self.refresh_state_list()
         messagebox.showinfo("Saved", f"State '{state_name}' saved successfully.")
     
+    @staticmethod
+    def build_result_snapshot(built, rows, snapshot_at=None):
+        """
+        Builds the "snapshot" part of a saved state: the compiled SQL plus the ordered
+        hand ids it returned, so the results can be restored without re-running the query.
+        """
+        hand_ids = [row[0] for row in rows]
+        return {
+            "sql": built["query"],
+            "flop_player": built["flop_player"],
+            "hand_ids": hand_ids,
+            "max_id": max(hand_ids) if hand_ids else 0,
+            "snapshot_at": snapshot_at or datetime.now().isoformat(timespec="seconds"),
+        }
+    
     def load_state(self):
         selection = self.state_list.curselection()
         if not selection:
@@ -1541,14 +1718,62 @@ class HandHistoryExplorer(tk.Tk):
             self.position_var.set(state_data.get("position", "None"))
             self.position_player_var.set(state_data.get("position_player", ""))
             self.pf_action_str_var.set(state_data.get("pf_action_string", ""))
+            self.min_stack_bb_var.set(state_data.get("min_stack_bb", ""))
+            self.max_stack_bb_var.set(state_data.get("max_stack_bb", ""))
             self.on_pf_selection(None)
             self.on_flop_pattern_selection(None)
             self.on_turn_pattern_selection(None)
             self.on_river_pattern_selection(None)
-            messagebox.showinfo("Loaded", f"State '{state_name}' loaded successfully.")
+            snapshot = state_data.get("snapshot")
+            self.loaded_snapshot = (state_name, snapshot) if snapshot else None
+            if snapshot:
+                self.restore_result_snapshot(snapshot)
+                messagebox.showinfo("Loaded", f"State '{state_name}' loaded successfully.\n\n"
+                                    f"Restoring {len(snapshot['hand_ids'])} saved results from {snapshot['snapshot_at']}.")
+            else:
+                messagebox.showinfo("Loaded", f"State '{state_name}' loaded successfully.")
         else:
             messagebox.showerror("Error", f"State '{state_name}' not found.")
     
+    def restore_result_snapshot(self, snapshot):
+        """Loads a snapshot's hands by id instead of re-running its query."""
+        self.result_text.delete("1.0", tk.END)
+        self.result_text.insert(tk.END, f"Loading {len(snapshot['hand_ids'])} saved results...\n")
+        built = {"query": snapshot["sql"], "flop_player": snapshot.get("flop_player")}
+        self.async_db.submit(
+            DatabaseAccess.get_hand_histories_by_ids, snapshot["hand_ids"], channel="query",
+            callback=lambda rows: self._on_query_results(rows, built), error_callback=self._on_query_error
+        )
+    
+    def refresh_snapshot(self):
+        """Fetches hands newer than the loaded snapshot, prepends them and updates the saved state."""
+        if not self.loaded_snapshot:
+            messagebox.showerror("Error", "Load a saved state with a result snapshot first.")
+            return
+        state_name, snapshot = self.loaded_snapshot
+        try:
+            timeout_seconds = float(self.statement_timeout_var.get().strip() or 0)
+        except ValueError:
+            messagebox.showerror("Error", "Please enter a valid timeout in seconds.")
+            return
+        
+        def on_new_rows(new_rows):
+            built = {"query": snapshot["sql"], "flop_player": snapshot.get("flop_player")}
+            rows = list(new_rows) + list(self.query_results)
+            updated = self.build_result_snapshot(built, rows)
+            updated["max_id"] = max(snapshot["max_id"], updated["max_id"])
+            state_data = dict(self.state_manager.get_state(state_name) or {}, snapshot=updated)
+            self.state_manager.set_state(state_name, state_data)
+            self.loaded_snapshot = (state_name, updated)
+            self._on_query_results(rows, built)
+            messagebox.showinfo("Snapshot Refreshed", f"{len(new_rows)} new hands added to '{state_name}'.")
+        
+        self.cancel_query_button.config(state=tk.NORMAL)
+        self.async_db.submit(
+            refresh_explorer_query, snapshot["sql"], snapshot["max_id"], snapshot.get("flop_player"),
+            timeout_seconds, channel="query", callback=on_new_rows, error_callback=self._on_query_error
+        )
+    
     def delete_state(self):
         selection = self.state_list.curselection()
         if not selection:
@@ -1567,71 +1792,37 @@ class HandHistoryExplorer(tk.Tk):
     # ------------------------------
     # New: Show Betting Opportunities Popup
     # ------------------------------
-    def show_betting_opportunities(self):
-        """Show betting opportunities for the current hand."""
-        if not self.current_hand:
-            messagebox.showerror("Error", "No hand history loaded.")
-            return
-        
-        # Create a new window for betting opportunities
+    def _show_text_popup(self, title, geometry, view, build):
+        """Opens a read-only text popup for the current hand; its text is built once per hand."""
+        hand_id = self.current_hand.get("hand_id")
+        content = self.hand_format_cache.get(hand_id, view, build)
+
         popup = tk.Toplevel(self)
-        popup.title("Betting Opportunities")
-        popup.geometry("1200x800")
-        
-        # Create a text widget with scrollbar
+        popup.title(title)
+        popup.geometry(geometry)
+
         text_frame = ttk.Frame(popup)
         text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
         scrollbar = ttk.Scrollbar(text_frame)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
         text_widget = tk.Text(text_frame, wrap=tk.WORD, yscrollcommand=scrollbar.set)
         text_widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        
         scrollbar.config(command=text_widget.yview)
-        
-        # Add title and separator
-        text_widget.insert(tk.END, "Betting Opportunities\n")
-        text_widget.insert(tk.END, "=" * 50 + "\n\n")
-        
-        # Get the hand history data
-        hand_data = self.current_hand.get("hand_history_data")
-        if not hand_data or not hasattr(hand_data, "betting_opportunities"):
-            text_widget.insert(tk.END, "No betting opportunities available for this hand.\n")
-        else:
-            # Display each opportunity
-            for i, opp in enumerate(hand_data.betting_opportunities, 1):
-                text_widget.insert(tk.END, f"Opportunity {i}\n")
-                text_widget.insert(tk.END, "-" * 30 + "\n")
-                text_widget.insert(tk.END, f"Street: {opp.street}\n")
-                text_widget.insert(tk.END, f"Type: {opp.opportunity_type}\n")
-                text_widget.insert(tk.END, f"Player: {opp.player_position}\n")
-                text_widget.insert(tk.END, f"Stack: ${opp.player_stack:.2f}\n")
-                text_widget.insert(tk.END, f"Pot: ${opp.pot_size:.2f}\n")
-                
-                if opp.board_cards:
-                    text_widget.insert(tk.END, f"Board: {' '.join(opp.board_cards)}\n")
-                
-                text_widget.insert(tk.END, f"Betting Sequence: {opp.get_betting_sequence_summary()}\n")
-                text_widget.insert(tk.END, f"Normalized Sequence: {opp.normalized_betting_sequence}\n")
-                text_widget.insert(tk.END, f"Available Actions: {', '.join(opp.available_actions)}\n")
-                
-                if opp.decision:
-                    text_widget.insert(tk.END, f"Decision Made: {opp.decision}\n")
-                if opp.outcome_bucket:
-                    text_widget.insert(tk.END, f"Outcome: {opp.outcome_bucket}\n")
-                if opp.bet_amount is not None:
-                    text_widget.insert(tk.END, f"Bet Amount: ${opp.bet_amount:.2f}\n")
-                if opp.additional_context:
-                    text_widget.insert(tk.END, "Additional Context:\n")
-                    for key, value in opp.additional_context.items():
-                        text_widget.insert(tk.END, f"  {key}: {value}\n")
-                
-                text_widget.insert(tk.END, "\n")
-        
-        # Make the text widget read-only
+
+        # One insert for the whole text instead of one per line
+        text_widget.insert(tk.END, content)
         text_widget.config(state=tk.DISABLED)
-        
+        return popup
+
+    def show_betting_opportunities(self):
+        """Show betting opportunities for the current hand."""
+        if not self.current_hand:
+            messagebox.showerror("Error", "No hand history loaded.")
+            return
+        hand_data = self.current_hand.get("hand_history_data")
+        self._show_text_popup("Betting Opportunities", "1200x800", "opportunities",
+                              lambda: format_betting_opportunities(hand_data))
+
     # Optionally, add scrollbars if needed.
 
     
@@ -1667,55 +1858,14 @@ class HandHistoryExplorer(tk.Tk):
         if not self.current_hand or not self.current_hand.get("hand_history_data"):
             messagebox.showerror("Error", "No hand history loaded.")
             return
-            
-        # Create a new window for displaying actions
-        actions_window = tk.Toplevel(self)
-        actions_window.title("Hand Actions")
-        actions_window.geometry("800x600")
-        
-        # Create a text widget with scrollbar
-        text_frame = ttk.Frame(actions_window)
-        text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        scrollbar = ttk.Scrollbar(text_frame)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        result_text = tk.Text(text_frame, wrap=tk.WORD, yscrollcommand=scrollbar.set)
-        result_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.config(command=result_text.yview)
-        
-        # Display header
         hand_data = self.current_hand["hand_history_data"]
-        result_text.insert(tk.END, f"Hand ID: {hand_data.hand_id}\n")
-        result_text.insert(tk.END, f"Game Type: {hand_data.game_type}\n")
-        result_text.insert(tk.END, f"Number of Players: {hand_data.number_of_players}\n")
-        result_text.insert(tk.END, f"Small Blind: ${hand_data.sb_size:.2f}\n")
-        result_text.insert(tk.END, f"Big Blind: ${hand_data.bb_size:.2f}\n")
-        if hand_data.ante:
-            result_text.insert(tk.END, f"Ante: ${hand_data.ante:.2f}\n")
-        result_text.insert(tk.END, "\n")
-        
-        # Display actions for each street
-        for street in ["anteing", "preflop", "flop", "turn", "river"]:
-            actions = hand_data.actions.get(street, [])
-            if actions:
-                result_text.insert(tk.END, f"\n{street.upper()} ACTIONS:\n")
-                result_text.insert(tk.END, "-" * 80 + "\n")
-                result_text.insert(tk.END, f"{'Player':<20} {'Action':<10} {'Amount':<10} {'Total':<10} {'Norm Seq':<15} {'Additional Info'}\n")
-                result_text.insert(tk.END, "-" * 80 + "\n")
-                
-                for action in actions:
-                    amount_str = f"${action.bet_amount:.2f}" if action.bet_amount is not None else "N/A"
-                    total_str = f"${action.total:.2f}" if action.total is not None else "N/A"
-                    norm_seq = action.normalized_sequence if hasattr(action, "normalized_sequence") and action.normalized_sequence else "N/A"
-                    additional_info = f"Pot: ${action.pot_size:.2f}" if hasattr(action, "pot_size") and action.pot_size is not None else ""
-                    result_text.insert(tk.END, f"{action.player:<20} {action.action_type:<10} {amount_str:<10} {total_str:<10} {norm_seq:<15} {additional_info}\n")
-                result_text.insert(tk.END, "\n")
-        
-        # Make the text widget read-only
-        result_text.config(state=tk.DISABLED)
+        self._show_text_popup("Hand Actions", "800x600", "actions", lambda: format_hand_actions(hand_data))
     
+
     def on_close(self):
+        self.state_manager.close()
+        self.reference_cache.close()
+        self.async_db.close()
         self.db.close()
         self.destroy()
 
@@ -1733,6 +1883,9 @@ class HandHistoryExplorer(tk.Tk):
             hh_data = parser.parse(row[6])
             hh_data.hand_id = row[0]  # Set the hand ID
             hh_data.raw_text = row[6]  # Add raw text for board texture matching
+            if len(row) > 7 and row[7]:
+                # Stored board (see add_board_card_columns.py), so nothing rescans the text for it
+                hh_data.flop_cards, hh_data.turn_card, hh_data.river_card = row[7].split(), row[8], row[9]
             
             # Try to compute betting opportunities, but don't fail if it doesn't work
             try:
@@ -1756,96 +1909,9 @@ class HandHistoryExplorer(tk.Tk):
         if not self.current_hand:
             messagebox.showerror("Error", "No hand history loaded.")
             return
-            
-        # Create a new window for the combined view
-        popup = tk.Toplevel(self)
-        popup.title("Combined Actions & Betting Opportunities")
-        popup.geometry("1400x800")
-        
-        # Create a text widget with scrollbar
-        text_frame = ttk.Frame(popup)
-        text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        scrollbar = ttk.Scrollbar(text_frame)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        text_widget = tk.Text(text_frame, wrap=tk.WORD, yscrollcommand=scrollbar.set)
-        text_widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        
-        scrollbar.config(command=text_widget.yview)
-        
-        # Add title and separator
-        text_widget.insert(tk.END, "Combined Actions & Betting Opportunities\n")
-        text_widget.insert(tk.END, "=" * 100 + "\n\n")
-        
-        # Get the hand history data
         hand_data = self.current_hand.get("hand_history_data")
-        if not hand_data or not hasattr(hand_data, "betting_opportunities"):
-            text_widget.insert(tk.END, "No data available for this hand.\n")
-        else:
-            # Create a list of all actions across all streets, skipping anteing
-            all_actions = []
-            for street in ["preflop", "flop", "turn", "river"]:
-                for action in hand_data.actions.get(street, []):
-                    all_actions.append((street, action))
-            
-            # Create a list of all betting opportunities
-            all_opportunities = hand_data.betting_opportunities
-            
-            # Combine and sort by sequence
-            combined_items = []
-            action_index = 0
-            opp_index = 0
-            
-            # Skip the first opportunity (which is for the blinds)
-            if all_opportunities:
-                opp_index = 1
-            
-            while action_index < len(all_actions) or opp_index < len(all_opportunities):
-                # Add action if available
-                if action_index < len(all_actions):
-                    street, action = all_actions[action_index]
-                    combined_items.append(("action", street, action))
-                    action_index += 1
-                
-                # Add opportunity if available
-                if opp_index < len(all_opportunities):
-                    opp = all_opportunities[opp_index]
-                    combined_items.append(("opportunity", opp.street, opp))
-                    opp_index += 1
-            
-            # Display the combined items
-            for item_type, street, item in combined_items:
-                if item_type == "action":
-                    # Format action
-                    text_widget.insert(tk.END, f"Action on {street.upper()}:\n")
-                    text_widget.insert(tk.END, "-" * 50 + "\n")
-                    text_widget.insert(tk.END, f"Player: {item.player}\n")
-                    text_widget.insert(tk.END, f"Type: {item.action_type}\n")
-                    if item.bet_amount is not None:
-                        text_widget.insert(tk.END, f"Amount: ${item.bet_amount:.2f}\n")
-                    if item.total is not None:
-                        text_widget.insert(tk.END, f"Total: ${item.total:.2f}\n")
-                    if item.pot_size is not None:
-                        text_widget.insert(tk.END, f"Pot Size: ${item.pot_size:.2f}\n")
-                else:
-                    # Format opportunity
-                    text_widget.insert(tk.END, f"Betting Opportunity on {street.upper()}:\n")
-                    text_widget.insert(tk.END, "-" * 50 + "\n")
-                    text_widget.insert(tk.END, f"Type: {item.opportunity_type}\n")
-                    text_widget.insert(tk.END, f"Player: {item.player_position}\n")
-                    text_widget.insert(tk.END, f"Stack: ${item.player_stack:.2f}\n")
-                    text_widget.insert(tk.END, f"Pot: ${item.pot_size:.2f}\n")
-                    if item.board_cards:
-                        text_widget.insert(tk.END, f"Board: {' '.join(item.board_cards)}\n")
-                    text_widget.insert(tk.END, f"Betting Sequence: {item.get_betting_sequence_summary()}\n")
-                    text_widget.insert(tk.END, f"Normalized Sequence: {item.normalized_betting_sequence}\n")
-                    text_widget.insert(tk.END, f"Available Actions: {', '.join(item.available_actions)}\n")
-                
-            text_widget.insert(tk.END, "\n")  
-
-        # Make the text widget read-only
-        text_widget.config(state=tk.DISABLED)
+        self._show_text_popup("Combined Actions & Betting Opportunities", "1400x800", "combined",
+                              lambda: format_combined_view(hand_data))
 
     def show_tree(self):
         """Display the hand history tree structure"""
@@ -1858,126 +1924,102 @@ class HandHistoryExplorer(tk.Tk):
         if not hand_history_data.hand_history_tree:
             messagebox.showerror("Error", "No hand history tree available.")
             return
+        rows = self.hand_format_cache.get(self.current_hand.get("hand_id"), "tree",
+                                          lambda: tree_node_rows(hand_history_data))
             
         # Create a new window for the tree view
         tree_window = tk.Toplevel(self)
         tree_window.title("Hand History Tree Structure")
         tree_window.geometry("800x600")
         
-        # Create a text widget with scrollbar
-        text_frame = ttk.Frame(tree_window)
-        text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        scrollbar = ttk.Scrollbar(text_frame)
+        # One row per node; a node's details are inserted the first time it is expanded,
+        # and the Treeview only draws the rows that are visible
+        tree_frame = ttk.Frame(tree_window)
+        tree_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        tree = ttk.Treeview(tree_frame, show="tree")
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        text_widget = tk.Text(text_frame, wrap=tk.WORD, yscrollcommand=scrollbar.set)
-        text_widget.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.config(command=text_widget.yview)
-        
-        # Get all nodes from the tree
-        nodes = hand_history_data.hand_history_tree.get_all_nodes()
-        
-        # Print header
-        text_widget.insert(tk.END, "Hand History Tree Structure\n")
-        text_widget.insert(tk.END, "=" * 80 + "\n\n")
-        
-        # Print each node with proper indentation
-        for i, node in enumerate(nodes):
-            # Add indentation based on node type
-            indent = "  " * i
-            
-            # Print node type and basic info
-            text_widget.insert(tk.END, f"{indent}Node {i+1}: {node.node_type.value}\n")
-            text_widget.insert(tk.END, f"{indent}Street: {node.street}\n")
-            text_widget.insert(tk.END, f"{indent}Current Bet Level: ${node.current_bet_level:.2f}\n")
-            text_widget.insert(tk.END, f"{indent}Pot Size: ${node.pot_size:.2f}\n")
-            
-            # Print node-specific details
-            if isinstance(node, ForcedAction):
-                text_widget.insert(tk.END, f"{indent}Player: {node.player}\n")
-                text_widget.insert(tk.END, f"{indent}Action Type: {node.action_type}\n")
-                text_widget.insert(tk.END, f"{indent}Amount: ${node.amount:.2f}\n")
-            elif isinstance(node, PlayerAction):
-                text_widget.insert(tk.END, f"{indent}Player: {node.player}\n")
-                text_widget.insert(tk.END, f"{indent}Action Type: {node.action_type}\n")
-                text_widget.insert(tk.END, f"{indent}Parent Pot Size: ${node.parent_pot_size:.2f}\n")
-                # Find the corresponding betting opportunity for this action
-                for opp in hand_history_data.betting_opportunities:
-                    if opp.street == node.street and opp.player_position == node.player:
-                        text_widget.insert(tk.END, f"{indent}Normalized Sequence: {opp.normalized_betting_sequence}\n")
-                        break
-                if node.bet_amount is not None:
-                    text_widget.insert(tk.END, f"{indent}Bet Amount: ${node.bet_amount:.2f}\n")
-                if node.total is not None:
-                    text_widget.insert(tk.END, f"{indent}Total: ${node.total:.2f}\n")
-            elif isinstance(node, DecisionPoint):
-                text_widget.insert(tk.END, f"{indent}Player: {node.player}\n")
-                text_widget.insert(tk.END, f"{indent}Opportunity Type: {node.opportunity_type}\n")
-                text_widget.insert(tk.END, f"{indent}Player Stack: ${node.player_stack:.2f}\n")
-                text_widget.insert(tk.END, f"{indent}Available Actions: {', '.join(node.available_actions)}\n")
-                text_widget.insert(tk.END, f"{indent}Min Raise: ${node.min_raise:.2f}\n")
-                text_widget.insert(tk.END, f"{indent}Max Raise: ${node.max_raise:.2f}\n")
-            elif isinstance(node, StreetChange):
-                text_widget.insert(tk.END, f"{indent}Community Cards: {' '.join(node.community_cards)}\n")
-            
-            # Print active players
-            text_widget.insert(tk.END, f"{indent}Active Players:\n")
-            for player in node.active_players:
-                if player:  # Check if player is not None
-                    try:
-                        text_widget.insert(tk.END, f"{indent}  - {player.player} (Stack: ${player.stack:.2f}, "
-                                                 f"Remaining: ${player.remaining_stack:.2f}, "
-                                                 f"Contribution: ${player.total_contribution:.2f}, "
-                                                 f"Position: {player.position or 'N/A'}, "
-                                                 f"Active: {player.is_active})\n")
-                    except AttributeError as e:
-                        text_widget.insert(tk.END, f"{indent}  - Invalid player object: {e}\n")
-            
-            text_widget.insert(tk.END, "\n")
-        
-        # Make the text widget read-only
-        text_widget.config(state=tk.DISABLED)
+
+        details = {}
+        for summary, node_details in rows:
+            item = tree.insert("", tk.END, text=summary)
+            details[item] = node_details
+            tree.insert(item, tk.END, text="...")
+
+        def on_open(event):
+            item = tree.focus()
+            if item in details:
+                tree.delete(*tree.get_children(item))
+                for line in details.pop(item):
+                    tree.insert(item, tk.END, text=line)
+
+        tree.bind("<<TreeviewOpen>>", on_open)
+
 
     def refresh_all_dropdowns(self):
         """Refresh all dropdown lists with latest data from database."""
-        # Refresh preflop actions
-        self.refresh_pf_actions()
-        
-        # Refresh postflop patterns
-        patterns = self.load_postflop_patterns()
-        pattern_values = ["None"] + sorted(patterns.keys())
-        
-        # Update flop patterns
-        current_flop = self.flop_pattern_var.get()
-        self.flop_pattern_combo['values'] = pattern_values
-        if current_flop in pattern_values:
-            self.flop_pattern_var.set(current_flop)
-        else:
-            self.flop_pattern_var.set("None")
-        
-        # Update turn patterns
-        current_turn = self.turn_pattern_var.get()
-        self.turn_pattern_combo['values'] = pattern_values
-        if current_turn in pattern_values:
-            self.turn_pattern_var.set(current_turn)
-        else:
-            self.turn_pattern_var.set("None")
-        
-        # Update river patterns
-        current_river = self.river_pattern_var.get()
-        self.river_pattern_combo['values'] = pattern_values
-        if current_river in pattern_values:
-            self.river_pattern_var.set(current_river)
-        else:
-            self.river_pattern_var.set("None")
-        
+        # Drop everything cached so the lists below are reloaded
+        self.reference_cache.invalidate()
+        self._reload_dropdowns()
         messagebox.showinfo("Success", "All dropdowns have been refreshed with latest data.")
 
+    def _reload_dropdowns(self, sections=None):
+        """
+        Reload the dropdown lists built from the given reference cache sections (None = all).
+
+        Selections that still exist are kept, along with the preflop action string.
+        """
+        def reload(section):
+            return sections is None or section in sections
+
+        if reload("game_profiles"):
+            self.game_profiles = self.reference_cache.get_game_profiles()
+            self.game_profile_combo['values'] = list(self.game_profiles.keys())
+        if reload("spots"):
+            self.all_spots = self.reference_cache.get_spots_for_dropdowns()
+
+        if self.pf_action_no_var.get():
+            if reload(self.pf_actions_source):
+                self._reload_pf_actions()
+        elif reload("action_patterns"):
+            # Pattern mode: the preflop combo lists preflop action patterns
+            self._set_combo_values(self.pf_seq_combo, self.pf_seq_var,
+                                   ["None"] + sorted(self.load_preflop_patterns().keys()), "None")
+
+        if reload("action_patterns"):
+            pattern_values = ["None"] + sorted(self.load_postflop_patterns().keys())
+            self._set_combo_values(self.flop_pattern_combo, self.flop_pattern_var, pattern_values, "None")
+            self._set_combo_values(self.turn_pattern_combo, self.turn_pattern_var, pattern_values, "None")
+            self._set_combo_values(self.river_pattern_combo, self.river_pattern_var, pattern_values, "None")
+
+    def _set_combo_values(self, combo, var, values, default):
+        """Replace a combobox's values, keeping its selection if it is still listed."""
+        combo['values'] = values
+        if var.get() not in values:
+            var.set(default)
+
+    def _reload_pf_actions(self):
+        """Reload the preflop action list from its current source, keeping the selection if it still exists."""
+        if self.pf_actions_source == "spots":
+            profile_name = self.game_profile_var.get()
+            self.pf_actions = self.reference_cache.get_spots_for_dropdowns(profile_name or None).get('preflop', {})
+            options = ["Unnamed"] + sorted(self.pf_actions.keys(), key=lambda x: int(x) if x.isdigit() else 999)
+        else:
+            self.pf_actions = self.load_pf_actions()
+            options = self.build_pf_options(self.pf_actions)
+        self.pf_seq_combo['values'] = options
+        if self.pf_seq_var.get() in options:
+            return  # Keep the selection and the (possibly edited) action string
+        self.pf_seq_var.set(options[0] if options else "")
+        self.on_pf_selection(None)
+
     def on_pf_action_no_toggle(self):
         if self.pf_action_no_var.get():
             # Checked: show preflop action number
             self.pf_seq_label.config(text="Preflop Action Number:")
+            self.pf_actions_source = "preflop_states"
             self.pf_actions = self.load_pf_actions()
             pf_options = self.build_pf_options(self.pf_actions)
             self.pf_seq_combo['values'] = pf_options
@@ -2021,18 +2063,7 @@ class HandHistoryExplorer(tk.Tk):
             self.pf_sql_pattern_var.set(sql_pattern)
 
     def load_preflop_patterns(self):
-        query = "SELECT pattern_name, sql_pattern FROM action_patterns WHERE applies_to = 'preflop' ORDER BY pattern_name"
-        patterns = {}
-        try:
-            with self.db.conn.cursor() as cur:
-                cur.execute(query)
-                rows = cur.fetchall()
-            for row in rows:
-                pattern_name, sql_pattern = row
-                patterns[pattern_name.strip()] = sql_pattern.strip()
-        except Exception as e:
-            print("Error retrieving preflop patterns from DB:", e)
-        return patterns
+        return dict(self.reference_cache.get_action_patterns('preflop'))
 
     def analyze_pf_sequence_for_flop_positions(self, pf_sequence):
         """
@@ -2118,121 +2149,11 @@ class HandHistoryExplorer(tk.Tk):
     def show_query(self):
         """Show the SQL query that would be executed in a popup window."""
         try:
-            # Build the query using the same logic as run_query but don't execute it
-            qb = QueryBuilder(
-                "SELECT id, game_type, pf_action_seq, flop_action_seq, turn_action_seq, river_action_seq, raw_text FROM hand_histories"
-            )
-            
-            # Add structured format conditions if specified
-            game_class = self.game_class_var.get().strip()
-            game_variant = self.game_variant_var.get().strip()
-            table_size = self.table_size_var.get().strip()
-            
-            # Use structured format fields if any are specified, otherwise fall back to game_type
-            if game_class or game_variant or table_size:
-                if game_class:
-                    qb.add_condition(Condition("game_class", "=", game_class))
-                if game_variant:
-                    qb.add_condition(Condition("game_variant", "=", game_variant))
-                if table_size:
-                    qb.add_condition(Condition("table_size", "=", table_size))
-            else:
-                # Fall back to legacy game_type pattern
-                game_type = self.pf_game_type_var.get().strip()
-                qb.add_condition(Condition("game_type", "LIKE", f"{game_type}%"))
-            
-            # Add time period condition if enabled
-            if self.time_period_var.get():
-                try:
-                    time_period = int(self.time_period_entry_var.get().strip())
-                    if time_period > 0:  # Only add condition if time period is positive
-                        qb.add_condition(Condition("created_at", ">=", f"NOW() - INTERVAL '{time_period} hours'"))
-                except ValueError:
-                    messagebox.showerror("Error", "Please enter a valid number of hours.")
-                    return
-            
-            # Add player flop condition if enabled
-            if self.player_flop_var.get():
-                player_name = self.player_flop_entry_var.get().strip()
-                if not player_name:
-                    messagebox.showerror("Error", "Please enter a player name.")
-                    return
-                
-                # Add condition to check if hand reached flop
-                qb.add_condition(Condition("flop_action_seq", "IS NOT NULL", ""))
-                
-                # Get the preflop sequence to optimize the query
-                pf_selected = self.pf_seq_var.get().strip()
-                pf_action_str = self.pf_action_str_var.get().strip()
-                
-                # Try to use preflop sequence analysis for optimization
-                use_optimized_conditions = False
-                if pf_selected != "Unnamed" and pf_action_str:
-                    # We have a specific preflop sequence, analyze it
-                    flop_conditions = self.construct_flop_query_conditions(pf_action_str, player_name)
-                    if flop_conditions:
-                        # Use the optimized conditions with OR logic
-                        position_conditions = []
-                        for condition in flop_conditions:
-                            position_conditions.append(f"{condition.field} = '{condition.value}'")
-                        
-                        if position_conditions:
-                            or_condition = " OR ".join(position_conditions)
-                            # Add as a raw condition
-                            qb.add_condition(Condition(f"({or_condition})", "", ""))
-                            use_optimized_conditions = True
-                    
-                if not use_optimized_conditions:
-                    # Fall back to the general position check
-                    qb.add_condition(Condition("positions::text", "LIKE", f"%{player_name}%"))
-            
-            # Add existing conditions
-            pf_selected = self.pf_seq_var.get().strip()
-            pf_action_str = self.pf_action_str_var.get().strip()
-            print(f"DEBUG: pf_selected = '{pf_selected}', pf_action_str = '{pf_action_str}' (type: {type(pf_action_str)})")
-            # Use different logic depending on the checkbox
-            if hasattr(self, 'pf_action_no_var') and not self.pf_action_no_var.get():
-                # Checkbox is unchecked: use preflop pattern SQL
-                pf_sql_pattern = self.pf_sql_pattern_var.get().strip()
-                if pf_sql_pattern:
-                    qb.add_condition(Condition("pf_action_seq", "~", pf_sql_pattern))
-            else:
-                # Checkbox is checked: use preflop action number logic
-                if pf_selected == "Unnamed":
-                    pf_values = tuple(v.strip() for v in pf_action_str.split(";") if v.strip())
-                    if pf_values:
-                        qb.add_condition(Condition("pf_action_seq", "IN", pf_values))
-                    # If no values specified, don't add any condition - let it match all
-                elif pf_action_str:  # Only add condition if pf_action_str is not empty
-                    qb.add_condition(Condition("pf_action_seq", "=", pf_action_str))
-            
-            flop_sql_pattern = self.flop_sql_pattern_var.get().strip()
-            if flop_sql_pattern:
-                qb.add_condition(Condition("flop_action_seq", "~", flop_sql_pattern))
-            turn_sql_pattern = self.turn_sql_pattern_var.get().strip()
-            if turn_sql_pattern:
-                qb.add_condition(Condition("turn_action_seq", "~", turn_sql_pattern))
-            river_sql_pattern = self.river_sql_pattern_var.get().strip()
-            if river_sql_pattern:
-                qb.add_condition(Condition("river_action_seq", "~", river_sql_pattern))
-            button_name = self.button_name_var.get().strip()
-            if button_name:
-                qb.add_condition(Condition("button_name", "=", button_name))
-            position = self.position_var.get().strip()
-            position_player = self.position_player_var.get().strip()
-            if position and position != "None" and position_player:
-                qb.add_condition(Condition(f"positions->>'{position}'", "=", position_player))
-            
-            selected_status = self.review_status_filter_var.get()
-            if selected_status != "All":
-                if selected_status == 'unreviewed':
-                    qb.add_condition(Condition("(hr.review_status IS NULL OR hr.review_status = 'unreviewed')", "", ""))
-                else:
-                    qb.add_condition(Condition("hr.review_status", "=", selected_status))
-            
-            # Add sorting by created_at in descending order
-            qb.add_sort(SortCriterion("created_at", "DESC"))
-            query = qb.build_query()
+            # Build the query exactly as run_query would, without executing it
+            built = self.build_explorer_query()
+            if built is None:
+                return
+            query = built["query"]
             
             # Create popup window
             popup = tk.Toplevel(self)
@@ -2312,11 +2233,12 @@ class HandHistoryExplorer(tk.Tk):
         
         if profile_name:
             # Filter spots by the selected profile
-            filtered_spots = self.db.get_spots_for_dropdowns(profile_name)
+            filtered_spots = self.reference_cache.get_spots_for_dropdowns(profile_name)
         else:
             # Get all spots if no profile is selected
-            filtered_spots = self.db.get_spots_for_dropdowns()
+            filtered_spots = self.reference_cache.get_spots_for_dropdowns()
         
+        self.pf_actions_source = "spots"
         self.pf_actions = filtered_spots.get('preflop', {}) # Update the source
         pf_options = sorted(self.pf_actions.keys(), key=lambda x: int(x) if x.isdigit() else 999)
         self.pf_seq_combo['values'] = ["Unnamed"] + pf_options
@@ -2339,6 +2261,80 @@ class HandHistoryExplorer(tk.Tk):
         except Exception as e:
             messagebox.showerror("Error", f"Failed to open Spot Profile Manager: {e}")
 
+    def queue_results_for_processing(self):
+        """Queue the default GTO+ documents of every spot in the current query results."""
+        if not self.query_results:
+            messagebox.showinfo("Info", "Run a query first.")
+            return
+        if self.review_panel.gto_monitor.is_running():
+            messagebox.showerror("Error",
+                "GTO+ is currently running.\n\nPlease close GTO+ before moving files to processing.")
+            return
+
+        pf_sequences = [row[2] for row in self.query_results]
+        if not messagebox.askyesno("Queue for GTO+",
+                f"Queue the default documents for the spots in {len(pf_sequences)} hands?"):
+            return
+        result = queue_documents_for_processing(self.db, pf_sequences=pf_sequences)
+        print(format_result(result))
+        messagebox.showinfo("Queue for GTO+", format_result(result))
+
+    def open_sequence_frequencies(self):
+        """Open the Sequence Frequencies window for the selected game profile."""
+        try:
+            open_sequence_frequency_view(self, self.db, self.reference_cache, self.game_profile_var.get(),
+                                         on_sequence_selected=self._use_sequence_in_query)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to open Sequence Frequencies: {e}")
+
+    def open_bet_sizing(self):
+        """Open the Bet Sizing window for the hands in the current query results."""
+        if not self.query_results:
+            messagebox.showinfo("Info", "Run a query first.")
+            return
+        try:
+            open_bet_sizing_view(self, self.db, [row[0] for row in self.query_results], self.async_db)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to open Bet Sizing: {e}")
+
+    def open_decision_tree(self):
+        """Open the merged decision tree of the hands in the current query results."""
+        if not self.query_results:
+            messagebox.showinfo("Info", "Run a query first.")
+            return
+        try:
+            open_action_tree_view(self, self.query_results)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to open Decision Tree: {e}")
+
+    def show_player_stats(self):
+        """Show a player's population stats from the player_spot_stats summary table."""
+        player = simpledialog.askstring("Player Stats", "Player name:", initialvalue=self.player_flop_entry_var.get().strip(),
+                                        parent=self)
+        if not player:
+            return
+        messagebox.showinfo("Player Stats", format_player_stats(self.db.get_player_stats(player.strip())))
+
+    def _use_sequence_in_query(self, street, sequence):
+        """Put a sequence picked in the Sequence Frequencies window into the query fields."""
+        if street == "preflop":
+            if self.pf_action_no_var.get():
+                self.pf_seq_var.set("Unnamed")
+                self.pf_action_str_var.set(sequence)
+            else:
+                self.pf_seq_var.set("None")
+                self.pf_sql_pattern_var.set(f"^{sequence}$")
+        else:
+            pattern_vars = {
+                "flop": (self.flop_pattern_var, self.flop_sql_pattern_var),
+                "turn": (self.turn_pattern_var, self.turn_sql_pattern_var),
+                "river": (self.river_pattern_var, self.river_sql_pattern_var),
+            }
+            pattern_var, sql_var = pattern_vars[street]
+            pattern_var.set("None")
+            sql_var.set(f"^{sequence}$")
+        self.lift()
+
     def _initialize_defaults(self):
         """Initialize the default values for game profile and preflop spot."""
         # Set the default game profile and trigger the profile selection
@@ -2352,6 +2348,10 @@ class HandHistoryExplorer(tk.Tk):
             # Trigger the preflop selection to load the action string
             self.on_pf_selection(None)
 
+    def _on_reference_data_changed(self, table):
+        """Called when a reference table changes (the cache has already dropped it); reloads the lists built from it."""
+        self._reload_dropdowns(TABLE_SECTIONS.get(table, ()))
+
     def _on_manager_closed(self, manager):
         """Called when the spot profile manager is closed."""
         manager.destroy()
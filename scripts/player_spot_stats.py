@@ -0,0 +1,135 @@
+"""
+SQL behind the player_spot_stats summary table.
+
+player_spot_stats keeps, per (player, spot), how often each standard stat was
+possible and how often it was taken. Counts rather than percentages are stored
+so a batch of new hands is folded in with ON CONFLICT ... SET x = x + EXCLUDED.x,
+and stats over all spots are a SUM over one player's rows.
+
+Everything is counted set-based from hand_actions, per hand and player:
+
+    vpip          voluntarily called or raised preflop (every hand is an opportunity)
+    pfr           raised preflop (every hand is an opportunity)
+    three_bet     raised when facing exactly one preflop raise
+    cbet          bet the flop as the last preflop raiser, with no bet before them
+    fold_to_cbet  folded to that c-bet, before anyone raised it
+    wtsd          saw the flop, never folded, and at least one opponent didn't either
+
+spot_id is the hand's poker_spots entry (SPOT_FOR_HAND_JOIN, see
+spot_sql.py), or 0 for hands without a spot. DatabaseAccess.refresh_player_spot_stats applies
+PLAYER_SPOT_STATS_BATCH to id ranges past the stats_watermarks entry and
+DatabaseAccess.get_player_stats reads the table; see
+database_setup/schema/create_player_spot_stats.py.
+"""
+
+from scripts.spot_sql import SPOT_FOR_HAND_JOIN
+
+PLAYER_STAT_NAMES = ("vpip", "pfr", "three_bet", "cbet", "fold_to_cbet", "wtsd")
+
+# Last hand id folded into an incrementally maintained summary, per summary
+CREATE_STATS_WATERMARKS = """
+CREATE TABLE IF NOT EXISTS stats_watermarks (
+    stat_name VARCHAR(100) PRIMARY KEY,
+    last_hand_id BIGINT NOT NULL,
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
+"""
+
+CREATE_PLAYER_SPOT_STATS = """
+CREATE TABLE IF NOT EXISTS player_spot_stats (
+    player VARCHAR(100) NOT NULL,
+    spot_id INT NOT NULL,
+    hands BIGINT NOT NULL DEFAULT 0,
+    {stat_columns},
+    PRIMARY KEY (player, spot_id)
+);
+CREATE INDEX IF NOT EXISTS idx_player_spot_stats_spot ON player_spot_stats (spot_id);
+""".format(stat_columns=",\n    ".join(
+    f"{name} BIGINT NOT NULL DEFAULT 0, {name}_opp BIGINT NOT NULL DEFAULT 0" for name in PLAYER_STAT_NAMES)) + CREATE_STATS_WATERMARKS
+
+PLAYER_SPOT_STATS_BATCH = """
+WITH acts AS (
+    SELECT ha.hand_history_id AS hand_id, ha.street, ha.player, ha.action_type, ha.action_order,
+           COUNT(*) FILTER (WHERE ha.action_type IN ('bet', 'raise')) OVER (
+               PARTITION BY ha.hand_history_id, ha.street ORDER BY ha.action_order
+               ROWS BETWEEN UNBOUNDED PRECEDING AND 1 PRECEDING
+           ) AS aggressive_before
+    FROM hand_actions ha
+    WHERE ha.hand_history_id > %(low)s AND ha.hand_history_id <= %(high)s
+      AND ha.street IN ('preflop', 'flop', 'turn', 'river')
+),
+hands AS (
+    SELECT hand_id,
+           (array_agg(player ORDER BY action_order DESC)
+                FILTER (WHERE street = 'preflop' AND action_type = 'raise'))[1] AS pf_aggressor,
+           (array_agg(player ORDER BY action_order)
+                FILTER (WHERE street = 'flop' AND action_type = 'bet' AND aggressive_before = 0))[1] AS flop_bettor,
+           MIN(action_order) FILTER (WHERE street = 'flop' AND action_type = 'bet' AND aggressive_before = 0) AS flop_bet_order,
+           COUNT(DISTINCT player) - COUNT(DISTINCT player) FILTER (WHERE action_type = 'fold') AS players_left
+    FROM acts
+    GROUP BY hand_id
+),
+per_player AS (
+    SELECT a.hand_id, a.player, h.players_left,
+           bool_or(a.street = 'preflop' AND a.action_type IN ('call', 'raise')) AS vpip,
+           bool_or(a.street = 'preflop' AND a.action_type = 'raise') AS pfr,
+           bool_or(a.street = 'preflop' AND a.aggressive_before = 1) AS three_bet_opp,
+           bool_or(a.street = 'preflop' AND a.aggressive_before = 1 AND a.action_type = 'raise') AS three_bet,
+           bool_or(a.street = 'flop' AND a.player = h.pf_aggressor AND a.aggressive_before = 0) AS cbet_opp,
+           bool_or(a.street = 'flop' AND a.player = h.pf_aggressor AND a.aggressive_before = 0
+                   AND a.action_type = 'bet') AS cbet,
+           bool_or(a.street = 'flop' AND h.flop_bettor = h.pf_aggressor AND a.player <> h.pf_aggressor
+                   AND a.action_order > h.flop_bet_order AND a.aggressive_before = 1) AS fold_to_cbet_opp,
+           bool_or(a.street = 'flop' AND h.flop_bettor = h.pf_aggressor AND a.player <> h.pf_aggressor
+                   AND a.action_order > h.flop_bet_order AND a.aggressive_before = 1
+                   AND a.action_type = 'fold') AS fold_to_cbet,
+           bool_or(a.street = 'flop') AS saw_flop,
+           bool_or(a.action_type = 'fold') AS folded
+    FROM acts a
+    JOIN hands h ON h.hand_id = a.hand_id
+    GROUP BY a.hand_id, a.player, h.players_left
+)
+INSERT INTO player_spot_stats (player, spot_id, hands, vpip, vpip_opp, pfr, pfr_opp,
+                               three_bet, three_bet_opp, cbet, cbet_opp,
+                               fold_to_cbet, fold_to_cbet_opp, wtsd, wtsd_opp)
+SELECT p.player, COALESCE(spot.id, 0), COUNT(*),
+       COUNT(*) FILTER (WHERE p.vpip), COUNT(*),
+       COUNT(*) FILTER (WHERE p.pfr), COUNT(*),
+       COUNT(*) FILTER (WHERE p.three_bet), COUNT(*) FILTER (WHERE p.three_bet_opp),
+       COUNT(*) FILTER (WHERE p.cbet), COUNT(*) FILTER (WHERE p.cbet_opp),
+       COUNT(*) FILTER (WHERE p.fold_to_cbet), COUNT(*) FILTER (WHERE p.fold_to_cbet_opp),
+       COUNT(*) FILTER (WHERE p.saw_flop AND NOT p.folded AND p.players_left >= 2),
+       COUNT(*) FILTER (WHERE p.saw_flop)
+FROM per_player p
+JOIN hand_histories hh ON hh.id = p.hand_id
+{spot_join}
+GROUP BY 1, 2
+ON CONFLICT (player, spot_id) DO UPDATE SET
+    hands = player_spot_stats.hands + EXCLUDED.hands,
+    vpip = player_spot_stats.vpip + EXCLUDED.vpip,
+    vpip_opp = player_spot_stats.vpip_opp + EXCLUDED.vpip_opp,
+    pfr = player_spot_stats.pfr + EXCLUDED.pfr,
+    pfr_opp = player_spot_stats.pfr_opp + EXCLUDED.pfr_opp,
+    three_bet = player_spot_stats.three_bet + EXCLUDED.three_bet,
+    three_bet_opp = player_spot_stats.three_bet_opp + EXCLUDED.three_bet_opp,
+    cbet = player_spot_stats.cbet + EXCLUDED.cbet,
+    cbet_opp = player_spot_stats.cbet_opp + EXCLUDED.cbet_opp,
+    fold_to_cbet = player_spot_stats.fold_to_cbet + EXCLUDED.fold_to_cbet,
+    fold_to_cbet_opp = player_spot_stats.fold_to_cbet_opp + EXCLUDED.fold_to_cbet_opp,
+    wtsd = player_spot_stats.wtsd + EXCLUDED.wtsd,
+    wtsd_opp = player_spot_stats.wtsd_opp + EXCLUDED.wtsd_opp
+""".format(spot_join=SPOT_FOR_HAND_JOIN.strip())
+
+
+def format_player_stats(stats):
+    """One line per stat, e.g. 'VPIP          24.1%  (241/1000)'."""
+    if not stats:
+        return "No hands for this player."
+    labels = {"vpip": "VPIP", "pfr": "PFR", "three_bet": "3-Bet", "cbet": "C-Bet",
+              "fold_to_cbet": "Fold to C-Bet", "wtsd": "WTSD"}
+    lines = [f"{stats['player']}: {stats['hands']} hands"]
+    for name in PLAYER_STAT_NAMES:
+        stat = stats[name]
+        pct = f"{stat['pct']:.1f}%" if stat["pct"] is not None else "-"
+        lines.append(f"{labels[name]:<14}{pct:>6}  ({stat['made']}/{stat['opportunities']})")
+    return "\n".join(lines)
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+Lightweight detection of a running GTO+ process.
+
+GtoProcessMonitor remembers the PID of the GTO+ process once found and only
+checks that this one PID is still alive (psutil.pid_exists or /proc) on later
+calls. A full process scan happens only when the cached PID has died, and at
+most once per rescan_interval while GTO+ isn't running. With start(), a daemon
+thread keeps the `running` flag current so UI code can read it instantly.
+"""
+
+import os
+import time
+import threading
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+class GtoProcessMonitor:
+    """
+    Tracks whether a process whose name contains name_substring is running.
+
+    Args:
+        name_substring (str): Text to look for in process names.
+        rescan_interval (float): Minimum seconds between full scans while no process is cached.
+    """
+
+    def __init__(self, name_substring="GTO", rescan_interval=5.0):
+        self.name_substring = name_substring
+        self.rescan_interval = rescan_interval
+        self.pid = None
+        self.process_name = None
+        self.running = None          # True/False once checked, None if it can't be determined
+        self._pid_identity = None    # Guards against the PID being reused by another process
+        self._last_scan = 0.0
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._thread = None
+        self._stop = threading.Event()
+
+    # --- Platform helpers ---
+
+    def _identity(self, pid):
+        """Returns a value that changes if pid is reused (process start time), or None if pid is gone."""
+        if psutil is not None:
+            try:
+                return psutil.Process(pid).create_time()
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                return None
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                return f.read().rsplit(")", 1)[1].split()[19]  # starttime field
+        except (OSError, IndexError):
+            return None
+
+    def _pid_alive(self, pid):
+        if psutil is not None:
+            if not psutil.pid_exists(pid):
+                return False
+        elif not os.path.exists(f"/proc/{pid}"):
+            return False
+        return self._identity(pid) == self._pid_identity
+
+    def _scan(self):
+        """Full process scan. Returns (pid, name), (None, None) if not found, or None if unsupported."""
+        if psutil is not None:
+            for proc in psutil.process_iter(['pid', 'name']):
+                try:
+                    if proc.info['name'] and self.name_substring in proc.info['name']:
+                        return proc.info['pid'], proc.info['name']
+                except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                    continue
+            return None, None
+        if os.path.isdir("/proc"):
+            for entry in os.listdir("/proc"):
+                if not entry.isdigit():
+                    continue
+                try:
+                    with open(f"/proc/{entry}/comm") as f:
+                        name = f.read().strip()
+                except OSError:
+                    continue
+                if self.name_substring in name:
+                    return int(entry), name
+            return None, None
+        return None
+
+    # --- Public API ---
+
+    def is_running(self, force_scan=False):
+        """
+        Returns True if the process is running, False if not, or None if it can't be
+        determined on this platform (no psutil and no /proc).
+        """
+        with self._lock:
+            if self.pid is not None and self._pid_alive(self.pid):
+                return self._set_running(True)
+
+            now = time.monotonic()
+            if self.pid is None and not force_scan and self.running is not None \
+                    and now - self._last_scan < self.rescan_interval:
+                return self.running
+
+            self._last_scan = now
+            result = self._scan()
+            if result is None:
+                self.pid = None
+                return self._set_running(None)
+            pid, name = result
+            self.pid, self.process_name = pid, name
+            self._pid_identity = self._identity(pid) if pid is not None else None
+            if pid is not None:
+                print(f"GTO+ is running: {name} (pid {pid})")
+            return self._set_running(pid is not None)
+
+    def _set_running(self, running):
+        changed = running != self.running
+        self.running = running
+        if changed:
+            for callback in list(self._listeners):
+                callback(running)
+        return running
+
+    def add_listener(self, callback):
+        """
+        Registers callback(running) to be called when the running state changes.
+        Callbacks may run on the monitor thread; Tk code should hand off with after().
+        """
+        self._listeners.append(callback)
+
+    def start(self, poll_interval=2.0):
+        """Keeps `running` current from a daemon thread (cheap PID checks between scans)."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+
+        def poll():
+            while not self._stop.is_set():
+                try:
+                    self.is_running()
+                except Exception as e:
+                    print(f"Warning: Could not check if GTO+ is running: {e}")
+                self._stop.wait(poll_interval)
+
+        self._thread = threading.Thread(target=poll, name="gto-process-monitor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread = None
+
+
+_default_monitor = None
+
+
+def get_gto_process_monitor():
+    """Returns the shared GTO+ process monitor."""
+    global _default_monitor
+    if _default_monitor is None:
+        _default_monitor = GtoProcessMonitor()
+    return _default_monitor
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Batch queueing of GTO+ files for processing.
+
+Collects the default documents of many spots (or of the spots matching many
+hands), dedupes them by file, gives each a "1.x - " priority prefix following
+GTO_PRIORITY_PREFIX_PATTERN, and moves them into the priority directory in
+one pass. All lookups go through one GtoFileIndex snapshot.
+"""
+
+import os
+import re
+import shutil
+from collections import Counter
+from pathlib import Path
+from scripts.config import GTO_PRIORITY_PATH, GTO_PROCESSED_PATH
+from scripts.gto_file_index import GtoFileIndex, split_gto_prefix, PREFIX_NONE, GTO_SUFFIXES
+from scripts.solver_queue import sync_solver_queue
+
+
+def next_priority_number(index, priority_dir=GTO_PRIORITY_PATH):
+    """Returns the first unused N for a "1.N - " prefix in the priority directory."""
+    number_pattern = re.compile(r"^1\.(\d+) - ")
+    highest = 0
+    for path, _, _ in index.iter_files():
+        if Path(path).parent != Path(priority_dir):
+            continue
+        match = number_pattern.match(Path(path).name)
+        if match:
+            highest = max(highest, int(match.group(1)))
+    return highest + 1
+
+
+def plan_batch(documents, index, hand_counts=None, priority_dir=GTO_PRIORITY_PATH,
+               processed_dir=GTO_PROCESSED_PATH):
+    """
+    Works out what to move for a set of default documents.
+
+    Args:
+        documents (list): dicts from DatabaseAccess.get_default_documents.
+        index (GtoFileIndex): Directory snapshot used to locate the files.
+        hand_counts (dict): Optional pf_pattern -> number of hands; busier spots get lower numbers.
+        priority_dir (Path): Destination directory.
+        processed_dir (Path): Files found here are already solved and are not queued again.
+
+    Returns:
+        dict: {"moves": [(doc, source, dest)], "already_queued": [(doc, path)],
+               "already_solved": [(doc, path)], "missing": [doc], "skipped": [(doc, reason)]}
+    """
+    plan = {"moves": [], "already_queued": [], "already_solved": [], "missing": [], "skipped": []}
+    hand_counts = hand_counts or {}
+
+    # Dedupe: several spots can share one default document
+    unique = {}
+    for doc in documents:
+        key = os.path.normcase(split_gto_prefix(Path(doc["file_path"]).name)[1])
+        if key not in unique or hand_counts.get(doc["pf_pattern"], 0) > hand_counts.get(unique[key]["pf_pattern"], 0):
+            unique[key] = doc
+    ordered = sorted(unique.values(), key=lambda d: (-hand_counts.get(d["pf_pattern"], 0), d["title"]))
+
+    number = next_priority_number(index, priority_dir)
+    for doc in ordered:
+        locations = index.find_all(doc["file_path"])
+        if not locations:
+            plan["missing"].append(doc)
+            continue
+        # Any copy that is solved, running or queued means there is nothing to do
+        solved = [path for path, _ in locations if Path(path).parent == Path(processed_dir)]
+        if solved:
+            plan["already_solved"].append((doc, solved[0]))
+            continue
+        queued = [path for path, prefix in locations if prefix != PREFIX_NONE]
+        if queued:
+            plan["already_queued"].append((doc, queued[0]))
+            continue
+        source = locations[0][0]
+        if Path(source).suffix.lower() not in GTO_SUFFIXES:
+            plan["skipped"].append((doc, "not a GTO+ file"))
+            continue
+        # "1.N - <name>", matching GTO_PRIORITY_PREFIX_PATTERN
+        dest = Path(priority_dir) / f"1.{number} - {split_gto_prefix(Path(source).name)[1]}"
+        plan["moves"].append((doc, source, str(dest)))
+        number += 1
+    return plan
+
+
+def execute_plan(plan):
+    """
+    Moves the planned files.
+
+    Returns:
+        dict: plan plus "moved": [(doc, dest)] and "errors": [(doc, message)].
+    """
+    result = dict(plan, moved=[], errors=[])
+    for doc, source, dest in plan["moves"]:
+        if Path(dest).exists():
+            result["errors"].append((doc, f"destination already exists: {dest}"))
+            continue
+        try:
+            Path(dest).parent.mkdir(parents=True, exist_ok=True)
+            shutil.move(source, dest)
+            print(f"Moved file from {source} to {dest}")
+            result["moved"].append((doc, dest))
+        except PermissionError:
+            result["errors"].append((doc, "permission denied (is the file open in GTO+?)"))
+        except Exception as e:
+            result["errors"].append((doc, str(e)))
+    return result
+
+
+def queue_documents_for_processing(db, spot_ids=None, pf_sequences=None, index=None,
+                                   priority_dir=GTO_PRIORITY_PATH, processed_dir=GTO_PROCESSED_PATH):
+    """
+    Queues the default documents of the given spots and/or of the spots matching pf_sequences.
+
+    Args:
+        db (DatabaseAccess): Database connection.
+        spot_ids (iterable): Spot ids to queue.
+        pf_sequences (iterable): Preflop sequences of hands (e.g. every row of a query);
+            repeated sequences raise the priority of their spot.
+        index (GtoFileIndex): Optional directory snapshot (a fresh one is taken if omitted).
+        priority_dir (Path): Destination directory.
+        processed_dir (Path): Directory of solved files.
+
+    Returns:
+        dict: See execute_plan.
+    """
+    hand_counts = Counter(seq for seq in (pf_sequences or []) if seq)
+    documents = db.get_default_documents(spot_ids=spot_ids, pf_sequences=list(hand_counts))
+    index = index or GtoFileIndex(check_interval=float("inf"))
+    result = execute_plan(plan_batch(documents, index, hand_counts, priority_dir, processed_dir))
+    index.refresh()
+    if result["moved"]:
+        sync_solver_queue()
+    return result
+
+
+def format_result(result):
+    """Returns a printable summary of a batch move."""
+    lines = [f"Moved: {len(result['moved'])}  Already queued: {len(result['already_queued'])}  "
+             f"Already solved: {len(result['already_solved'])}  Missing: {len(result['missing'])}  Skipped: {len(result['skipped'])}  Errors: {len(result['errors'])}"]
+    for doc, dest in result["moved"]:
+        lines.append(f"  moved   {doc['spot_name']}: {os.path.basename(dest)}")
+    for doc, path in result["already_queued"]:
+        lines.append(f"  queued  {doc['spot_name']}: {os.path.basename(path)}")
+    for doc, path in result["already_solved"]:
+        lines.append(f"  solved  {doc['spot_name']}: {os.path.basename(path)}")
+    for doc in result["missing"]:
+        lines.append(f"  missing {doc['spot_name']}: {os.path.basename(doc['file_path'])}")
+    for doc, reason in result["skipped"] + result["errors"]:
+        lines.append(f"  error   {doc['spot_name']}: {reason}")
+    return "\n".join(lines)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Raw text line search over hand_histories.
+
+Finds hands with a line starting with a given pattern, e.g. "Uncalled bet" or
+"Seat \\d+: .* showed". The line predicate runs in SQL
+(raw_text ~ '(^|\\n)<pattern>'), which the trigram index from
+database_setup/schema/add_raw_text_trgm_index.py can answer without reading
+every hand. Matches are streamed through a server-side cursor, so memory use
+doesn't depend on how many hands match, and written to the output as they
+arrive.
+
+Patterns are regular expressions matched at the start of a line. They are
+evaluated by PostgreSQL and then by Python's re module to pick out the matching
+lines, so stick to syntax both understand (literals, classes, \\d, \\s, .*, |).
+
+Usage:
+    python scripts/raw_text_search.py "Uncalled bet" --limit 50 --output uncalled_bet_hands.txt
+    python scripts/raw_text_search.py "Seat \\d+: .* showed" --lines-only
+"""
+
+import sys
+import os
+import re
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from scripts.db_access import DatabaseAccess
+from scripts.config import DB_PARAMS
+
+
+def search_raw_text_lines(db, line_pattern, limit=None, game_type=None, fetch_size=500):
+    """
+    Streams hands that have a line starting with line_pattern, in id order.
+
+    Args:
+        db (DatabaseAccess): Database connection.
+        line_pattern (str): Regular expression matched at the start of a line.
+        limit (int): Stop after this many hands (None = no limit).
+        game_type (str): Optional game_type prefix to restrict the search (LIKE 'game_type%').
+        fetch_size (int): Rows fetched from the server-side cursor per round trip.
+
+    Yields:
+        tuple: (hand_id, raw_text, matching_lines)
+
+    Raises:
+        Exception: Database errors are raised after the transaction is rolled back.
+    """
+    if not db.conn:
+        print("No database connection.")
+        return
+
+    line_regex = re.compile(f"^(?:{line_pattern}).*$", re.MULTILINE)
+    query = "SELECT id, raw_text FROM hand_histories WHERE raw_text ~ %s"
+    params = [f"(^|\\n)({line_pattern})"]
+    if game_type:
+        query += " AND game_type LIKE %s"
+        params.append(f"{game_type}%")
+    query += " ORDER BY id"
+
+    found = 0
+    try:
+        # A named cursor keeps the result set on the server and fetches fetch_size rows at a time
+        with db.conn.cursor(name="raw_text_search") as cur:
+            cur.itersize = fetch_size
+            cur.execute(query, params)
+            for hand_id, raw_text in cur:
+                lines = [m.group(0).rstrip("\r") for m in line_regex.finditer(raw_text)]
+                if not lines:
+                    continue
+                yield hand_id, raw_text, lines
+                found += 1
+                if limit is not None and found >= limit:
+                    break
+    finally:
+        db.conn.rollback()  # Closes the cursor's transaction
+
+
+def write_search_results(results, out, lines_only=False):
+    """
+    Writes search results to an open file as they arrive.
+
+    With lines_only, one "<hand id>\\t<line>" row is written per matching line;
+    otherwise each hand is written in full after a "Hand ID:" header.
+
+    Returns:
+        int: Number of hands written.
+    """
+    count = 0
+    for hand_id, raw_text, lines in results:
+        if lines_only:
+            for line in lines:
+                out.write(f"{hand_id}\t{line}\n")
+        else:
+            out.write(f"Hand ID: {hand_id}\n")
+            out.write(raw_text)
+            out.write("\n\n")
+        out.flush()
+        count += 1
+    return count
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Find hands with a line starting with a pattern")
+    parser.add_argument("pattern", help="Regular expression matched at the start of a line")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many hands")
+    parser.add_argument("--game-type", default=None, help="Only search game types starting with this")
+    parser.add_argument("--output", default=None, help="Output file (default: stdout)")
+    parser.add_argument("--lines-only", action="store_true", help="Write only the matching lines")
+    args = parser.parse_args()
+
+    db = DatabaseAccess(**DB_PARAMS)
+    if not db.conn:
+        return False
+    try:
+        results = search_raw_text_lines(db, args.pattern, limit=args.limit, game_type=args.game_type)
+        if args.output:
+            with open(args.output, "w") as out:
+                count = write_search_results(results, out, lines_only=args.lines_only)
+            print(f"Found {count} hand histories. Written to {args.output}.")
+        else:
+            count = write_search_results(results, sys.stdout, lines_only=args.lines_only)
+            print(f"Found {count} hand histories.", file=sys.stderr)
+        return True
+    except Exception as e:
+        print(f"Error searching hand histories: {e}", file=sys.stderr)
+        return False
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
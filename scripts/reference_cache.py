@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+In-memory cache for the small reference tables behind the explorer dropdowns
+(game profiles, spots, action patterns and named preflop states).
+
+Each section is loaded from the database the first time it is needed and then
+served from memory. The cache LISTENs on the 'reference_data_changed' channel,
+which is notified by triggers on the reference tables (see
+database_setup/schema/create_reference_change_notify.py), so edits made in the
+admin tools invalidate only the affected sections.
+"""
+
+from db_access import DatabaseAccess
+
+NOTIFY_CHANNEL = "reference_data_changed"
+
+# Which cached sections depend on which tables
+TABLE_SECTIONS = {
+    "game_profiles": ("game_profiles", "spots"),
+    "poker_spots": ("spots",),
+    "spot_rules": ("spots",),
+    "spot_profile_links": ("spots",),
+    "action_patterns": ("action_patterns",),
+    "hand_state": ("preflop_states",),
+}
+
+
+class ReferenceDataCache:
+    """
+    Caches reference data for the UI and invalidates it on change notifications.
+
+    Args:
+        db (DatabaseAccess): Connection used to load the data.
+        db_params (dict): Optional connection parameters for the LISTEN connection.
+            Without them the cache only refreshes when invalidate() is called.
+        tk_root: Optional Tk widget used to poll for notifications with after().
+        poll_ms (int): Notification polling interval.
+    """
+
+    def __init__(self, db, db_params=None, tk_root=None, poll_ms=1000):
+        self.db = db
+        self.tk_root = tk_root
+        self.poll_ms = poll_ms
+        self._data = {}
+        self._listeners = []
+        self._listen_db = None
+
+        if db_params and tk_root is not None:
+            self._start_listening(db_params)
+
+    # --- Accessors ---
+
+    def get_game_profiles(self):
+        """Returns {profile_name: {"class", "variant", "size"}} (see DatabaseAccess.get_game_profiles)."""
+        if "game_profiles" not in self._data:
+            self._data["game_profiles"] = self.db.get_game_profiles()
+        return self._data["game_profiles"]
+
+    def get_spots_for_dropdowns(self, profile_name=None):
+        """Returns {'preflop': {...}, 'postflop': {...}} for a profile (see DatabaseAccess.get_spots_for_dropdowns)."""
+        spots = self._data.setdefault("spots", {})
+        if profile_name not in spots:
+            try:
+                spots[profile_name] = self.db.get_spots_for_dropdowns(profile_name)
+            except Exception as e:
+                print(f"Error fetching spots for dropdowns: {e}")
+                self.db.conn.rollback()
+                return {"preflop": {}, "postflop": {}}
+        return spots[profile_name]
+
+    def get_action_patterns(self, applies_to):
+        """Returns {pattern_name: sql_pattern} for 'preflop' or 'postflop' action patterns."""
+        if "action_patterns" not in self._data:
+            patterns = {"preflop": {}, "postflop": {}}
+            rows = self._fetch("SELECT applies_to, pattern_name, sql_pattern FROM action_patterns ORDER BY pattern_name")
+            for street, pattern_name, sql_pattern in rows:
+                patterns.setdefault(street, {})[pattern_name.strip()] = sql_pattern.strip()
+            self._data["action_patterns"] = patterns
+        return self._data["action_patterns"].get(applies_to, {})
+
+    def get_preflop_states(self, game_type):
+        """Returns {state_name: state_value} for the named preflop states of a game type."""
+        if "preflop_states" not in self._data:
+            states = {}
+            rows = self._fetch(
+                "SELECT game_type, state_name, state_value FROM hand_state "
+                "WHERE state_type = 'preflop' AND TRIM(state_name) <> ''"
+            )
+            for row_game_type, state_name, state_value in rows:
+                states.setdefault(row_game_type, {})[str(state_name).strip()] = str(state_value).strip()
+            self._data["preflop_states"] = states
+        return self._data["preflop_states"].get(game_type, {})
+
+    def _fetch(self, query, params=()):
+        if not self.db.conn:
+            print("No database connection.")
+            return []
+        try:
+            with self.db.conn.cursor() as cur:
+                cur.execute(query, params)
+                return cur.fetchall()
+        except Exception as e:
+            print(f"Error loading reference data: {e}")
+            self.db.conn.rollback()
+            return []
+
+    # --- Invalidation ---
+
+    def add_listener(self, callback):
+        """Registers callback(table_name) to be called after a notification invalidates the cache."""
+        self._listeners.append(callback)
+
+    def invalidate(self, table=None):
+        """Drops the sections that depend on table, or everything if table is None."""
+        if table is None:
+            self._data.clear()
+        else:
+            for section in TABLE_SECTIONS.get(table, ()):
+                self._data.pop(section, None)
+
+    def _start_listening(self, db_params):
+        self._listen_db = DatabaseAccess(**db_params)
+        if not self._listen_db.conn:
+            print("Reference data notifications unavailable; use Refresh to reload dropdowns.")
+            self._listen_db = None
+            return
+        self._listen_db.conn.autocommit = True
+        with self._listen_db.conn.cursor() as cur:
+            cur.execute(f"LISTEN {NOTIFY_CHANNEL}")
+        self.tk_root.after(self.poll_ms, self._poll_notifications)
+
+    def _poll_notifications(self):
+        if not self._listen_db:
+            return
+        try:
+            conn = self._listen_db.conn
+            conn.poll()
+            changed = set()
+            while conn.notifies:
+                changed.add(conn.notifies.pop(0).payload)
+            for table in changed:
+                print(f"Reference data changed: {table}")
+                self.invalidate(table)
+                for callback in self._listeners:
+                    callback(table)
+        except Exception as e:
+            print(f"Error polling reference data notifications: {e}")
+        self.tk_root.after(self.poll_ms, self._poll_notifications)
+
+    def close(self):
+        if self._listen_db:
+            self._listen_db.close()
+            self._listen_db = None
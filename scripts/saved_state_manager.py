@@ -1,20 +1,20 @@
 import json
 import os
+import sqlite3
+import tempfile
+import threading
 
-class SavedStateManager:
+class JsonStateStore:
     """
-    A simple manager for saving and loading UI or query states.
-    This class abstracts the persistence details (using a JSON file) so that
-    the rest of your application can simply use get_state, set_state, delete_state,
-    and list_states.
+    Stores all states in one JSON file.
+
+    Every write goes to a temporary file in the same directory which then
+    replaces the original with os.replace, so a crash mid-write leaves the
+    previous file intact.
     """
-    def __init__(self, filename="saved_states.json"):
+    def __init__(self, filename):
         self.filename = filename
         self.states = {}
-        self.load_states()
-        
-    def load_states(self):
-        """Load saved states from the JSON file, if it exists."""
         if os.path.exists(self.filename):
             try:
                 with open(self.filename, "r") as f:
@@ -22,52 +22,196 @@ class SavedStateManager:
             except Exception as e:
                 print(f"Error loading states from {self.filename}: {e}")
                 self.states = {}
-        else:
-            self.states = {}
-            
-    def save_states(self):
-        """Persist the current states to the JSON file."""
+
+    def names(self):
+        return list(self.states.keys())
+
+    def load(self, name):
+        return self.states.get(name)
+
+    def write(self, changes):
+        """Applies {name: state_data or None (delete)} and rewrites the file atomically."""
+        for name, state_data in changes.items():
+            if state_data is None:
+                self.states.pop(name, None)
+            else:
+                self.states[name] = state_data
+        directory = os.path.dirname(os.path.abspath(self.filename))
+        fd, temp_path = tempfile.mkstemp(prefix=".saved_states-", suffix=".tmp", dir=directory)
         try:
-            with open(self.filename, "w") as f:
+            with os.fdopen(fd, "w") as f:
                 json.dump(self.states, f, indent=2)
-        except Exception as e:
-            print(f"Error saving states to {self.filename}: {e}")
-    
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.filename)
+        except Exception:
+            os.unlink(temp_path)
+            raise
+
+    def close(self):
+        pass
+
+class SqliteStateStore:
+    """
+    Stores each state as one row of a SQLite key-value table, so only the
+    names are read at startup and each state is parsed when it's requested.
+
+    Args:
+        filename (str): SQLite file.
+        import_json (str): Optional JSON state file copied in once, when the store is new.
+            A meta row records that this happened, so deleting every state later
+            doesn't bring the JSON states back.
+    """
+    def __init__(self, filename, import_json=None):
+        self.filename = filename
+        self.conn = sqlite3.connect(filename, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS saved_states (name TEXT PRIMARY KEY, data TEXT NOT NULL)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS store_meta (key TEXT PRIMARY KEY, value TEXT)")
+        self.conn.commit()
+        if import_json and self._meta("json_imported") is None:
+            # A store that already has states predates the marker and was imported then
+            if os.path.exists(import_json) and not self.names():
+                legacy = JsonStateStore(import_json)
+                self.write({name: legacy.load(name) for name in legacy.names()})
+                print(f"Imported {len(legacy.names())} saved states from {import_json}")
+            with self.conn:
+                self.conn.execute("INSERT INTO store_meta (key, value) VALUES ('json_imported', ?)",
+                                  (os.path.abspath(import_json),))
+
+    def _meta(self, key):
+        row = self.conn.execute("SELECT value FROM store_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def names(self):
+        return [row[0] for row in self.conn.execute("SELECT name FROM saved_states ORDER BY rowid")]
+
+    def load(self, name):
+        row = self.conn.execute("SELECT data FROM saved_states WHERE name = ?", (name,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def write(self, changes):
+        """Applies {name: state_data or None (delete)} in one transaction."""
+        with self.conn:
+            for name, state_data in changes.items():
+                if state_data is None:
+                    self.conn.execute("DELETE FROM saved_states WHERE name = ?", (name,))
+                else:
+                    self.conn.execute(
+                        "INSERT INTO saved_states (name, data) VALUES (?, ?) "
+                        "ON CONFLICT(name) DO UPDATE SET data = excluded.data",
+                        (name, json.dumps(state_data)))
+
+    def close(self):
+        self.conn.close()
+
+class SavedStateManager:
+    """
+    A simple manager for saving and loading UI or query states.
+    This class abstracts the persistence details so that the rest of your
+    application can simply use get_state, set_state, delete_state, and list_states.
+
+    Files ending in .sqlite, .sqlite3 or .db use the SQLite store (states are
+    loaded lazily by name); anything else uses a JSON file. Changes are
+    collected and written together save_delay seconds after the first one;
+    call flush() or close() to write them immediately.
+
+    Args:
+        filename (str): State file.
+        save_delay (float): Seconds to coalesce changes for (0 writes on every change).
+        import_json (str): For the SQLite store, a JSON state file to import when it's empty.
+    """
+    SQLITE_EXTENSIONS = (".sqlite", ".sqlite3", ".db")
+
+    def __init__(self, filename="saved_states.json", save_delay=0.5, import_json=None):
+        self.filename = filename
+        self.save_delay = save_delay
+        self._pending = {}   # name -> state_data, or None for a delete
+        self._timer = None
+        self._lock = threading.RLock()
+        if filename.lower().endswith(self.SQLITE_EXTENSIONS):
+            self.store = SqliteStateStore(filename, import_json=import_json)
+        else:
+            self.store = JsonStateStore(filename)
+
+    def save_states(self):
+        """Persist pending changes now."""
+        self.flush()
+
+    def flush(self):
+        """Write all pending changes in one go."""
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._pending:
+                return
+            changes, self._pending = self._pending, {}
+            try:
+                self.store.write(changes)
+            except Exception as e:
+                print(f"Error saving states to {self.filename}: {e}")
+                # Keep the changes (unless newer ones replaced them) for the next attempt
+                for name, state_data in changes.items():
+                    self._pending.setdefault(name, state_data)
+
+    def _schedule_save(self):
+        if self.save_delay <= 0:
+            self.flush()
+        elif self._timer is None:
+            self._timer = threading.Timer(self.save_delay, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
     def set_state(self, name, state_data):
         """
         Save or update a state.
-        
+
         Args:
             name (str): A unique name for the state.
             state_data (dict): A dictionary representing the state.
         """
-        self.states[name] = state_data
-        self.save_states()
-    
+        with self._lock:
+            self._pending[name] = state_data
+            self._schedule_save()
+
     def get_state(self, name):
         """
         Retrieve a saved state by its name.
-        
+
         Returns:
             dict or None: The state data if it exists, or None if not found.
         """
-        return self.states.get(name)
-    
+        with self._lock:
+            if name in self._pending:
+                return self._pending[name]
+            return self.store.load(name)
+
     def delete_state(self, name):
         """Delete a saved state by its name."""
-        if name in self.states:
-            del self.states[name]
-            self.save_states()
-    
+        with self._lock:
+            if name in self._pending or name in self.store.names():
+                self._pending[name] = None
+                self._schedule_save()
+
     def list_states(self):
         """Return a list of all saved state names."""
-        return list(self.states.keys())
+        with self._lock:
+            names = [name for name in self.store.names() if self._pending.get(name, True) is not None]
+            names.extend(name for name, state_data in self._pending.items()
+                         if state_data is not None and name not in names)
+            return names
+
+    def close(self):
+        """Write pending changes and release the store."""
+        self.flush()
+        self.store.close()
 
 # Example usage:
 if __name__ == "__main__":
     # Create an instance of the state manager.
     sm = SavedStateManager()
-    
+
     # Example state data for a query (this could be UI settings, query conditions, etc.)
     state_data = {
         "query_conditions": [
@@ -78,16 +222,19 @@ if __name__ == "__main__":
             "display_mode": "detailed"
         }
     }
-    
+
     # Save a state.
     sm.set_state("ExampleQuery", state_data)
-    
+
     # List saved states.
     print("Saved states:", sm.list_states())
-    
+
     # Retrieve a state.
     retrieved_state = sm.get_state("ExampleQuery")
     print("Retrieved state 'ExampleQuery':", retrieved_state)
-    
+
     # Uncomment the following line to delete the state.
     # sm.delete_state("ExampleQuery")
+
+    # Write the pending change before exiting.
+    sm.close()
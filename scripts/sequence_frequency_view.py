@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Sequence Frequencies - A window listing action sequences by hand volume.
+
+Reads the sequence_daily_stats summary table, filtered by game profile, street
+and time window, and flags which sequences already match a poker_spots entry so
+high-volume unnamed spots stand out.
+"""
+
+import re
+import tkinter as tk
+from tkinter import ttk, messagebox
+
+TIME_WINDOWS = {"Last 24 hours": 1, "Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90, "All time": None}
+STREETS = ["preflop", "flop", "turn", "river"]
+
+class SequenceFrequencyView(tk.Toplevel):
+    def __init__(self, parent, db_access, reference_cache, profile_name=None, on_sequence_selected=None):
+        super().__init__(parent)
+        self.db = db_access
+        self.reference_cache = reference_cache
+        self.on_sequence_selected = on_sequence_selected
+        self.rows = []              # (sequence, hands, share, last_seen, spot_name)
+        self.sort_column = "hands"
+        self.sort_descending = True
+
+        self.title("Sequence Frequencies")
+        self.geometry("900x600")
+        self.transient(parent)
+
+        self.build_ui(profile_name)
+        self.load_data()
+
+    def build_ui(self, profile_name):
+        """Build the user interface."""
+        main_frame = ttk.Frame(self, padding="10")
+        main_frame.pack(fill=tk.BOTH, expand=True)
+
+        # --- Filters ---
+        filter_frame = ttk.LabelFrame(main_frame, text="Filters")
+        filter_frame.pack(fill=tk.X, pady=(0, 10))
+
+        ttk.Label(filter_frame, text="Game Profile:").grid(row=0, column=0, sticky=tk.E, padx=5, pady=5)
+        profiles = [""] + list(self.reference_cache.get_game_profiles().keys())
+        self.profile_var = tk.StringVar(value=profile_name or "")
+        profile_combo = ttk.Combobox(filter_frame, textvariable=self.profile_var, values=profiles, state="readonly", width=20)
+        profile_combo.grid(row=0, column=1, sticky=tk.W, padx=5, pady=5)
+
+        ttk.Label(filter_frame, text="Street:").grid(row=0, column=2, sticky=tk.E, padx=5, pady=5)
+        self.street_var = tk.StringVar(value="preflop")
+        street_combo = ttk.Combobox(filter_frame, textvariable=self.street_var, values=STREETS, state="readonly", width=10)
+        street_combo.grid(row=0, column=3, sticky=tk.W, padx=5, pady=5)
+
+        ttk.Label(filter_frame, text="Time Window:").grid(row=0, column=4, sticky=tk.E, padx=5, pady=5)
+        self.window_var = tk.StringVar(value="Last 30 days")
+        window_combo = ttk.Combobox(filter_frame, textvariable=self.window_var, values=list(TIME_WINDOWS.keys()),
+                                    state="readonly", width=15)
+        window_combo.grid(row=0, column=5, sticky=tk.W, padx=5, pady=5)
+
+        ttk.Label(filter_frame, text="Top N:").grid(row=1, column=0, sticky=tk.E, padx=5, pady=5)
+        self.limit_var = tk.StringVar(value="200")
+        ttk.Entry(filter_frame, textvariable=self.limit_var, width=8).grid(row=1, column=1, sticky=tk.W, padx=5, pady=5)
+
+        self.unmatched_only_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(filter_frame, text="Only sequences without a spot", variable=self.unmatched_only_var,
+                        command=self.populate_tree).grid(row=1, column=2, columnspan=2, sticky=tk.W, padx=5, pady=5)
+
+        ttk.Button(filter_frame, text="Load", command=self.load_data).grid(row=1, column=4, padx=5, pady=5)
+        ttk.Button(filter_frame, text="Refresh Stats", command=self.refresh_stats).grid(row=1, column=5, padx=5, pady=5)
+
+        for combo in (profile_combo, street_combo, window_combo):
+            combo.bind("<<ComboboxSelected>>", lambda event: self.load_data())
+
+        # --- Results ---
+        tree_frame = ttk.Frame(main_frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True)
+
+        columns = ("sequence", "hands", "share", "last_seen", "spot")
+        headings = {"sequence": "Sequence", "hands": "Hands", "share": "Share %", "last_seen": "Last Seen", "spot": "Matching Spot"}
+        self.tree = ttk.Treeview(tree_frame, columns=columns, show="headings")
+        for col in columns:
+            self.tree.heading(col, text=headings[col], command=lambda c=col: self.sort_by(c))
+        self.tree.column("sequence", width=250)
+        self.tree.column("hands", width=80, anchor="e")
+        self.tree.column("share", width=70, anchor="e")
+        self.tree.column("last_seen", width=100, anchor="center")
+        self.tree.column("spot", width=200)
+        scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.bind("<Double-1>", self._on_double_click)
+
+        self.status_var = tk.StringVar(value="")
+        ttk.Label(main_frame, textvariable=self.status_var).pack(anchor=tk.W, pady=(5, 0))
+
+    def _spot_patterns(self, street, profile_name):
+        """Returns [(spot_name, compiled_regex)] for spots that apply to the street."""
+        spots = self.reference_cache.get_spots_for_dropdowns(profile_name or None)
+        source = spots.get('preflop' if street == 'preflop' else 'postflop', {})
+        patterns = []
+        for spot_name, pattern in source.items():
+            try:
+                patterns.append((spot_name, re.compile(pattern)))
+            except (re.error, TypeError):
+                continue  # Patterns are POSIX regexes for Postgres; skip ones Python can't compile
+        return patterns
+
+    def load_data(self):
+        """Query the summary table with the current filters."""
+        try:
+            limit = int(self.limit_var.get().strip())
+        except ValueError:
+            messagebox.showerror("Error", "Top N must be a number.", parent=self)
+            return
+
+        street = self.street_var.get()
+        profile_name = self.profile_var.get()
+        days = TIME_WINDOWS.get(self.window_var.get())
+        results = self.db.get_sequence_frequencies(street, profile_name or None, days, limit)
+
+        total = sum(count for _, count, _ in results) or 1
+        patterns = self._spot_patterns(street, profile_name)
+        self.rows = []
+        for sequence, count, last_seen in results:
+            spot_name = next((name for name, regex in patterns if regex.search(sequence)), "")
+            self.rows.append((sequence, int(count), 100.0 * count / total, last_seen, spot_name))
+
+        self.populate_tree()
+
+    def populate_tree(self):
+        """Redraw the tree from the cached rows using the current sort and filter."""
+        self.tree.delete(*self.tree.get_children())
+        index = {"sequence": 0, "hands": 1, "share": 2, "last_seen": 3, "spot": 4}[self.sort_column]
+        rows = [r for r in self.rows if not (self.unmatched_only_var.get() and r[4])]
+        rows.sort(key=lambda r: (r[index] is None, r[index] if r[index] is not None else ""),
+                  reverse=self.sort_descending)
+        for sequence, count, share, last_seen, spot_name in rows:
+            self.tree.insert("", tk.END, values=(sequence, count, f"{share:.2f}",
+                                                 last_seen.strftime("%Y-%m-%d") if last_seen else "", spot_name))
+        unmatched = sum(1 for r in self.rows if not r[4])
+        self.status_var.set(f"{len(self.rows)} sequences loaded, {unmatched} without a matching spot. "
+                            f"Double-click a sequence to query it in the explorer.")
+
+    def sort_by(self, column):
+        """Sort by a column; clicking the same heading again reverses the order."""
+        if self.sort_column == column:
+            self.sort_descending = not self.sort_descending
+        else:
+            self.sort_column = column
+            self.sort_descending = column in ("hands", "share", "last_seen")
+        self.populate_tree()
+
+    def refresh_stats(self):
+        """Recompute the days changed since the last refresh (and the last two), then reload."""
+        self.status_var.set("Refreshing recent stats...")
+        self.update_idletasks()
+        if self.db.refresh_sequence_daily_stats(days=2) is False:
+            messagebox.showerror("Error", "Failed to refresh sequence stats.", parent=self)
+        self.load_data()
+
+    def _on_double_click(self, event):
+        item = self.tree.focus()
+        if not item or not self.on_sequence_selected:
+            return
+        sequence = self.tree.item(item, "values")[0]
+        self.on_sequence_selected(self.street_var.get(), sequence)
+
+def open_sequence_frequency_view(parent, db_access, reference_cache, profile_name=None, on_sequence_selected=None):
+    """Open the Sequence Frequencies window."""
+    return SequenceFrequencyView(parent, db_access, reference_cache, profile_name, on_sequence_selected)
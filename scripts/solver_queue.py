@@ -0,0 +1,395 @@
+#!/usr/bin/env python3
+"""
+Solver run queue for GTO+ files.
+
+The GTO+ directories already form an informal queue through file name
+prefixes:
+    waiting:   "<name>.gto"        in the processing directory
+    queued:    "1.x - <name>.gto"  in the priority directory (x = queue order)
+    running:   "0 - <name>.gto"    in the running directory
+    processed: any prefix          in the processed directory
+
+SolverQueue scans those local directories, records every state change with a
+timestamp in a small SQLite file, and derives each file's queue position from
+its prefix. From the recorded transitions it reports throughput and average
+solve time (running -> processed). reorder() and move() renumber the "1.x - "
+prefixes so the queue can be rearranged without renaming files by hand.
+
+Timestamps are the time a change was observed, so sync() should run right
+after files are moved (see sync_solver_queue) or periodically.
+
+Usage:
+    python scripts/solver_queue.py                    # sync, show queue and stats
+    python scripts/solver_queue.py --move NAME POS    # move a file to queue position POS (1 = next)
+"""
+
+import sys
+import os
+import re
+import time
+import sqlite3
+import threading
+from pathlib import Path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from scripts.config import (
+    GTO_PROCESSING_PATH, GTO_RUNNING_PATH, GTO_PRIORITY_PATH,
+    GTO_PROCESSED_PATH, GTO_QUEUE_DB_PATH
+)
+from scripts.gto_file_index import (
+    split_gto_prefix, PREFIX_NONE, PREFIX_RUNNING, PREFIX_PRIORITY, GTO_SUFFIXES
+)
+
+STATE_WAITING = "waiting"
+STATE_QUEUED = "queued"
+STATE_RUNNING = "running"
+STATE_PROCESSED = "processed"
+STATE_GONE = "gone"
+
+# When a file shows up in several places, the most advanced live state wins
+_STATE_RANK = {STATE_PROCESSED: 1, STATE_WAITING: 2, STATE_QUEUED: 3, STATE_RUNNING: 4}
+
+_priority_number = re.compile(r"^1\.(\d+) - ")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS queue_files (
+    name TEXT PRIMARY KEY,           -- normalized file name (no prefix, normcase)
+    display_name TEXT NOT NULL,      -- normalized file name as found on disk
+    state TEXT NOT NULL,
+    path TEXT,
+    priority INTEGER,                -- x of a "1.x - " prefix
+    first_seen REAL NOT NULL,
+    state_changed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS queue_transitions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    from_state TEXT,
+    to_state TEXT NOT NULL,
+    at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_queue_transitions_name_at ON queue_transitions(name, at);
+CREATE INDEX IF NOT EXISTS idx_queue_transitions_state_at ON queue_transitions(to_state, at);
+"""
+
+
+def priority_number(filename):
+    """Returns x for a "1.x - " file name, or None."""
+    match = _priority_number.match(filename)
+    return int(match.group(1)) if match else None
+
+
+class SolverQueue:
+    """
+    Tracks GTO+ files through the solver directories.
+
+    Args:
+        db_path (str or Path): SQLite file holding the queue state (":memory:" works for tests).
+        processing_path, running_path, priority_path, processed_path: Queue directories.
+        clock (callable): Returns the current time in seconds (time.time by default).
+    """
+
+    def __init__(self, db_path=GTO_QUEUE_DB_PATH, processing_path=GTO_PROCESSING_PATH,
+                 running_path=GTO_RUNNING_PATH, priority_path=GTO_PRIORITY_PATH,
+                 processed_path=GTO_PROCESSED_PATH, clock=time.time):
+        self.processing_path = Path(processing_path)
+        self.running_path = Path(running_path)
+        self.priority_path = Path(priority_path)
+        self.processed_path = Path(processed_path)
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    # --- Directory scan ---
+
+    @staticmethod
+    def _key(name):
+        return os.path.normcase(name)
+
+    def _classify(self, directory, filename):
+        """Returns (state, priority) for a file in directory, or None if it isn't part of the queue."""
+        prefix, _ = split_gto_prefix(filename)
+        same = lambda path: self._key(str(directory)) == self._key(str(path))
+        # Checked first: the processed directory may also be one of the others
+        if same(self.processed_path):
+            return STATE_PROCESSED, None
+        if prefix == PREFIX_RUNNING and same(self.running_path):
+            return STATE_RUNNING, None
+        if prefix == PREFIX_PRIORITY and same(self.priority_path):
+            return STATE_QUEUED, priority_number(filename)
+        if prefix == PREFIX_NONE and same(self.processing_path):
+            return STATE_WAITING, None
+        return None
+
+    def scan(self):
+        """Returns {key: {"display_name", "state", "path", "priority"}} for every queue file on disk."""
+        found = {}
+        seen_dirs = set()
+        for directory in (self.processing_path, self.running_path, self.priority_path, self.processed_path):
+            if self._key(str(directory)) in seen_dirs:
+                continue
+            seen_dirs.add(self._key(str(directory)))
+            try:
+                entries = list(os.scandir(directory))
+            except OSError:
+                continue
+            for entry in entries:
+                if not entry.is_file() or Path(entry.name).suffix.lower() not in GTO_SUFFIXES:
+                    continue
+                classified = self._classify(directory, entry.name)
+                if classified is None:
+                    continue
+                state, priority = classified
+                display_name = split_gto_prefix(entry.name)[1]
+                key = self._key(display_name)
+                current = found.get(key)
+                if current and _STATE_RANK[current["state"]] >= _STATE_RANK[state]:
+                    continue
+                found[key] = {"display_name": display_name, "state": state,
+                              "path": entry.path, "priority": priority}
+        return found
+
+    # --- State tracking ---
+
+    def sync(self):
+        """
+        Scans the directories and records any state changes.
+
+        Returns:
+            list: (display_name, from_state, to_state) for each recorded transition.
+        """
+        current = self.scan()
+        with self._lock, self.conn:
+            now = self.clock()
+            known = {row[0]: (row[1], row[2]) for row in
+                     self.conn.execute("SELECT name, display_name, state FROM queue_files")}
+            transitions = []
+            for key, info in current.items():
+                old = known.get(key)
+                if old is None:
+                    self.conn.execute(
+                        "INSERT INTO queue_files (name, display_name, state, path, priority, first_seen, state_changed_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                        (key, info["display_name"], info["state"], info["path"], info["priority"], now, now))
+                    transitions.append((key, info["display_name"], None, info["state"]))
+                elif old[1] != info["state"]:
+                    self.conn.execute(
+                        "UPDATE queue_files SET display_name = ?, state = ?, path = ?, priority = ?, state_changed_at = ? "
+                        "WHERE name = ?",
+                        (info["display_name"], info["state"], info["path"], info["priority"], now, key))
+                    transitions.append((key, info["display_name"], old[1], info["state"]))
+                else:
+                    self.conn.execute(
+                        "UPDATE queue_files SET display_name = ?, path = ?, priority = ? WHERE name = ?",
+                        (info["display_name"], info["path"], info["priority"], key))
+            for key, (display_name, state) in known.items():
+                if key not in current and state != STATE_GONE:
+                    self.conn.execute(
+                        "UPDATE queue_files SET state = ?, path = NULL, priority = NULL, state_changed_at = ? "
+                        "WHERE name = ?", (STATE_GONE, now, key))
+                    transitions.append((key, display_name, state, STATE_GONE))
+            self.conn.executemany(
+                "INSERT INTO queue_transitions (name, from_state, to_state, at) VALUES (?, ?, ?, ?)",
+                [(key, from_state, to_state, now) for key, _, from_state, to_state in transitions])
+        return [(display_name, from_state, to_state) for _, display_name, from_state, to_state in transitions]
+
+    def queue(self):
+        """
+        Returns the live queue in run order: running files (position 0), then
+        "1.x - " files by x, then unprefixed waiting files by arrival.
+
+        Returns:
+            list: dicts with name, state, path, priority, first_seen and position.
+        """
+        with self._lock:
+            rows = self.conn.execute(
+                """
+                SELECT display_name, state, path, priority, first_seen FROM queue_files
+                WHERE state IN (?, ?, ?)
+                ORDER BY CASE state WHEN ? THEN 0 WHEN ? THEN 1 ELSE 2 END,
+                         priority, first_seen, name
+                """,
+                (STATE_RUNNING, STATE_QUEUED, STATE_WAITING, STATE_RUNNING, STATE_QUEUED)).fetchall()
+        entries = []
+        position = 0
+        for name, state, path, priority, first_seen in rows:
+            if state != STATE_RUNNING:
+                position += 1
+            entries.append({"name": name, "state": state, "path": path, "priority": priority,
+                            "first_seen": first_seen, "position": 0 if state == STATE_RUNNING else position})
+        return entries
+
+    def history(self, name):
+        """Returns [(from_state, to_state, at)] for one file, oldest first."""
+        _, normalized = split_gto_prefix(Path(name).name)
+        with self._lock:
+            return self.conn.execute(
+                "SELECT from_state, to_state, at FROM queue_transitions WHERE name = ? ORDER BY at, id",
+                (self._key(normalized),)).fetchall()
+
+    def stats(self, window_hours=24):
+        """
+        Returns throughput and solve times over the last window_hours.
+
+        Solve time is measured from the last transition into running to the
+        transition into processed.
+
+        Returns:
+            dict: processed, throughput_per_hour, average_solve_seconds (None if no data),
+                  queue_length and estimated_drain_seconds.
+        """
+        since = self.clock() - window_hours * 3600
+        with self._lock:
+            durations = [row[0] for row in self.conn.execute(
+                """
+                SELECT p.at - (SELECT MAX(r.at) FROM queue_transitions r
+                               WHERE r.name = p.name AND r.to_state = ? AND r.at <= p.at)
+                FROM queue_transitions p
+                WHERE p.to_state = ? AND p.at >= ?
+                """, (STATE_RUNNING, STATE_PROCESSED, since))]
+            queue_length = self.conn.execute(
+                "SELECT COUNT(*) FROM queue_files WHERE state IN (?, ?)",
+                (STATE_QUEUED, STATE_WAITING)).fetchone()[0]
+        solved = [d for d in durations if d is not None]
+        average = sum(solved) / len(solved) if solved else None
+        return {
+            "processed": len(durations),
+            "throughput_per_hour": len(durations) / window_hours if window_hours else None,
+            "average_solve_seconds": average,
+            "queue_length": queue_length,
+            "estimated_drain_seconds": average * queue_length if average is not None else None,
+        }
+
+    # --- Reordering ---
+
+    def reorder(self, names):
+        """
+        Puts the given files at the front of the queue in that order; the rest keep
+        their relative order behind them. Files are renamed to "1.1 - ", "1.2 - ", ...
+        in the priority directory. The running file is never touched.
+
+        Args:
+            names (list): File names (with or without prefix) of queued or waiting files.
+
+        Returns:
+            bool: True if every rename succeeded, False otherwise.
+        """
+        self.sync()
+        pending = [e for e in self.queue() if e["state"] != STATE_RUNNING]
+        by_key = {self._key(e["name"]): e for e in pending}
+        front = []
+        for name in names:
+            key = self._key(split_gto_prefix(Path(name).name)[1])
+            if key not in by_key:
+                print(f"Not in the solver queue: {name}")
+                return False
+            if by_key[key] not in front:
+                front.append(by_key[key])
+        ordered = front + [e for e in pending if e not in front]
+
+        renames = []
+        for number, entry in enumerate(ordered, start=1):
+            dest = self.priority_path / f"1.{number} - {entry['name']}"
+            if self._key(entry["path"]) != self._key(str(dest)):
+                renames.append((Path(entry["path"]), dest))
+
+        # Two phases so a file can take a number another file still holds
+        staged = []
+        success = True
+        for i, (source, dest) in enumerate(renames):
+            temp = dest.with_name(f"{dest.name}.reorder{i}")
+            try:
+                os.replace(source, temp)
+                staged.append((source, temp, dest))
+            except OSError as e:
+                print(f"Could not rename {source}: {e}")
+                success = False
+        for source, temp, dest in staged:
+            try:
+                if dest.exists():
+                    raise FileExistsError(f"{dest} already exists")
+                os.replace(temp, dest)
+            except OSError as e:
+                print(f"Could not rename {source} to {dest.name}: {e}")
+                os.replace(temp, source)
+                success = False
+        self.sync()
+        return success
+
+    def move(self, name, position):
+        """Moves one queued or waiting file to queue position (1 = next to run)."""
+        self.sync()
+        pending = [e["name"] for e in self.queue() if e["state"] != STATE_RUNNING]
+        key = self._key(split_gto_prefix(Path(name).name)[1])
+        rest = [n for n in pending if self._key(n) != key]
+        if len(rest) == len(pending):
+            print(f"Not in the solver queue: {name}")
+            return False
+        index = max(0, min(position - 1, len(rest)))
+        return self.reorder(rest[:index] + [name] + rest[index:])
+
+
+_default_queue = None
+
+
+def get_solver_queue():
+    """Returns the shared SolverQueue for the configured directories."""
+    global _default_queue
+    if _default_queue is None:
+        _default_queue = SolverQueue()
+    return _default_queue
+
+
+def sync_solver_queue():
+    """Records queue transitions after files were moved. Failures are only reported."""
+    try:
+        get_solver_queue().sync()
+    except Exception as e:
+        print(f"Warning: Could not update solver queue: {e}")
+
+
+def format_queue(queue, stats):
+    """Returns the queue and its statistics as printable text."""
+    def duration(seconds):
+        if seconds is None:
+            return "n/a"
+        minutes, secs = divmod(int(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours}h {minutes:02d}m" if hours else f"{minutes}m {secs:02d}s"
+
+    lines = ["=== GTO+ Solver Queue ==="]
+    for entry in queue:
+        label = "running" if entry["state"] == STATE_RUNNING else f"{entry['position']:>7}"
+        lines.append(f"{label}  {entry['name']}  ({entry['state']})")
+    lines.append(
+        f"\nLast 24h: {stats['processed']} processed, {stats['throughput_per_hour']:.2f}/hour, "
+        f"average solve {duration(stats['average_solve_seconds'])}; "
+        f"{stats['queue_length']} waiting, estimated {duration(stats['estimated_drain_seconds'])} to drain")
+    return "\n".join(lines)
+
+
+def main():
+    args = sys.argv[1:]
+    solver_queue = get_solver_queue()
+    try:
+        if args[:1] == ["--move"]:
+            if len(args) != 3 or not args[2].isdigit():
+                print("Usage: python scripts/solver_queue.py --move NAME POSITION")
+                return False
+            if not solver_queue.move(args[1], int(args[2])):
+                return False
+        else:
+            for name, from_state, to_state in solver_queue.sync():
+                print(f"{name}: {from_state or 'new'} -> {to_state}")
+        print(format_queue(solver_queue.queue(), solver_queue.stats()))
+        return True
+    finally:
+        solver_queue.close()
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,23 @@
+"""
+SQL for assigning hands to poker_spots in set-based queries.
+
+A hand's spot is the poker_spots entry with a preflop action_sequence rule
+whose pattern equals the hand's pf_action_seq (lowest id first), the rule
+DatabaseAccess.find_spot_for_hand applies to a parsed hand.
+SPOT_FOR_HAND_JOIN adds that spot to a query over hand_histories aliased hh,
+as spot.id and spot.spot_name (both NULL for hands without a spot). Used by
+scripts/bet_sizing_analytics.py and scripts/player_spot_stats.py.
+"""
+
+SPOT_FOR_HAND_JOIN = """
+LEFT JOIN LATERAL (
+    SELECT sp.id, sp.spot_name
+    FROM spot_rules r
+    JOIN poker_spots sp ON sp.id = r.spot_id
+    WHERE r.condition_type = 'action_sequence'
+      AND r.condition_params->>'street' = 'preflop'
+      AND r.condition_params->>'pattern' = hh.pf_action_seq
+    ORDER BY sp.id
+    LIMIT 1
+) spot ON TRUE
+"""
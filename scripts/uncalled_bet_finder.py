@@ -1,7 +1,7 @@
 import tkinter as tk
 from tkinter import messagebox
 from db_access import DatabaseAccess
-from query_builder import QueryBuilder, Condition
+from raw_text_search import search_raw_text_lines, write_search_results
 from config import DB_PARAMS
 
 class UncalledBetFinder(tk.Tk):
@@ -24,33 +24,18 @@ class UncalledBetFinder(tk.Tk):
         self.protocol("WM_DELETE_WINDOW", self.on_close)
     
     def find_uncalled_bets(self):
-        # Build a query to retrieve hand histories.
-        qb = QueryBuilder("SELECT id, raw_text FROM hand_histories")
-        # Optionally, you can add conditions here if needed.
-        query = qb.build_query()
-        
+        # The line search runs in SQL and streams matches straight into the file (see raw_text_search.py)
+        if not self.db.conn:
+            messagebox.showerror("Error", "No database connection.")
+            self.status_label.config(text="Error occurred.")
+            return
         try:
-            with self.db.conn.cursor() as cursor:
-                cursor.execute(query)
-                rows = cursor.fetchall()
-            
-            # Filter rows to find those with a line starting with "Uncalled bet".
-            uncalled_bet_hands = []
-            for row in rows:
-                hand_id, raw_text = row
-                if raw_text and any(line.strip().startswith("Uncalled bet") for line in raw_text.splitlines()):
-                    uncalled_bet_hands.append(row)
-                    if len(uncalled_bet_hands) >= 50:
-                        break
+            with open("uncalled_bet_hands.txt", "w") as f:
+                results = search_raw_text_lines(self.db, "Uncalled bet", limit=50)
+                count = write_search_results(results, f)
             
-            # Write the filtered hand histories to a text file.
-            if uncalled_bet_hands:
-                with open("uncalled_bet_hands.txt", "w") as f:
-                    for hand_id, raw_text in uncalled_bet_hands:
-                        f.write(f"Hand ID: {hand_id}\n")
-                        f.write(raw_text)
-                        f.write("\n\n")
-                self.status_label.config(text=f"Found {len(uncalled_bet_hands)} hand histories. Written to uncalled_bet_hands.txt.")
+            if count:
+                self.status_label.config(text=f"Found {count} hand histories. Written to uncalled_bet_hands.txt.")
             else:
                 self.status_label.config(text="No hand histories found with 'Uncalled bet'.")
         except Exception as e:
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the columnar hand_actions encoding and its vectorized stats.
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scripts.action_columns import ActionColumnsBuilder
+
+# (hand_history_id, street, player, action_type, bet_amount, total, pot_size, action_order)
+ROWS = [
+    (1, "preflop", "Hero", "raise", 0.06, 0.06, 0.03, 1),
+    (1, "preflop", "Villain", "call", 0.04, 0.06, 0.09, 2),
+    (1, "flop", "Villain", "check", None, None, 0.12, 3),
+    (1, "flop", "Hero", "bet", 0.08, 0.14, 0.20, 4),
+    (1, "flop", "Villain", "fold", None, None, 0.20, 5),
+    (2, "preflop", "Villain", "raise", 0.05, 0.05, 0.03, 1),
+    (2, "preflop", "Hero", "call", 0.04, 0.06, 0.08, 2),
+    (2, "flop", "Villain", "bet", 0.06, 0.11, 0.16, 3),
+    (2, "flop", "Hero", "call", 0.06, 0.12, 0.16, 4),
+]
+
+def build():
+    builder = ActionColumnsBuilder()
+    builder.add_rows(ROWS[:4])
+    builder.add_rows(ROWS[4:])
+    return builder.build()
+
+def test_categorical_codes():
+    """Test that streets, players and actions are coded against their category lists."""
+    print("=== Testing Categorical Codes ===")
+    cols = build()
+    print(f"   players={cols.players} actions={cols.actions}")
+    assert len(cols) == len(ROWS)
+    assert cols.hand_count() == 2
+    assert cols.streets[:3] == ["anteing", "preflop", "flop"]
+    decoded = [(cols.streets[cols.street[i]], cols.players[cols.player[i]], cols.actions[cols.action[i]])
+               for i in range(len(cols))]
+    assert decoded == [(r[1], r[2], r[3]) for r in ROWS]
+    assert cols.bet_amount[2] != cols.bet_amount[2]  # NULL -> NaN
+    print("[OK] Codes round-trip")
+
+def test_frequencies_and_aggression():
+    """Test action frequencies, aggression factor and bet sizing ratios."""
+    print("=== Testing Vectorized Stats ===")
+    cols = build()
+    assert cols.action_frequencies() == {"call": 3, "raise": 2, "bet": 2, "check": 1, "fold": 1}
+    assert cols.action_frequencies("flop") == {"bet": 2, "check": 1, "fold": 1, "call": 1}
+
+    aggression = cols.aggression_by_player("flop")
+    print(f"   flop aggression: {aggression}")
+    assert aggression["Hero"] == {"aggressive": 1, "passive": 1, "actions": 2, "af": 1.0}
+    assert aggression["Villain"]["af"] is None
+
+    ratios = [round(r, 3) for r in cols.bet_size_ratios("flop")]
+    print(f"   flop bet/pot: {ratios}")
+    assert ratios == [0.667, 0.6]
+    print("[OK] Stats match")
+
+if __name__ == "__main__":
+    test_categorical_codes()
+    test_frequencies_and_aggression()
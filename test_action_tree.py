@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the merged decision tree over normalized action sequences.
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+
+from action_tree import ActionTree, OTHER, build_action_tree, describe_action, tokenize_sequence
+
+def test_merge_counts():
+    """Test that hands sharing a prefix share nodes and counts."""
+    print("=== Testing Tree Merge ===")
+    assert tokenize_sequence("1f2f3f4r5f6c") == ["1f", "2f", "3f", "4r", "5f", "6c"]
+    rows = [
+        (1, "zoom_6max", "1f2f3f4r5f6c", "6k4b6f", None, None),
+        (2, "zoom_6max", "1f2f3f4r5f6c", "6k4k", "6b4c", None),
+        (3, "zoom_6max", "1f2f3f4r5f6f", None, None, None),
+    ]
+    tree = build_action_tree(rows)
+    node = tree.root
+    for key in [("preflop", t) for t in ["1f", "2f", "3f", "4r", "5f"]]:
+        node = node.children[key]
+    assert node.count == 3
+    call, fold = node.sorted_children()
+    print(f"   after 5f: {[(k, n.count) for k, n in node.sorted_children()]}")
+    assert call[0] == ("preflop", "6c") and call[1].count == 2
+    assert fold[1].ended_here() == 1
+    assert call[1].children[("flop", "6k")].count == 2
+    assert tree.table_size == "6-max"
+    assert describe_action("flop", "6k", tree.table_size) == "flop: BB check"
+    print("[OK] Counts merge")
+
+def test_position_labels():
+    """Test that seat names are only used when the table size is known and shared."""
+    print("=== Testing Position Labels ===")
+    mixed = build_action_tree([(1, "zoom_6max", "1r2c", None, None, None),
+                               (2, "cash_9max", "1f2r", None, None, None)])
+    assert mixed.table_size is None
+    assert describe_action("preflop", "1r", mixed.table_size) == "preflop: P1 raise"
+    assert describe_action("preflop", "9f", "9-max") == "preflop: P9 fold"
+    print("[OK] Labels")
+
+def test_node_cap():
+    """Test that new actions go under '(other)' once the node budget is used."""
+    print("=== Testing Node Cap ===")
+    tree = ActionTree(max_nodes=3)
+    tree.add_hands([("1r2c", None, None, None), ("1r2f", None, None, None), ("1f", None, None, None)])
+    print(f"   nodes={tree.node_count} truncated={tree.truncated}")
+    assert tree.root.children[("preflop", "1r")].children[("preflop", OTHER)].count == 1
+    assert tree.root.children[("preflop", OTHER)].count == 1
+    assert tree.truncated == 2
+    print("[OK] Cap respected")
+
+if __name__ == "__main__":
+    test_merge_counts()
+    test_position_labels()
+    test_node_cap()
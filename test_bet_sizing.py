@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the bet sizing histogram bins and cache keys.
+"""
+
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+
+from bet_sizing_analytics import BetSizingCache, bucket_edges
+from bet_sizing_view import histogram_bar
+
+def test_bucket_edges():
+    """Test that the bins split 0..max_ratio evenly."""
+    print("=== Testing Bucket Edges ===")
+    edges = bucket_edges(buckets=4, max_ratio=1.0)
+    print(f"   {edges}")
+    assert edges == [0.0, 0.25, 0.5, 0.75, 1.0]
+    assert histogram_bar([0, 2, 4, 1]) == " ▄█▂"
+    assert histogram_bar([0, 0]) == ""
+    print("[OK] Edges and bars")
+
+def test_cache_key():
+    """Test that cache keys ignore hand order but not parameters."""
+    print("=== Testing Cache Keys ===")
+    key = BetSizingCache.key([3, 1, 2], group_by=("street",), cbet_only=True)
+    assert key == BetSizingCache.key([1, 2, 3], cbet_only=True, group_by=["street"])
+    assert key != BetSizingCache.key([1, 2, 3], group_by=("street",), cbet_only=False)
+    assert key != BetSizingCache.key(None, group_by=("street",), cbet_only=True)
+    print("[OK] Keys")
+
+if __name__ == "__main__":
+    test_bucket_edges()
+    test_cache_key()
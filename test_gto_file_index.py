@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Test script to verify GtoFileIndex lookups against a temporary directory layout.
+"""
+
+import sys
+import os
+import time
+import tempfile
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scripts.gto_file_index import GtoFileIndex, split_gto_prefix, PREFIX_NONE, PREFIX_RUNNING, PREFIX_PRIORITY
+
+def _touch(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("gto")
+
+def _make_index(root, check_interval=0):
+    base = root / "base"
+    return GtoFileIndex(
+        snapshot_path=root / "snapshot",
+        processing_path=base,
+        running_path=base,
+        priority_path=base,
+        processed_path=base / "processed",
+        check_interval=check_interval,
+    )
+
+def test_split_gto_prefix():
+    """Test prefix detection and normalization."""
+    print("=== Testing split_gto_prefix ===")
+    cases = {
+        "6 max 37 btn v bb.gto": (PREFIX_NONE, "6 max 37 btn v bb.gto"),
+        "0 - 6 max 37 btn v bb.gto": (PREFIX_RUNNING, "6 max 37 btn v bb.gto"),
+        "1.11 - 6 max 37 btn v bb.gto": (PREFIX_PRIORITY, "6 max 37 btn v bb.gto"),
+    }
+    for filename, expected in cases.items():
+        result = split_gto_prefix(filename)
+        print(f"   '{filename}' -> {result}")
+        assert result == expected
+
+def test_lookup_priority_order():
+    """Test that lookups follow the snapshot -> running -> priority -> processed order."""
+    print("=== Testing GtoFileIndex priority order ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        name = "6 max 80 btn 3b v hj.gto"
+        index = _make_index(root)
+
+        _touch(root / "base" / "processed" / name)
+        found = index.find(name)
+        print(f"   Processed only: {found}")
+        assert found == str(root / "base" / "processed" / name)
+
+        _touch(root / "base" / f"1.3 - {name}")
+        found = index.find(name)
+        print(f"   With priority copy: {found}")
+        assert found == str(root / "base" / f"1.3 - {name}")
+
+        _touch(root / "base" / f"0 - {name}")
+        found = index.find(name)
+        print(f"   With running copy: {found}")
+        assert found == str(root / "base" / f"0 - {name}")
+
+        _touch(root / "snapshot" / name)
+        found = index.find(f"C:/somewhere/else/{name}")
+        print(f"   With snapshot copy: {found}")
+        assert found == str(root / "snapshot" / name)
+
+        all_locations = index.find_all(name)
+        print(f"   All locations: {all_locations}")
+        assert len(all_locations) == 4
+
+        assert index.find("missing file.gto") is None
+
+def test_refresh_on_directory_change():
+    """Test that adding or renaming a file is picked up once the directory mtime changes."""
+    print("=== Testing GtoFileIndex refresh ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        name = "6 max 19 bb flat v sb 3x.gto"
+        index = _make_index(root)
+        (root / "base").mkdir()
+        assert index.find(name) is None
+
+        time.sleep(0.01)  # Make sure the directory mtime moves on coarse filesystems
+        _touch(root / "base" / name)
+        found = index.find(name)
+        print(f"   After adding: {found}")
+        assert found == str(root / "base" / name)
+
+        time.sleep(0.01)
+        os.rename(root / "base" / name, root / "base" / f"0 - {name}")
+        found = index.find(name)
+        print(f"   After renaming to running: {found}")
+        assert found == str(root / "base" / f"0 - {name}")
+
+def test_include_original():
+    """Test that the stored path is preferred when it still exists."""
+    print("=== Testing GtoFileIndex include_original ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        name = "6 max 37 btn v bb 2.5x.gto"
+        index = _make_index(root)
+        elsewhere = root / "elsewhere" / name
+        _touch(elsewhere)
+        _touch(root / "base" / "processed" / name)
+
+        assert index.find(str(elsewhere), include_original=True) == str(elsewhere)
+        assert index.find(str(elsewhere)) == str(root / "base" / "processed" / name)
+        print("   Stored path preferred when present")
+
+if __name__ == "__main__":
+    test_split_gto_prefix()
+    test_lookup_priority_order()
+    test_refresh_on_directory_change()
+    test_include_original()
+    print("\nAll GtoFileIndex tests passed!")
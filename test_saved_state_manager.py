@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Test script to verify SavedStateManager's atomic, coalesced storage.
+"""
+
+import sys
+import os
+import json
+import tempfile
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scripts'))
+
+from saved_state_manager import SavedStateManager
+
+def test_json_writes_are_coalesced():
+    """Test that rapid changes are written once, atomically, on flush."""
+    print("=== Testing JSON State Store ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "saved_states.json")
+        sm = SavedStateManager(path, save_delay=60)
+        for i in range(5):
+            sm.set_state(f"state {i}", {"index": i})
+        sm.delete_state("state 0")
+        assert not os.path.exists(path), "changes should be pending until flush"
+        assert sm.list_states() == ["state 1", "state 2", "state 3", "state 4"]
+        assert sm.get_state("state 2") == {"index": 2}
+
+        sm.close()
+        with open(path) as f:
+            assert list(json.load(f)) == ["state 1", "state 2", "state 3", "state 4"]
+        assert os.listdir(tmp) == ["saved_states.json"], "no temp files left behind"
+
+        reopened = SavedStateManager(path, save_delay=0)
+        assert reopened.get_state("state 4") == {"index": 4}
+        reopened.delete_state("state 4")
+        reopened.close()
+        final = SavedStateManager(path)
+        assert "state 4" not in final.list_states()
+        final.close()
+        print("   JSON store OK")
+
+def test_sqlite_store_imports_json():
+    """Test the SQLite store, including the one-off import of a JSON state file."""
+    print("=== Testing SQLite State Store ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = os.path.join(tmp, "saved_states.json")
+        with open(legacy, "w") as f:
+            json.dump({"old": {"pf_game_type": "zoom_cash_6max"}}, f)
+        path = os.path.join(tmp, "saved_states.sqlite")
+
+        sm = SavedStateManager(path, save_delay=0, import_json=legacy)
+        assert sm.list_states() == ["old"]
+        sm.set_state("new", {"table_size": "6"})
+        sm.set_state("old", {"pf_game_type": "cash_6max"})
+        sm.close()
+
+        reopened = SavedStateManager(path, import_json=legacy)
+        assert reopened.list_states() == ["old", "new"]
+        assert reopened.get_state("old") == {"pf_game_type": "cash_6max"}
+        reopened.delete_state("new")
+        reopened.close()
+        check = SavedStateManager(path)
+        assert check.list_states() == ["old"]
+        check.close()
+
+        # Deleting every state must not import the JSON file again
+        emptied = SavedStateManager(path, save_delay=0, import_json=legacy)
+        emptied.delete_state("old")
+        emptied.close()
+        restarted = SavedStateManager(path, import_json=legacy)
+        assert restarted.list_states() == []
+        restarted.close()
+        print("   SQLite store OK")
+
+if __name__ == "__main__":
+    test_json_writes_are_coalesced()
+    test_sqlite_store_imports_json()
+    print("=== Test completed! ===")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Test script to verify the GTO+ solver queue tracking and reordering.
+"""
+
+import sys
+import os
+import tempfile
+from pathlib import Path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from scripts.solver_queue import SolverQueue
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+    def __call__(self):
+        return self.now
+
+def make_queue(base, clock):
+    """Creates a queue laid out like the default config: one base dir plus processed/."""
+    (base / "processed").mkdir()
+    return SolverQueue(db_path=":memory:", processing_path=base, running_path=base,
+                       priority_path=base, processed_path=base / "processed", clock=clock)
+
+def test_positions_from_prefixes():
+    """Test that queue states and positions come from the file prefixes."""
+    print("=== Testing Solver Queue Positions ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        for name in ["0 - running.gto", "1.2 - second.gto", "1.1 - first.gto", "waiting.gto", "notes.txt"]:
+            (base / name).touch()
+        queue = make_queue(base, FakeClock())
+        queue.sync()
+        entries = [(e["name"], e["state"], e["position"]) for e in queue.queue()]
+        print(f"   {entries}")
+        assert entries == [
+            ("running.gto", "running", 0),
+            ("first.gto", "queued", 1),
+            ("second.gto", "queued", 2),
+            ("waiting.gto", "waiting", 3),
+        ]
+
+def test_transitions_and_stats():
+    """Test that state changes are recorded and turned into solve times."""
+    print("=== Testing Solver Queue Transitions ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        clock = FakeClock()
+        queue = make_queue(base, clock)
+        (base / "1.1 - spot.gto").touch()
+        queue.sync()
+
+        clock.now += 60
+        os.rename(base / "1.1 - spot.gto", base / "0 - spot.gto")
+        assert queue.sync() == [("spot.gto", "queued", "running")]
+
+        clock.now += 600
+        os.rename(base / "0 - spot.gto", base / "processed" / "spot.gto")
+        assert queue.sync() == [("spot.gto", "running", "processed")]
+        assert queue.sync() == []
+
+        states = [to_state for _, to_state, _ in queue.history("1.7 - spot.gto")]
+        assert states == ["queued", "running", "processed"]
+        stats = queue.stats(window_hours=1)
+        print(f"   {stats}")
+        assert stats["processed"] == 1
+        assert stats["average_solve_seconds"] == 600
+
+def test_reorder_renames_files():
+    """Test that reordering renumbers the priority prefixes on disk."""
+    print("=== Testing Solver Queue Reorder ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        base = Path(tmp)
+        for name in ["0 - running.gto", "1.1 - a.gto", "1.2 - b.gto", "c.gto"]:
+            (base / name).touch()
+        queue = make_queue(base, FakeClock())
+        assert queue.move("c.gto", 1)
+        names = sorted(p.name for p in base.iterdir() if p.is_file())
+        print(f"   {names}")
+        assert names == ["0 - running.gto", "1.1 - c.gto", "1.2 - a.gto", "1.3 - b.gto"]
+        assert [e["name"] for e in queue.queue()] == ["running.gto", "c.gto", "a.gto", "b.gto"]
+        assert not queue.move("missing.gto", 1)
+
+if __name__ == "__main__":
+    test_positions_from_prefixes()
+    test_transitions_and_stats()
+    test_reorder_renames_files()
+    print("=== Test completed! ===")